@@ -0,0 +1,59 @@
+"""Бенчмарк сжатия: CPU на ответ против сэкономленных байт
+
+Сжимает типичные страницы списка обращений (StandardResponse со 100 и
+1000 элементами) всеми доступными кодировками на нескольких уровнях.
+
+Запуск:
+    python -m benchmarks.compression [--repeat 50]
+"""
+
+import argparse
+import timeit
+from typing import List
+
+from benchmarks.serialization import build_contacts
+from src.core.compression import ENCODINGS, available_encodings
+from src.core.responses import StandardJSONResponse
+from src.domains.contacts.schemas import ContactResponse
+
+LEVELS = {"gzip": [1, 6, 9], "br": [1, 4, 8], "zstd": [1, 3, 10]}
+
+
+def compress(encoding: str, level: int, body: bytes) -> bytes:
+    """Сжать тело ответа так же, как это делает middleware"""
+    compressor = ENCODINGS[encoding](level)
+    return compressor.compress(body) + compressor.finish()
+
+
+def run(repeat: int) -> None:
+    """Выполнить бенчмарк и вывести результаты"""
+    print(
+        f"{'page':<6} {'encoding':<8} {'level':>5} {'bytes':>9} "
+        f"{'saved':>7} {'ms':>8} {'MB/s':>8}"
+    )
+    for items in (100, 1000):
+        body = StandardJSONResponse(build_contacts(items), List[ContactResponse]).body
+        print(f"{items:<6} {'identity':<8} {'-':>5} {len(body):>9} {'0%':>7}")
+        for encoding in available_encodings():
+            for level in LEVELS[encoding]:
+                size = len(compress(encoding, level, body))
+                timer = timeit.Timer(lambda: compress(encoding, level, body))
+                seconds = min(timer.repeat(repeat=3, number=repeat)) / repeat
+                saved = 1 - size / len(body)
+                print(
+                    f"{items:<6} {encoding:<8} {level:>5} {size:>9} "
+                    f"{saved:>7.1%} {seconds * 1000:>8.3f} "
+                    f"{len(body) / seconds / 1e6:>8.1f}"
+                )
+
+
+def main() -> None:
+    """Точка входа"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    run(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""Нагрузочный прогон API со смешанным трафиком
+
+Виртуальные пользователи в течение заданного времени выполняют сценарии,
+выбранные случайно по весам:
+- create_contact - POST /api/v1/contacts; с вероятностью --repeat-lead
+  обращение приходит от уже известного лида;
+- list_contacts - опрос списка обращений (GET /api/v1/contacts);
+- operators_load - опрос нагрузки операторов (GET /api/v1/operators/load);
+- statistics - GET /api/v1/contacts/statistics/distribution;
+- update_weight - POST /api/v1/sources/{id}/operator-weights.
+
+По умолчанию приложение запускается в процессе через httpx ASGITransport
+(как в tests/conftest.py) на временной SQLite; с --url нагрузка идет на
+запущенный сервер. Справочники (операторы, источники, веса) создаются через
+API. Отчет: пропускная способность, перцентили задержки и доля ошибок по
+сценариям (429/503 контроля допуска считаются отдельно как shed).
+
+Запуск:
+    python -m benchmarks.load [--duration 30] [--concurrency 32]
+        [--mix create_contact=60,list_contacts=20,operators_load=10,statistics=5,update_weight=5]
+        [--repeat-lead 0.3] [--url http://localhost:8000] [--output load.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from httpx import ASGITransport, AsyncClient, HTTPError
+
+DEFAULT_MIX = (
+    "create_contact=60,list_contacts=20,operators_load=10,statistics=5,update_weight=5"
+)
+SHED_STATUSES = frozenset({429, 503})
+
+
+@dataclass
+class EndpointStats:
+    """Накопленные замеры одного сценария"""
+
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    shed: int = 0
+    statuses: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
+
+    def record(self, status: Optional[int], seconds: float) -> None:
+        """Учесть ответ (status None - ошибка транспорта)"""
+        self.latencies.append(seconds)
+        if status is None:
+            self.errors += 1
+            return
+        self.statuses[status] += 1
+        if status in SHED_STATUSES:
+            self.shed += 1
+        elif status >= 400:
+            self.errors += 1
+
+    def summary(self, duration: float) -> dict:
+        """Сводка: rps, перцентили в мс, доли ошибок и отказов"""
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+
+        def percentile(q: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(int(count * q), count - 1)] * 1000, 3)
+
+        return {
+            "requests": count,
+            "rps": round(count / duration, 1) if duration else 0.0,
+            "p50_ms": percentile(0.50),
+            "p90_ms": percentile(0.90),
+            "p99_ms": percentile(0.99),
+            "max_ms": percentile(1.0),
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "shed_rate": round(self.shed / count, 4) if count else 0.0,
+            "statuses": dict(sorted(self.statuses.items())),
+        }
+
+
+class TrafficMix:
+    """Сценарии трафика и общее для пользователей состояние"""
+
+    def __init__(
+        self,
+        client: AsyncClient,
+        source_ids: List[int],
+        operator_ids: List[int],
+        repeat_lead: float,
+        seed: int = 42,
+    ):
+        self.client = client
+        self.source_ids = source_ids
+        self.operator_ids = operator_ids
+        self.repeat_lead = repeat_lead
+        self.random = random.Random(seed)
+        self.known_leads: List[str] = []
+        self._next_lead = 0
+        # Метка прогона (время в мс и PID): "новые" телефоны повторного
+        # прогона на том же сервере не совпадают с лидами прошлых прогонов
+        run_ms = time.time_ns() // 1_000_000 % 10**9
+        self._run_prefix = f"{run_ms:09d}{os.getpid() % 1000:03d}"
+
+    def _lead_phone(self) -> str:
+        """Телефон известного лида (доля repeat_lead) или нового"""
+        if self.known_leads and self.random.random() < self.repeat_lead:
+            return self.random.choice(self.known_leads)
+        self._next_lead += 1
+        phone = f"+7{self._run_prefix}{self._next_lead:07d}"
+        self.known_leads.append(phone)
+        return phone
+
+    async def create_contact(self) -> int:
+        response = await self.client.post(
+            "/api/v1/contacts",
+            json={
+                "phone": self._lead_phone(),
+                "source_id": self.random.choice(self.source_ids),
+                "message": "Нагрузочный тест",
+            },
+        )
+        return response.status_code
+
+    async def list_contacts(self) -> int:
+        response = await self.client.get(
+            "/api/v1/contacts", params={"skip": 0, "limit": 50}
+        )
+        return response.status_code
+
+    async def operators_load(self) -> int:
+        response = await self.client.get("/api/v1/operators/load")
+        return response.status_code
+
+    async def statistics(self) -> int:
+        response = await self.client.get("/api/v1/contacts/statistics/distribution")
+        return response.status_code
+
+    async def update_weight(self) -> int:
+        response = await self.client.post(
+            f"/api/v1/sources/{self.random.choice(self.source_ids)}/operator-weights",
+            json={
+                "operator_id": self.random.choice(self.operator_ids),
+                "weight": self.random.randint(1, 100),
+            },
+        )
+        return response.status_code
+
+    def scenarios(self) -> Dict[str, Callable[[], Awaitable[int]]]:
+        """Сценарии по именам (ключи --mix)"""
+        return {
+            "create_contact": self.create_contact,
+            "list_contacts": self.list_contacts,
+            "operators_load": self.operators_load,
+            "statistics": self.statistics,
+            "update_weight": self.update_weight,
+        }
+
+
+def parse_mix(value: str) -> List[Tuple[str, float]]:
+    """Разобрать --mix: имя=вес через запятую"""
+    mix = []
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix.append((name.strip(), float(weight or 1)))
+    return mix
+
+
+async def seed_reference_data(
+    client: AsyncClient, operators: int, sources: int
+) -> Tuple[List[int], List[int]]:
+    """Создать операторов, источники и веса через API"""
+    suffix = f"{int(time.time())}"
+    operator_ids = []
+    for i in range(operators):
+        response = await client.post(
+            "/api/v1/operators",
+            json={"name": f"Load {suffix} {i}", "is_active": True, "load_limit": 1000},
+        )
+        response.raise_for_status()
+        operator_ids.append(response.json()["data"]["id"])
+    source_ids = []
+    for i in range(sources):
+        response = await client.post(
+            "/api/v1/sources", json={"name": f"Load {suffix} {i}"}
+        )
+        response.raise_for_status()
+        source_ids.append(response.json()["data"]["id"])
+    for source_id in source_ids:
+        for operator_id in operator_ids:
+            response = await client.post(
+                f"/api/v1/sources/{source_id}/operator-weights",
+                json={"operator_id": operator_id, "weight": 10},
+            )
+            response.raise_for_status()
+    return source_ids, operator_ids
+
+
+@asynccontextmanager
+async def in_process_client(database_url: Optional[str]) -> AsyncIterator[AsyncClient]:
+    """Клиент к приложению в процессе на отдельной БД (по умолчанию SQLite)"""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from src.core.database import Base, get_db
+    from src.core.metrics import instrument_engine
+    from src.main import app
+
+    # src.main включает INFO для корневого логгера: без этого httpx пишет
+    # строку "HTTP Request: ..." на каждый запрос, засоряя отчет и добавляя
+    # к измеряемым задержкам запись логов
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = database_url or f"sqlite+aiosqlite:///{os.path.join(tmp, 'load.db')}"
+        engine = create_async_engine(url)
+        instrument_engine(engine.sync_engine)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        async def override_get_db():
+            async with session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            transport = ASGITransport(app=app, raise_app_exceptions=False)
+            async with AsyncClient(
+                transport=transport, base_url="http://load", timeout=30
+            ) as client:
+                yield client
+        finally:
+            app.dependency_overrides.clear()
+            await engine.dispose()
+
+
+@asynccontextmanager
+async def remote_client(url: str) -> AsyncIterator[AsyncClient]:
+    """Клиент к запущенному серверу"""
+    async with AsyncClient(base_url=url, timeout=30) as client:
+        yield client
+
+
+async def run(
+    client: AsyncClient,
+    mix: List[Tuple[str, float]],
+    duration: float,
+    concurrency: int,
+    repeat_lead: float,
+    operators: int,
+    sources: int,
+) -> dict:
+    """Выполнить прогон и вернуть отчет"""
+    source_ids, operator_ids = await seed_reference_data(client, operators, sources)
+    traffic = TrafficMix(client, source_ids, operator_ids, repeat_lead)
+    scenarios = traffic.scenarios()
+    unknown = [name for name, _ in mix if name not in scenarios]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(unknown)}")
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    stats: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+
+    async def user(seed: int) -> None:
+        rnd = random.Random(seed)
+        while time.perf_counter() < deadline:
+            name = rnd.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                status: Optional[int] = await scenarios[name]()
+            except HTTPError:
+                status = None
+            stats[name].record(status, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(user(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    total = EndpointStats()
+    for endpoint in stats.values():
+        total.latencies.extend(endpoint.latencies)
+        total.errors += endpoint.errors
+        total.shed += endpoint.shed
+        for status, count in endpoint.statuses.items():
+            total.statuses[status] += count
+    return {
+        "benchmark": "load",
+        "duration_s": round(elapsed, 2),
+        "concurrency": concurrency,
+        "repeat_lead": repeat_lead,
+        "mix": dict(mix),
+        "total": total.summary(elapsed),
+        "endpoints": {
+            name: stats[name].summary(elapsed) for name in names if name in stats
+        },
+    }
+
+
+def print_report(report: dict) -> None:
+    """Вывести отчет таблицей"""
+    print(
+        f"{'scenario':<16} {'requests':>9} {'rps':>8} {'p50 ms':>9} {'p90 ms':>9} "
+        f"{'p99 ms':>9} {'errors':>7} {'shed':>7}"
+    )
+    rows = list(report["endpoints"].items()) + [("total", report["total"])]
+    for name, row in rows:
+        print(
+            f"{name:<16} {row['requests']:>9} {row['rps']:>8.1f} "
+            f"{row['p50_ms']:>9.2f} {row['p90_ms']:>9.2f} {row['p99_ms']:>9.2f} "
+            f"{row['error_rate']:>7.2%} {row['shed_rate']:>7.2%}"
+        )
+
+
+async def main_async(args: argparse.Namespace) -> dict:
+    """Выбрать режим (в процессе или удаленный сервер) и выполнить прогон"""
+    clients = (
+        remote_client(args.url) if args.url else in_process_client(args.database_url)
+    )
+    async with clients as client:
+        return await run(
+            client,
+            parse_mix(args.mix),
+            args.duration,
+            args.concurrency,
+            args.repeat_lead,
+            args.operators,
+            args.sources,
+        )
+
+
+def main() -> None:
+    """Точка входа"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Адрес запущенного сервера")
+    parser.add_argument(
+        "--database-url", help="БД приложения в процессе (по умолчанию - SQLite)"
+    )
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument(
+        "--repeat-lead",
+        type=float,
+        default=0.3,
+        help="Доля обращений от известных лидов",
+    )
+    parser.add_argument("--operators", type=int, default=10)
+    parser.add_argument("--sources", type=int, default=3)
+    parser.add_argument("--output", help="Файл для отчета в JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,426 @@
+"""Бенчмарк горячих путей репозиториев на нескольких объемах данных
+
+Наполняет отдельную БД операторами, источниками, весами, лидами и
+обращениями до каждого объема (10k, 100k, 1M обращений; объемы
+наращиваются, данные не пересоздаются) и замеряет на каждом:
+find_or_create лида, get_available_operators, get_statistics, get_all на
+глубоких смещениях и get_by_id_with_relations.
+
+По умолчанию используется временный файл SQLite (aiosqlite); с
+--database-url - PostgreSQL, таблицы создаются в отдельной схеме, которая
+удаляется после прогона. Результаты в JSON (--output) сравниваются между
+коммитами через --compare.
+
+Запуск:
+    python -m benchmarks.repositories [--scales 10000,100000,1000000]
+        [--database-url postgresql+asyncpg://...] [--repeat 30] [--budget 30]
+        [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import sqlalchemy
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from src.core.database import Base
+from src.domains.contacts.model import Contact
+from src.domains.contacts.repository import ContactRepository
+from src.domains.leads.model import Lead
+from src.domains.leads.repository import LeadRepository
+from src.domains.operators.model import Operator
+from src.domains.operators.repository import OperatorRepository
+from src.domains.sources.model import Source, SourceOperatorWeight
+
+# Импорт всех моделей для регистрации в Base.metadata
+from src.core.idempotency import IdempotencyKey  # noqa: F401
+
+OPERATORS = 50
+SOURCES = 10
+# Среднее число обращений на лида
+CONTACTS_PER_LEAD = 2
+INSERT_CHUNK = 5000
+DEFAULT_SCALES = "10000,100000,1000000"
+
+
+@dataclass
+class CaseResult:
+    """Результат замера одного случая на одном объеме"""
+
+    scale: int
+    case: str
+    repeat: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    min_ms: float
+
+
+class Dataset:
+    """Наполнение БД данными до нужного объема обращений"""
+
+    def __init__(self, session_factory: async_sessionmaker, seed: int = 42):
+        self.session_factory = session_factory
+        self.random = random.Random(seed)
+        self.contacts = 0
+        self.leads = 0
+        self.now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    async def _insert(self, session: AsyncSession, model: type, rows: List[dict]):
+        """INSERT пачками (executemany драйвера на каждую пачку)"""
+        for start in range(0, len(rows), INSERT_CHUNK):
+            await session.execute(insert(model), rows[start : start + INSERT_CHUNK])
+
+    @staticmethod
+    async def _sync_sequences(session: AsyncSession, *models: type) -> None:
+        """Сдвинуть последовательности PostgreSQL после вставки с явными id"""
+        if session.bind.dialect.name != "postgresql":
+            return
+        for model in models:
+            table = model.__tablename__
+            await session.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT max(id) FROM {table}))"
+                )
+            )
+
+    async def create_reference_data(self) -> None:
+        """Операторы, источники и веса (у каждого источника - 10 операторов)"""
+        async with self.session_factory() as session:
+            await self._insert(
+                session,
+                Operator,
+                [
+                    {
+                        "id": i,
+                        "name": f"Оператор {i}",
+                        "is_active": i % 10 != 0,
+                        "load_limit": 10_000_000,
+                    }
+                    for i in range(1, OPERATORS + 1)
+                ],
+            )
+            await self._insert(
+                session,
+                Source,
+                [
+                    {"id": i, "name": f"Источник {i}", "description": None}
+                    for i in range(1, SOURCES + 1)
+                ],
+            )
+            await self._insert(
+                session,
+                SourceOperatorWeight,
+                [
+                    {
+                        "source_id": source_id,
+                        "operator_id": (source_id * 7 + k) % OPERATORS + 1,
+                        "weight": k + 1,
+                    }
+                    for source_id in range(1, SOURCES + 1)
+                    for k in range(10)
+                ],
+            )
+            await self._sync_sequences(session, Operator, Source)
+            await session.commit()
+
+    async def grow(self, contacts: int) -> None:
+        """Дописать лидов и обращения до contacts обращений"""
+        async with self.session_factory() as session:
+            # Лиды, созданные find_or_create между объемами, тоже учитываются
+            max_lead = (await session.execute(select(func.max(Lead.id)))).scalar() or 0
+            leads = max(contacts // CONTACTS_PER_LEAD, max_lead)
+            for start in range(max_lead, leads, INSERT_CHUNK):
+                ids = range(start + 1, min(start + INSERT_CHUNK, leads) + 1)
+                await self._insert(session, Lead, [self._lead(i) for i in ids])
+            for start in range(self.contacts, contacts, INSERT_CHUNK):
+                ids = range(start + 1, min(start + INSERT_CHUNK, contacts) + 1)
+                await self._insert(
+                    session, Contact, [self._contact(i, leads) for i in ids]
+                )
+            await self._sync_sequences(session, Lead, Contact)
+            await session.commit()
+        self.leads = leads
+        self.contacts = contacts
+
+    def _lead(self, i: int) -> dict:
+        """Строка лида"""
+        created_at = self.now - timedelta(minutes=i)
+        return {
+            "id": i,
+            "external_id": f"ext_{i}",
+            "phone": f"+7{i:010d}",
+            "email": f"lead{i}@example.com",
+            "name": f"Лид {i}",
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+    def _contact(self, i: int, leads: int) -> dict:
+        """Строка обращения (20% активных, 5% без оператора)"""
+        created_at = self.now - timedelta(seconds=i)
+        return {
+            "id": i,
+            "lead_id": self.random.randint(1, leads),
+            "source_id": self.random.randint(1, SOURCES),
+            "operator_id": (
+                None
+                if self.random.random() < 0.05
+                else self.random.randint(1, OPERATORS)
+            ),
+            "is_active": self.random.random() < 0.2,
+            "message": f"Сообщение обращения {i}",
+            "created_at": created_at,
+            "updated_at": created_at,
+            "last_activity_at": created_at,
+        }
+
+
+def build_cases(
+    dataset: Dataset,
+) -> Dict[str, Callable[[AsyncSession, int], Awaitable[object]]]:
+    """Случаи бенчмарка: (сессия, номер итерации) -> вызов репозитория"""
+    rnd = random.Random(7)
+
+    async def find_or_create(session: AsyncSession, i: int):
+        # Четные итерации находят существующего лида, нечетные создают нового
+        if i % 2 == 0:
+            phone = f"+7{rnd.randint(1, dataset.leads):010d}"
+        else:
+            phone = f"+8{uuid.uuid4().int % 10**10:010d}"
+        return await LeadRepository(session).find_or_create(phone=phone)
+
+    async def available_operators(session: AsyncSession, i: int):
+        return await OperatorRepository(session).get_available_operators(
+            i % SOURCES + 1
+        )
+
+    async def statistics_(session: AsyncSession, i: int):
+        return await ContactRepository(session).get_statistics()
+
+    def get_all_at(fraction: float):
+        async def get_all(session: AsyncSession, i: int):
+            skip = int(dataset.contacts * fraction)
+            return await ContactRepository(session).get_all(skip=skip, limit=100)
+
+        return get_all
+
+    async def with_relations(session: AsyncSession, i: int):
+        return await ContactRepository(session).get_by_id_with_relations(
+            rnd.randint(1, dataset.contacts)
+        )
+
+    return {
+        "find_or_create": find_or_create,
+        "get_available_operators": available_operators,
+        "get_statistics": statistics_,
+        "get_all_offset_50pct": get_all_at(0.5),
+        "get_all_offset_90pct": get_all_at(0.9),
+        "get_by_id_with_relations": with_relations,
+    }
+
+
+async def measure(
+    session_factory: async_sessionmaker,
+    scale: int,
+    name: str,
+    case: Callable[[AsyncSession, int], Awaitable[object]],
+    repeat: int,
+    budget: float,
+) -> CaseResult:
+    """Замерить случай: новая сессия на каждую итерацию, первая - прогрев
+
+    Медленный случай останавливается после budget секунд (но не меньше
+    трех замеров), чтобы большие объемы не растягивали прогон на часы.
+    """
+    timings = []
+    deadline = time.perf_counter() + budget
+    for i in range(repeat + 1):
+        async with session_factory() as session:
+            start = time.perf_counter()
+            await case(session, i)
+            elapsed = time.perf_counter() - start
+        if i:
+            timings.append(elapsed * 1000)
+        if len(timings) >= 3 and time.perf_counter() > deadline:
+            break
+    timings.sort()
+    return CaseResult(
+        scale=scale,
+        case=name,
+        repeat=len(timings),
+        mean_ms=round(statistics.fmean(timings), 3),
+        p50_ms=round(timings[len(timings) // 2], 3),
+        p95_ms=round(timings[min(int(len(timings) * 0.95), len(timings) - 1)], 3),
+        min_ms=round(timings[0], 3),
+    )
+
+
+async def prepare_engine(database_url: str) -> tuple[AsyncEngine, Optional[str]]:
+    """Движок для прогона; для PostgreSQL - в отдельной временной схеме"""
+    url = make_url(database_url)
+    if url.get_backend_name() != "postgresql":
+        return create_async_engine(url), None
+
+    schema = f"bench_{uuid.uuid4().hex[:8]}"
+    admin = create_async_engine(url)
+    async with admin.begin() as conn:
+        await conn.execute(text(f'CREATE SCHEMA "{schema}"'))
+    await admin.dispose()
+    engine = create_async_engine(
+        url, connect_args={"server_settings": {"search_path": schema}}
+    )
+    return engine, schema
+
+
+async def drop_schema(database_url: str, schema: str) -> None:
+    """Удалить временную схему PostgreSQL"""
+    admin = create_async_engine(database_url)
+    async with admin.begin() as conn:
+        await conn.execute(text(f'DROP SCHEMA "{schema}" CASCADE'))
+    await admin.dispose()
+
+
+def git_commit() -> Optional[str]:
+    """Текущий коммит (для сравнения результатов между коммитами)"""
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(
+    database_url: str,
+    scales: List[int],
+    repeat: int,
+    budget: float,
+    cases: Optional[List[str]],
+) -> dict:
+    """Выполнить бенчмарк на всех объемах и вернуть результаты"""
+    engine, schema = await prepare_engine(database_url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    results: List[CaseResult] = []
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        dataset = Dataset(session_factory)
+        await dataset.create_reference_data()
+        available = build_cases(dataset)
+        selected = cases or list(available)
+
+        print(
+            f"{'scale':>9} {'case':<26} {'mean ms':>9} {'p50 ms':>9} "
+            f"{'p95 ms':>9} {'min ms':>9}"
+        )
+        for scale in sorted(scales):
+            start = time.perf_counter()
+            await dataset.grow(scale)
+            if engine.dialect.name == "postgresql":
+                async with engine.begin() as conn:
+                    await conn.execute(text("ANALYZE"))
+            print(f"# seeded {scale} contacts in {time.perf_counter() - start:.1f}s")
+            for name in selected:
+                result = await measure(
+                    session_factory, scale, name, available[name], repeat, budget
+                )
+                results.append(result)
+                print(
+                    f"{scale:>9} {name:<26} {result.mean_ms:>9.3f} "
+                    f"{result.p50_ms:>9.3f} {result.p95_ms:>9.3f} "
+                    f"{result.min_ms:>9.3f}"
+                )
+    finally:
+        await engine.dispose()
+        if schema is not None:
+            await drop_schema(database_url, schema)
+
+    return {
+        "benchmark": "repositories",
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "dialect": make_url(database_url).get_backend_name(),
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "repeat": repeat,
+        "results": [asdict(result) for result in results],
+    }
+
+
+def compare(report: dict, baseline: dict) -> None:
+    """Вывести изменение p50 относительно базового прогона"""
+    before = {(r["scale"], r["case"]): r for r in baseline["results"]}
+    print(f"\nvs {baseline.get('commit') or 'baseline'} (p50)")
+    for result in report["results"]:
+        previous = before.get((result["scale"], result["case"]))
+        if previous is None or not previous["p50_ms"]:
+            continue
+        ratio = result["p50_ms"] / previous["p50_ms"]
+        print(
+            f"{result['scale']:>9} {result['case']:<26} "
+            f"{previous['p50_ms']:>9.3f} -> {result['p50_ms']:>9.3f} ({ratio:.2f}x)"
+        )
+
+
+def main() -> None:
+    """Точка входа"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--database-url", help="PostgreSQL URL (по умолчанию - временный SQLite)"
+    )
+    parser.add_argument("--scales", default=DEFAULT_SCALES)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=30.0,
+        help="Секунд на случай (не меньше 3 замеров)",
+    )
+    parser.add_argument("--cases", help="Случаи через запятую (по умолчанию - все)")
+    parser.add_argument("--output", help="Файл для результатов в JSON")
+    parser.add_argument("--compare", help="JSON предыдущего прогона для сравнения")
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(",") if s]
+    cases = args.cases.split(",") if args.cases else None
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or (
+            f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        )
+        report = asyncio.run(run(database_url, scales, args.repeat, args.budget, cases))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""Генератор большого синтетического набора данных
+
+Заполняет БД операторами, источниками, весами, лидами и обращениями с
+реалистичными перекосами:
+- обращений на лида - степенное распределение (Zipf, --lead-skew): у
+  каждого лида есть первое обращение, остальные обращения достаются
+  небольшой доле «постоянных» лидов;
+- операторы источника выбираются по весам из source_operator_weights, у
+  популярных операторов веса выше;
+- активна доля --active-ratio обращений, в основном самые свежие; лимиты
+  нагрузки операторов подбираются так, чтобы распределение продолжало
+  находить свободных операторов.
+
+Данные дописываются после существующих (id продолжают текущий максимум).
+Вставка идет пачками: на PostgreSQL - COPY (asyncpg copy_records_to_table),
+на остальных СУБД - INSERT ... VALUES (...), (...) на столько строк,
+сколько позволяет лимит параметров SQLite (executemany драйвера - по
+запросу на строку - медленнее примерно в полтора раза). Порядок: COPY на
+PostgreSQL - сотни тысяч строк в секунду, SQLite с индексами обращений -
+десятки тысяч. Строки генерируются потоково, память не растет с объемом.
+
+Запуск:
+    python -m benchmarks.seed --leads 1000000 --contacts 3000000
+        [--database-url postgresql+asyncpg://...] [--operators 200]
+        [--sources 20] [--active-ratio 0.05] [--lead-skew 1.0] [--days 365]
+        [--chunk 20000] [--seed 42] [--create-tables]
+"""
+
+import argparse
+import asyncio
+import bisect
+import itertools
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import Table, func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from src.core.config import settings
+from src.core.database import Base
+from src.domains.contacts.model import Contact
+from src.domains.leads.model import Lead
+from src.domains.operators.model import Operator
+from src.domains.sources.model import Source, SourceOperatorWeight
+
+# Импорт всех моделей для регистрации в Base.metadata
+from src.core.idempotency import IdempotencyKey  # noqa: F401
+
+Row = Tuple
+OPERATORS_PER_SOURCE = 10
+UNASSIGNED_RATIO = 0.03
+# SQLITE_MAX_VARIABLE_NUMBER (32766 начиная с SQLite 3.32, раньше - 999)
+SQLITE_MAX_PARAMETERS = 32766 if sqlite3.sqlite_version_info >= (3, 32) else 999
+
+
+def zipf_cumulative(n: int, skew: float) -> List[float]:
+    """Накопленные веса Zipf для рангов 1..n (для random.choices)"""
+    return list(itertools.accumulate(1.0 / rank**skew for rank in range(1, n + 1)))
+
+
+async def bulk_insert(
+    conn: AsyncConnection, table: Table, columns: Sequence[str], rows: List[Row]
+) -> None:
+    """Вставить пачку строк: COPY на PostgreSQL, иначе многострочные INSERT"""
+    if not rows:
+        return
+    if conn.dialect.name == "postgresql":
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            table.name, records=rows, columns=list(columns)
+        )
+        return
+    # Один INSERT ... VALUES (...), (...) на step строк в пределах лимита
+    # параметров. SQL собирается строкой: компиляция insert().values() на
+    # десятки тысяч значений медленнее самой вставки; значения приводятся
+    # к формату БД обработчиками типов колонок (JSON, даты)
+    dialect = conn.dialect
+    processors = [table.c[name].type.bind_processor(dialect) for name in columns]
+    if any(processors):
+        rows = [
+            tuple(p(v) if p else v for p, v in zip(processors, row)) for row in rows
+        ]
+    mark = "?" if dialect.paramstyle == "qmark" else "%s"
+    placeholder = "(" + ", ".join([mark] * len(columns)) + ")"
+    prefix = f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES "
+    step = max(1, SQLITE_MAX_PARAMETERS // len(columns))
+    for start in range(0, len(rows), step):
+        chunk = rows[start : start + step]
+        await conn.exec_driver_sql(
+            prefix + ", ".join([placeholder] * len(chunk)),
+            tuple(itertools.chain.from_iterable(chunk)),
+        )
+
+
+async def sync_sequences(conn: AsyncConnection, *tables: Table) -> None:
+    """Сдвинуть последовательности id PostgreSQL после вставки с явными id"""
+    if conn.dialect.name != "postgresql":
+        return
+    for table in tables:
+        await conn.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                f"(SELECT max(id) FROM {table.name}))"
+            )
+        )
+
+
+class SyntheticDataset:
+    """Потоковая генерация строк всех таблиц"""
+
+    def __init__(
+        self,
+        leads: int,
+        contacts: int,
+        operators: int,
+        sources: int,
+        active_ratio: float,
+        lead_skew: float,
+        days: int,
+        seed: int,
+    ):
+        if contacts < leads:
+            raise ValueError("contacts must be >= leads: every lead has a contact")
+        self.leads = leads
+        self.contacts = contacts
+        self.operators = operators
+        self.sources = sources
+        self.active_ratio = active_ratio
+        self.lead_skew = lead_skew
+        self.random = random.Random(seed)
+        self.end = datetime.now(timezone.utc).replace(tzinfo=None)
+        self.start = self.end - timedelta(days=days)
+        # Смещения id - данные дописываются после существующих
+        self.offsets: Dict[str, int] = {}
+        # source_id -> (operator_ids, накопленные веса)
+        self.routing: Dict[int, Tuple[List[int], List[float]]] = {}
+
+    def _timestamp(self, position: float) -> datetime:
+        """Время в диапазоне [start, end] по доле position"""
+        return self.start + (self.end - self.start) * position
+
+    def operator_rows(self) -> Iterator[Row]:
+        """Операторы: id, name, is_active, load_limit, created_at, updated_at"""
+        base = self.offsets["operators"]
+        active = self.contacts * self.active_ratio
+        # С запасом: популярные операторы получают больше обращений
+        load_limit = max(10, int(active / max(self.operators, 1) * 4))
+        for i in range(1, self.operators + 1):
+            yield (
+                base + i,
+                f"Оператор {base + i}",
+                self.random.random() > 0.05,
+                load_limit,
+                self.start,
+                self.start,
+            )
+
+    def source_rows(self) -> Iterator[Row]:
+        """Источники: id, name, description, created_at, updated_at"""
+        base = self.offsets["sources"]
+        for i in range(1, self.sources + 1):
+            yield (base + i, f"Источник {base + i}", None, self.start, self.start)
+
+    def weight_rows(self) -> Iterator[Row]:
+        """Веса: популярные операторы чаще назначены и с большим весом"""
+        operator_base = self.offsets["operators"]
+        popularity = zipf_cumulative(self.operators, 0.8)
+        population = range(operator_base + 1, operator_base + self.operators + 1)
+        for i in range(1, self.sources + 1):
+            source_id = self.offsets["sources"] + i
+            chosen: Dict[int, int] = {}
+            wanted = min(OPERATORS_PER_SOURCE, self.operators)
+            while len(chosen) < wanted:
+                operator_id = self.random.choices(population, cum_weights=popularity)[0]
+                rank = operator_id - operator_base
+                chosen.setdefault(operator_id, max(1, 100 // rank))
+            operator_ids = list(chosen)
+            self.routing[source_id] = (
+                operator_ids,
+                list(itertools.accumulate(chosen[op] for op in operator_ids)),
+            )
+            for operator_id, weight in chosen.items():
+                yield (source_id, operator_id, weight, self.start, self.start)
+
+    def lead_rows(self) -> Iterator[Row]:
+        """Лиды: id, external_id, phone, email, name, created_at, updated_at
+
+        Лид создается первым обращением; первые обращения равномерно
+        распределены по времени, поэтому лиды упорядочены по created_at.
+        """
+        base = self.offsets["leads"]
+        for i in range(1, self.leads + 1):
+            lead_id = base + i
+            created_at = self._timestamp(i / self.leads)
+            yield (
+                lead_id,
+                f"ext_{lead_id}" if self.random.random() < 0.3 else None,
+                f"+7{lead_id:010d}",
+                f"lead{lead_id}@example.com" if self.random.random() < 0.6 else None,
+                f"Лид {lead_id}",
+                created_at,
+                created_at,
+            )
+
+    def contact_rows(self) -> Iterator[Row]:
+        """Обращения: id, lead_id, source_id, operator_id, is_active, message,
+        created_at, updated_at, last_activity_at (в порядке времени создания)"""
+        lead_base = self.offsets["leads"]
+        base = self.offsets["contacts"]
+        popularity = zipf_cumulative(self.leads, self.lead_skew)
+        lead_population = range(lead_base + 1, lead_base + self.leads + 1)
+        repeat_contacts = self.contacts - self.leads
+        # Активны в основном свежие обращения: хвост по времени
+        active_from = 1 - min(1.0, self.active_ratio * 1.5)
+        source_ids = list(self.routing)
+
+        # Первые обращения лидов и повторные перемешиваются по времени
+        first_left, repeat_left = self.leads, repeat_contacts
+        next_lead = 0
+        for i in range(1, self.contacts + 1):
+            if self.random.random() * (first_left + repeat_left) < first_left:
+                next_lead += 1
+                first_left -= 1
+                lead_id = lead_base + next_lead
+            else:
+                repeat_left -= 1
+                lead_id = self.random.choices(lead_population, cum_weights=popularity)[
+                    0
+                ]
+                # Повторное обращение не раньше первого
+                lead_id = min(lead_id, lead_base + max(next_lead, 1))
+            source_id = self.random.choice(source_ids)
+            operator_ids, cum_weights = self.routing[source_id]
+            operator_id = (
+                None
+                if self.random.random() < UNASSIGNED_RATIO
+                else operator_ids[
+                    bisect.bisect_right(
+                        cum_weights, self.random.random() * cum_weights[-1]
+                    )
+                ]
+            )
+            position = i / self.contacts
+            is_active = position >= active_from and self.random.random() < (
+                self.active_ratio / (1 - active_from) if active_from < 1 else 1
+            )
+            created_at = self._timestamp(position)
+            yield (
+                base + i,
+                lead_id,
+                source_id,
+                operator_id,
+                is_active,
+                f"Обращение {base + i}",
+                created_at,
+                created_at,
+                created_at,
+            )
+
+
+TABLE_COLUMNS = {
+    "operators": (
+        Operator.__table__,
+        ("id", "name", "is_active", "load_limit", "created_at", "updated_at"),
+    ),
+    "sources": (
+        Source.__table__,
+        ("id", "name", "description", "created_at", "updated_at"),
+    ),
+    "source_operator_weights": (
+        SourceOperatorWeight.__table__,
+        ("source_id", "operator_id", "weight", "created_at", "updated_at"),
+    ),
+    "leads": (
+        Lead.__table__,
+        ("id", "external_id", "phone", "email", "name", "created_at", "updated_at"),
+    ),
+    "contacts": (
+        Contact.__table__,
+        (
+            "id",
+            "lead_id",
+            "source_id",
+            "operator_id",
+            "is_active",
+            "message",
+            "created_at",
+            "updated_at",
+            "last_activity_at",
+        ),
+    ),
+}
+
+
+async def write_table(
+    conn: AsyncConnection, name: str, rows: Iterator[Row], chunk: int
+) -> Tuple[int, float]:
+    """Записать строки таблицы пачками; вернуть (строк, секунд)"""
+    table, columns = TABLE_COLUMNS[name]
+    start = time.perf_counter()
+    total = 0
+    while True:
+        batch = list(itertools.islice(rows, chunk))
+        if not batch:
+            break
+        await bulk_insert(conn, table, columns, batch)
+        total += len(batch)
+    return total, time.perf_counter() - start
+
+
+async def seed(database_url: str, dataset: SyntheticDataset, chunk: int, create: bool):
+    """Сгенерировать и записать набор данных"""
+    engine = create_async_engine(database_url)
+    try:
+        if create:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+        async with engine.begin() as conn:
+            for name in ("operators", "sources", "leads", "contacts"):
+                table = TABLE_COLUMNS[name][0]
+                dataset.offsets[name] = (
+                    await conn.execute(select(func.coalesce(func.max(table.c.id), 0)))
+                ).scalar_one()
+
+            generators = {
+                "operators": dataset.operator_rows,
+                "sources": dataset.source_rows,
+                "source_operator_weights": dataset.weight_rows,
+                "leads": dataset.lead_rows,
+                "contacts": dataset.contact_rows,
+            }
+            print(f"{'table':<24} {'rows':>10} {'seconds':>8} {'rows/s':>10}")
+            for name, generate in generators.items():
+                rows, seconds = await write_table(conn, name, generate(), chunk)
+                print(
+                    f"{name:<24} {rows:>10} {seconds:>8.1f} "
+                    f"{rows / seconds if seconds else 0:>10.0f}"
+                )
+            await sync_sequences(
+                conn,
+                Operator.__table__,
+                Source.__table__,
+                SourceOperatorWeight.__table__,
+                Lead.__table__,
+                Contact.__table__,
+            )
+            if conn.dialect.name == "postgresql":
+                await conn.execute(text("ANALYZE"))
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Точка входа"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--leads", type=int, default=1_000_000)
+    parser.add_argument("--contacts", type=int, default=3_000_000)
+    parser.add_argument("--operators", type=int, default=200)
+    parser.add_argument("--sources", type=int, default=20)
+    parser.add_argument("--active-ratio", type=float, default=0.05)
+    parser.add_argument(
+        "--lead-skew", type=float, default=1.0, help="Показатель Zipf обращений на лида"
+    )
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--chunk", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--create-tables", action="store_true", help="Создать таблицы без миграций"
+    )
+    args = parser.parse_args()
+
+    dataset = SyntheticDataset(
+        leads=args.leads,
+        contacts=args.contacts,
+        operators=args.operators,
+        sources=args.sources,
+        active_ratio=args.active_ratio,
+        lead_skew=args.lead_skew,
+        days=args.days,
+        seed=args.seed,
+    )
+    asyncio.run(seed(args.database_url, dataset, args.chunk, args.create_tables))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Бенчмарк сериализации списочных ответов StandardResponse
+
+Сравнивает путь FastAPI через response_model (повторная валидация,
+jsonable_encoder, json.dumps) с быстрым путем StandardJSONResponse
+(pydantic-core dump_json с закешированным TypeAdapter) на 1000 элементах.
+
+Запуск:
+    python -m benchmarks.serialization [--items 1000] [--repeat 200]
+"""
+
+import argparse
+import json
+import timeit
+from datetime import datetime
+from typing import Any, List
+
+from src.core.config import settings
+from src.core.responses import StandardJSONResponse
+from src.core.schemas import StandardResponse
+from src.domains.contacts.model import Contact
+from src.domains.contacts.schemas import ContactResponse
+from src.domains.leads.model import Lead
+from src.domains.leads.schemas import LeadResponse
+
+# Импорт всех моделей для регистрации в Base.metadata
+from src.domains.operators.model import Operator  # noqa: F401
+from src.domains.sources.model import Source, SourceOperatorWeight  # noqa: F401
+
+
+def build_contacts(count: int) -> List[ContactResponse]:
+    """Собрать ответы сервиса для обращений"""
+    now = datetime.now()
+    return [
+        ContactResponse.model_validate(
+            Contact(
+                id=i,
+                lead_id=i,
+                source_id=i % 10,
+                operator_id=i % 50,
+                is_active=bool(i % 2),
+                message=f"Сообщение обращения {i}",
+                created_at=now,
+                updated_at=now,
+            )
+        )
+        for i in range(count)
+    ]
+
+
+def build_leads(count: int) -> List[LeadResponse]:
+    """Собрать ответы сервиса для лидов"""
+    now = datetime.now()
+    return [
+        LeadResponse.model_validate(
+            Lead(
+                id=i,
+                external_id=f"ext_{i}",
+                phone=f"+7999{i:07d}",
+                email=f"lead{i}@example.com",
+                name=f"Лид {i}",
+                created_at=now,
+                updated_at=now,
+            )
+        )
+        for i in range(count)
+    ]
+
+
+def render(data: Any, data_type: Any, fast: bool) -> bytes:
+    """Отрендерить тело ответа в выбранном режиме"""
+    settings.fast_json_responses = fast
+    return StandardJSONResponse(data, data_type).body
+
+
+def run(items: int, repeat: int) -> None:
+    """Выполнить бенчмарк и вывести результаты"""
+    cases = [
+        ("contacts", build_contacts(items), List[ContactResponse]),
+        ("leads", build_leads(items), List[LeadResponse]),
+    ]
+    original = settings.fast_json_responses
+    try:
+        for name, data, data_type in cases:
+            # Оба режима должны давать одинаковый JSON
+            legacy_body = render(data, data_type, fast=False)
+            fast_body = render(data, data_type, fast=True)
+            assert json.loads(legacy_body) == json.loads(fast_body)
+            assert json.loads(fast_body) == json.loads(
+                StandardResponse(success=True, data=data).model_dump_json()
+            )
+
+            results = {}
+            for mode, fast in (("response_model", False), ("fast", True)):
+                timer = timeit.Timer(lambda: render(data, data_type, fast))
+                best = min(timer.repeat(repeat=5, number=repeat)) / repeat
+                results[mode] = best
+                print(
+                    f"{name:<8} {mode:<15} {best * 1000:8.3f} ms/response "
+                    f"({len(fast_body)} bytes, {items} items)"
+                )
+            speedup = results["response_model"] / results["fast"]
+            print(f"{name:<8} speedup         {speedup:8.1f}x")
+    finally:
+        settings.fast_json_responses = original
+
+
+def main() -> None:
+    """Точка входа"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    run(args.items, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
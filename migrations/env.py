@@ -12,10 +12,11 @@ from src.core.database import Base
 from src.core.config import settings
 
 # Импорт всех моделей для регистрации в Base.metadata
-from src.domains.operators.model import Operator  # noqa: F401
+from src.domains.operators.model import Operator, OperatorShift  # noqa: F401
 from src.domains.sources.model import Source, SourceOperatorWeight  # noqa: F401
 from src.domains.leads.model import Lead  # noqa: F401
 from src.domains.contacts.model import Contact  # noqa: F401
+from src.core.idempotency import IdempotencyKey  # noqa: F401
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,50 @@
+"""Operator shifts
+
+Revision ID: 3f7b2c91a0d4
+Revises: 8d24f0b6c7e1
+Create Date: 2026-10-19 14:21:05.118342
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f7b2c91a0d4"
+down_revision: Union[str, None] = "8d24f0b6c7e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "operator_shifts",
+        sa.Column("operator_id", sa.Integer(), nullable=False),
+        sa.Column("weekday", sa.Integer(), nullable=False),
+        sa.Column("start_time", sa.Time(), nullable=False),
+        sa.Column("end_time", sa.Time(), nullable=False),
+        sa.Column("timezone", sa.String(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["operator_id"], ["operators.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_operator_shifts_id"), "operator_shifts", ["id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_operator_shifts_operator_id"),
+        "operator_shifts",
+        ["operator_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_operator_shifts_operator_id"), table_name="operator_shifts")
+    op.drop_index(op.f("ix_operator_shifts_id"), table_name="operator_shifts")
+    op.drop_table("operator_shifts")
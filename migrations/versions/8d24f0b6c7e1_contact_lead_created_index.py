@@ -0,0 +1,31 @@
+"""Contact lead timeline index
+
+Revision ID: 8d24f0b6c7e1
+Revises: 5c1e7a9d3b42
+Create Date: 2026-10-19 11:02:47.530912
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d24f0b6c7e1"
+down_revision: Union[str, None] = "5c1e7a9d3b42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_contact_lead_created",
+        "contacts",
+        ["lead_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_contact_lead_created", table_name="contacts")
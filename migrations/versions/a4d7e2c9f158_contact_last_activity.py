@@ -0,0 +1,45 @@
+"""Contact last activity time for the idle sweeper
+
+Revision ID: a4d7e2c9f158
+Revises: e1a9c4f26b73
+Create Date: 2026-10-19 18:21:05.417390
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d7e2c9f158"
+down_revision: Union[str, None] = "e1a9c4f26b73"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "contacts", sa.Column("last_activity_at", sa.DateTime(), nullable=True)
+    )
+    op.execute("UPDATE contacts SET last_activity_at = updated_at")
+    op.alter_column("contacts", "last_activity_at", nullable=False)
+    op.drop_index("idx_contact_active_updated", table_name="contacts")
+    op.create_index(
+        "idx_contact_active_activity",
+        "contacts",
+        ["is_active", "last_activity_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_contact_active_activity", table_name="contacts")
+    op.create_index(
+        "idx_contact_active_updated",
+        "contacts",
+        ["is_active", "updated_at"],
+        unique=False,
+    )
+    op.drop_column("contacts", "last_activity_at")
@@ -0,0 +1,40 @@
+"""Operator skills and required skills
+
+Revision ID: b6e4d1a87c25
+Revises: 3f7b2c91a0d4
+Create Date: 2026-10-19 15:03:44.207516
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b6e4d1a87c25"
+down_revision: Union[str, None] = "3f7b2c91a0d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "operators",
+        sa.Column("skills", sa.JSON(), server_default="[]", nullable=False),
+    )
+    op.add_column(
+        "sources",
+        sa.Column("required_skills", sa.JSON(), server_default="[]", nullable=False),
+    )
+    op.add_column(
+        "contacts",
+        sa.Column("required_skills", sa.JSON(), server_default="[]", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("contacts", "required_skills")
+    op.drop_column("sources", "required_skills")
+    op.drop_column("operators", "skills")
@@ -0,0 +1,36 @@
+"""Source idle timeout and active contacts index
+
+Revision ID: e1a9c4f26b73
+Revises: b6e4d1a87c25
+Create Date: 2026-10-19 15:48:12.630925
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e1a9c4f26b73"
+down_revision: Union[str, None] = "b6e4d1a87c25"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "sources", sa.Column("idle_timeout_minutes", sa.Integer(), nullable=True)
+    )
+    op.create_index(
+        "idx_contact_active_updated",
+        "contacts",
+        ["is_active", "updated_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_contact_active_updated", table_name="contacts")
+    op.drop_column("sources", "idle_timeout_minutes")
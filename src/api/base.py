@@ -1,21 +1,44 @@
 """Базовый роутер API"""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, status
+from fastapi.responses import Response
 
+from src.core.metrics import registry
+from src.core.responses import StandardJSONResponse
 from src.core.schemas import StandardResponse
+from src.core.warmup import readiness
 
 router = APIRouter()
 
 
 @router.get("/", response_model=StandardResponse[dict])
-async def root() -> StandardResponse[dict]:
+async def root() -> StandardJSONResponse:
     """Корневой эндпоинт"""
-    return StandardResponse(
-        success=True, data={"message": "Mini CRM Leads API"}, message=None
-    )
+    return StandardJSONResponse({"message": "Mini CRM Leads API"}, dict)
 
 
 @router.get("/health", response_model=StandardResponse[dict])
-async def health() -> StandardResponse[dict]:
+async def health() -> StandardJSONResponse:
     """Проверка здоровья приложения"""
-    return StandardResponse(success=True, data={"status": "healthy"}, message=None)
+    return StandardJSONResponse({"status": "healthy"}, dict)
+
+
+@router.get("/ready", response_model=StandardResponse[dict])
+async def ready() -> StandardJSONResponse:
+    """Готовность принимать трафик: 503 до конца прогрева и во время остановки"""
+    return StandardJSONResponse(
+        readiness.report(),
+        dict,
+        status_code=status.HTTP_200_OK
+        if readiness.accepting
+        else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
+@router.get("/metrics", response_class=Response)
+async def metrics() -> Response:
+    """Метрики в текстовом формате Prometheus"""
+    return Response(
+        content=registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
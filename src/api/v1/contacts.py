@@ -1,10 +1,17 @@
 """Роутеры для обращений"""
 
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Union
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Header, Query, status
+from fastapi.responses import Response, StreamingResponse
 
-from src.core.schemas import StandardResponse
+from src.core.batch import batch_budget, parse_ids
+from src.core.fields import parse_fields, response_schema
+from src.core.idempotency import idempotency
+from src.core.query_budget import query_budget
+from src.core.responses import StandardJSONResponse
+from src.core.schemas import BatchRequest, BatchResponse, StandardResponse
 from src.domains.contacts.dependencies import ContactServiceDep
 from src.domains.contacts.schemas import (
     ContactCreate,
@@ -12,6 +19,7 @@ from src.domains.contacts.schemas import (
     ContactResponse,
     ContactDetailResponse,
 )
+from src.utils.export import ExportFormat
 
 router = APIRouter()
 
@@ -21,45 +29,131 @@ router = APIRouter()
     response_model=StandardResponse[ContactDetailResponse],
     status_code=status.HTTP_201_CREATED,
 )
+@query_budget(30)
 async def create_contact(
-    data: ContactCreate, service: ContactServiceDep
-) -> StandardResponse[ContactDetailResponse]:
-    """Создать обращение (автоматически распределяется оператор)"""
-    contact = await service.create_contact(data)
-    return StandardResponse(success=True, data=contact)
+    data: ContactCreate,
+    service: ContactServiceDep,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+) -> Response:
+    """Создать обращение (автоматически распределяется оператор)
+
+    С заголовком Idempotency-Key повтор запроса не создает второе обращение,
+    а возвращает ответ первого.
+    """
+
+    async def create() -> StandardJSONResponse:
+        contact = await service.create_contact(data)
+        return StandardJSONResponse(
+            contact, ContactDetailResponse, status_code=status.HTTP_201_CREATED
+        )
 
+    return await idempotency.execute(
+        idempotency_key, "contacts:create", data.model_dump_json().encode(), create
+    )
 
-@router.get("", response_model=StandardResponse[List[ContactResponse]])
+
+@router.get(
+    "",
+    response_model=StandardResponse[
+        Union[List[ContactResponse], BatchResponse[ContactDetailResponse]]
+    ],
+)
+# Пакет: SELECT обращений и по запросу на lead, source, operator на каждый чанк
+@query_budget(batch_budget(4))
 async def get_contacts(
-    service: ContactServiceDep, skip: int = 0, limit: int = 100
-) -> StandardResponse[List[ContactResponse]]:
-    """Получить список обращений"""
-    contacts = await service.get_all_contacts(skip=skip, limit=limit)
-    return StandardResponse(success=True, data=contacts)
+    service: ContactServiceDep,
+    skip: int = 0,
+    limit: int = 100,
+    ids: Optional[str] = Query(None, description="ID через запятую: 1,2,3"),
+    fields: Optional[str] = Query(None, description="Поля ответа через запятую"),
+) -> StandardJSONResponse:
+    """Получить список обращений (или обращения по списку ID)"""
+    if ids is not None:
+        batch = await service.get_contacts_by_ids(parse_ids(ids))
+        return StandardJSONResponse(batch, BatchResponse[ContactDetailResponse])
+
+    field_set = parse_fields(fields, ContactResponse)
+    contacts = await service.get_all_contacts(skip=skip, limit=limit, fields=field_set)
+    return StandardJSONResponse(
+        contacts, List[response_schema(ContactResponse, field_set)]
+    )
+
+
+@router.post(
+    "/batch", response_model=StandardResponse[BatchResponse[ContactDetailResponse]]
+)
+@query_budget(batch_budget(4))
+async def get_contacts_batch(
+    data: BatchRequest, service: ContactServiceDep
+) -> StandardJSONResponse:
+    """Получить обращения по списку ID (для больших наборов)"""
+    batch = await service.get_contacts_by_ids(data.ids)
+    return StandardJSONResponse(batch, BatchResponse[ContactDetailResponse])
+
+
+@router.get("/export", response_class=StreamingResponse)
+@query_budget(1)
+async def export_contacts(
+    service: ContactServiceDep,
+    format: ExportFormat = ExportFormat.NDJSON,
+    source_id: Optional[int] = None,
+    operator_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> StreamingResponse:
+    """Потоковая выгрузка обращений в NDJSON или CSV"""
+    body = service.export_contacts(
+        format,
+        source_id=source_id,
+        operator_id=operator_id,
+        is_active=is_active,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    return StreamingResponse(
+        body,
+        media_type=format.media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="contacts.{format.value}"'
+        },
+    )
 
 
 @router.get("/{contact_id}", response_model=StandardResponse[ContactDetailResponse])
+@query_budget(6)
 async def get_contact(
-    contact_id: int, service: ContactServiceDep
-) -> StandardResponse[ContactDetailResponse]:
-    """Получить обращение по ID"""
-    contact = await service.get_contact(contact_id)
-    return StandardResponse(success=True, data=contact)
+    contact_id: int,
+    service: ContactServiceDep,
+    fields: Optional[str] = Query(None, description="Поля ответа через запятую"),
+) -> StandardJSONResponse:
+    """Получить обращение по ID
+
+    fields=id,is_active,lead отдает только эти поля и загружает только
+    запрошенные связи.
+    """
+    field_set = parse_fields(fields, ContactDetailResponse)
+    contact = await service.get_contact(contact_id, field_set)
+    return StandardJSONResponse(
+        contact, response_schema(ContactDetailResponse, field_set)
+    )
 
 
 @router.patch("/{contact_id}", response_model=StandardResponse[ContactResponse])
+@query_budget(17)
 async def update_contact(
     contact_id: int, data: ContactUpdate, service: ContactServiceDep
-) -> StandardResponse[ContactResponse]:
+) -> StandardJSONResponse:
     """Обновить обращение"""
     contact = await service.update_contact(contact_id, data)
-    return StandardResponse(success=True, data=contact)
+    return StandardJSONResponse(contact, ContactResponse)
 
 
 @router.get("/statistics/distribution", response_model=StandardResponse[dict])
+@query_budget(1)
 async def get_distribution_statistics(
     service: ContactServiceDep,
-) -> StandardResponse[dict]:
+) -> StandardJSONResponse:
     """Получить статистику распределения обращений по источникам и операторам"""
     stats = await service.get_statistics()
-    return StandardResponse(success=True, data=stats)
+    return StandardJSONResponse(stats, dict)
@@ -1,50 +1,151 @@
 """Роутеры для лидов"""
 
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Union
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import Response, StreamingResponse
 
-from src.core.schemas import StandardResponse
+from src.core.batch import parse_ids
+from src.core.conditional import conditional_response
+from src.core.fields import parse_fields, response_schema
+from src.core.query_budget import query_budget
+from src.core.responses import StandardJSONResponse
+from src.core.schemas import BatchRequest, BatchResponse, CursorPage, StandardResponse
+from src.domains.contacts.schemas import ContactResponse
 from src.domains.leads.dependencies import LeadServiceDep
 from src.domains.leads.schemas import LeadUpdate, LeadResponse, LeadWithContactsResponse
+from src.utils.export import ExportFormat
 
 router = APIRouter()
 
 
-@router.get("", response_model=StandardResponse[List[LeadResponse]])
+@router.get(
+    "",
+    response_model=StandardResponse[
+        Union[List[LeadResponse], BatchResponse[LeadResponse]]
+    ],
+)
+@query_budget(3)
 async def get_leads(
-    service: LeadServiceDep, skip: int = 0, limit: int = 100
-) -> StandardResponse[List[LeadResponse]]:
-    """Получить список лидов"""
-    leads = await service.get_all_leads(skip=skip, limit=limit)
-    return StandardResponse(success=True, data=leads)
+    request: Request,
+    service: LeadServiceDep,
+    skip: int = 0,
+    limit: int = 100,
+    ids: Optional[str] = Query(None, description="ID через запятую: 1,2,3"),
+    fields: Optional[str] = Query(None, description="Поля ответа через запятую"),
+) -> Response:
+    """Получить список лидов (или лидов по списку ID)"""
+    if ids is not None:
+        batch = await service.get_leads_by_ids(parse_ids(ids))
+        return StandardJSONResponse(batch, BatchResponse[LeadResponse])
+
+    field_set = parse_fields(fields, LeadResponse)
+    versions = await service.get_leads_versions(skip=skip, limit=limit)
+    return await conditional_response(
+        request,
+        versions,
+        lambda: service.get_all_leads(skip=skip, limit=limit, fields=field_set),
+        List[response_schema(LeadResponse, field_set)],
+        fields=field_set,
+    )
+
+
+@router.post("/batch", response_model=StandardResponse[BatchResponse[LeadResponse]])
+@query_budget(3)
+async def get_leads_batch(
+    data: BatchRequest, service: LeadServiceDep
+) -> StandardJSONResponse:
+    """Получить лидов по списку ID (для больших наборов)"""
+    batch = await service.get_leads_by_ids(data.ids)
+    return StandardJSONResponse(batch, BatchResponse[LeadResponse])
+
+
+@router.get("/export", response_class=StreamingResponse)
+@query_budget(1)
+async def export_leads(
+    service: LeadServiceDep,
+    format: ExportFormat = ExportFormat.NDJSON,
+    source_id: Optional[int] = None,
+    operator_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> StreamingResponse:
+    """Потоковая выгрузка лидов в NDJSON или CSV"""
+    body = service.export_leads(
+        format,
+        source_id=source_id,
+        operator_id=operator_id,
+        is_active=is_active,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    return StreamingResponse(
+        body,
+        media_type=format.media_type,
+        headers={"Content-Disposition": f'attachment; filename="leads.{format.value}"'},
+    )
 
 
 @router.get("/{lead_id}", response_model=StandardResponse[LeadResponse])
+@query_budget(3)
 async def get_lead(
-    lead_id: int, service: LeadServiceDep
-) -> StandardResponse[LeadResponse]:
+    request: Request,
+    lead_id: int,
+    service: LeadServiceDep,
+    fields: Optional[str] = Query(None, description="Поля ответа через запятую"),
+) -> Response:
     """Получить лида по ID"""
-    lead = await service.get_lead(lead_id)
-    return StandardResponse(success=True, data=lead)
+    field_set = parse_fields(fields, LeadResponse)
+    versions = await service.get_lead_version(lead_id)
+    return await conditional_response(
+        request,
+        versions,
+        lambda: service.get_lead(lead_id, field_set),
+        response_schema(LeadResponse, field_set),
+        fields=field_set,
+    )
 
 
 @router.get(
     "/{lead_id}/with-contacts",
     response_model=StandardResponse[LeadWithContactsResponse],
 )
+@query_budget(3)
 async def get_lead_with_contacts(
     lead_id: int, service: LeadServiceDep
-) -> StandardResponse[LeadWithContactsResponse]:
-    """Получить лида с обращениями"""
+) -> StandardJSONResponse:
+    """Получить лида с последними обращениями и их общим количеством"""
     lead = await service.get_lead_with_contacts(lead_id)
-    return StandardResponse(success=True, data=lead)
+    return StandardJSONResponse(lead, LeadWithContactsResponse)
+
+
+@router.get(
+    "/{lead_id}/contacts",
+    response_model=StandardResponse[CursorPage[ContactResponse]],
+)
+@query_budget(2)
+async def get_lead_contacts(
+    lead_id: int,
+    service: LeadServiceDep,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    source_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+) -> StandardJSONResponse:
+    """Лента обращений лида от новых к старым (курсор - next_cursor из ответа)"""
+    page = await service.get_lead_contacts(
+        lead_id, limit=limit, cursor=cursor, source_id=source_id, is_active=is_active
+    )
+    return StandardJSONResponse(page, CursorPage[ContactResponse])
 
 
 @router.patch("/{lead_id}", response_model=StandardResponse[LeadResponse])
+@query_budget(5)
 async def update_lead(
     lead_id: int, data: LeadUpdate, service: LeadServiceDep
-) -> StandardResponse[LeadResponse]:
+) -> StandardJSONResponse:
     """Обновить лида"""
     lead = await service.update_lead(lead_id, data)
-    return StandardResponse(success=True, data=lead)
+    return StandardJSONResponse(lead, LeadResponse)
@@ -1,15 +1,26 @@
 """Роутеры для операторов"""
 
-from typing import List
+from typing import List, Optional, Union
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Query, Request, status
+from fastapi.responses import Response
 
-from src.core.schemas import StandardResponse
+from src.core.batch import parse_ids
+from src.core.conditional import cached_conditional_response, conditional_response
+from src.core.fields import parse_fields, response_schema
+from src.core.query_budget import query_budget
+from src.core.responses import StandardJSONResponse
+from src.core.schemas import BatchRequest, BatchResponse, StandardResponse
 from src.domains.operators.dependencies import OperatorServiceDep
 from src.domains.operators.schemas import (
     OperatorCreate,
     OperatorUpdate,
     OperatorResponse,
+    OperatorLoadResponse,
+    OperatorScheduleResponse,
+    OperatorScheduleUpdate,
+    RebalancePlanResponse,
+    RedistributionResponse,
 )
 
 router = APIRouter()
@@ -20,45 +31,152 @@ router = APIRouter()
     response_model=StandardResponse[OperatorResponse],
     status_code=status.HTTP_201_CREATED,
 )
+@query_budget(4)
 async def create_operator(
     data: OperatorCreate, service: OperatorServiceDep
-) -> StandardResponse[OperatorResponse]:
+) -> StandardJSONResponse:
     """Создать оператора"""
     operator = await service.create_operator(data)
-    return StandardResponse(success=True, data=operator)
+    return StandardJSONResponse(
+        operator, OperatorResponse, status_code=status.HTTP_201_CREATED
+    )
 
 
-@router.get("", response_model=StandardResponse[List[OperatorResponse]])
+@router.get(
+    "",
+    response_model=StandardResponse[
+        Union[List[OperatorResponse], BatchResponse[OperatorResponse]]
+    ],
+)
+@query_budget(4)
 async def get_operators(
-    service: OperatorServiceDep, skip: int = 0, limit: int = 100
-) -> StandardResponse[List[OperatorResponse]]:
-    """Получить список операторов"""
-    operators = await service.get_all_operators(skip=skip, limit=limit)
-    return StandardResponse(success=True, data=operators)
+    request: Request,
+    service: OperatorServiceDep,
+    skip: int = 0,
+    limit: int = 100,
+    ids: Optional[str] = Query(None, description="ID через запятую: 1,2,3"),
+    fields: Optional[str] = Query(None, description="Поля ответа через запятую"),
+) -> Response:
+    """Получить список операторов (или операторов по списку ID)"""
+    if ids is not None:
+        batch = await service.get_operators_by_ids(parse_ids(ids))
+        return StandardJSONResponse(batch, BatchResponse[OperatorResponse])
+
+    field_set = parse_fields(fields, OperatorResponse)
+    versions, operators = await service.get_all_operators(
+        skip=skip, limit=limit, fields=field_set
+    )
+    return cached_conditional_response(
+        request,
+        versions,
+        operators,
+        List[response_schema(OperatorResponse, field_set)],
+        fields=field_set,
+    )
+
+
+@router.post("/batch", response_model=StandardResponse[BatchResponse[OperatorResponse]])
+@query_budget(4)
+async def get_operators_batch(
+    data: BatchRequest, service: OperatorServiceDep
+) -> StandardJSONResponse:
+    """Получить операторов по списку ID (для больших наборов)"""
+    batch = await service.get_operators_by_ids(data.ids)
+    return StandardJSONResponse(batch, BatchResponse[OperatorResponse])
+
+
+@router.get("/load", response_model=StandardResponse[List[OperatorLoadResponse]])
+@query_budget(7)
+async def get_operators_load(
+    service: OperatorServiceDep,
+) -> StandardJSONResponse:
+    """Получить текущую нагрузку, лимиты и источники всех операторов"""
+    load = await service.get_operators_load()
+    return StandardJSONResponse(load, List[OperatorLoadResponse])
+
+
+@router.get("/rebalance", response_model=StandardResponse[RebalancePlanResponse])
+@query_budget(4)
+async def get_rebalance_plan(service: OperatorServiceDep) -> StandardJSONResponse:
+    """План ребалансировки (dry-run): какие обращения и кому будут перенесены"""
+    plan = await service.plan_rebalance()
+    return StandardJSONResponse(plan, RebalancePlanResponse)
 
 
 @router.get("/{operator_id}", response_model=StandardResponse[OperatorResponse])
+@query_budget(4)
 async def get_operator(
-    operator_id: int, service: OperatorServiceDep
-) -> StandardResponse[OperatorResponse]:
+    request: Request,
+    operator_id: int,
+    service: OperatorServiceDep,
+    fields: Optional[str] = Query(None, description="Поля ответа через запятую"),
+) -> Response:
     """Получить оператора по ID"""
-    operator = await service.get_operator(operator_id)
-    return StandardResponse(success=True, data=operator)
+    field_set = parse_fields(fields, OperatorResponse)
+    versions = await service.get_operator_version(operator_id)
+    return await conditional_response(
+        request,
+        versions,
+        lambda: service.get_operator(operator_id, field_set),
+        response_schema(OperatorResponse, field_set),
+        fields=field_set,
+    )
 
 
 @router.patch("/{operator_id}", response_model=StandardResponse[OperatorResponse])
+@query_budget(7)
 async def update_operator(
     operator_id: int, data: OperatorUpdate, service: OperatorServiceDep
-) -> StandardResponse[OperatorResponse]:
+) -> StandardJSONResponse:
     """Обновить оператора"""
     operator = await service.update_operator(operator_id, data)
-    return StandardResponse(success=True, data=operator)
+    return StandardJSONResponse(operator, OperatorResponse)
 
 
 @router.delete("/{operator_id}", response_model=StandardResponse[dict])
+@query_budget(6)
 async def delete_operator(
     operator_id: int, service: OperatorServiceDep
-) -> StandardResponse[dict]:
-    """Удалить оператора"""
+) -> StandardJSONResponse:
+    """Удалить оператора (409, если его активным обращениям не нашлось места)"""
     await service.delete_operator(operator_id)
-    return StandardResponse(success=True, data={"deleted": True})
+    return StandardJSONResponse({"deleted": True}, dict)
+
+
+@router.get(
+    "/{operator_id}/schedule",
+    response_model=StandardResponse[OperatorScheduleResponse],
+)
+@query_budget(4)
+async def get_operator_schedule(
+    operator_id: int, service: OperatorServiceDep
+) -> StandardJSONResponse:
+    """Получить расписание смен оператора и то, на смене ли он сейчас"""
+    schedule = await service.get_schedule(operator_id)
+    return StandardJSONResponse(schedule, OperatorScheduleResponse)
+
+
+@router.put(
+    "/{operator_id}/schedule",
+    response_model=StandardResponse[OperatorScheduleResponse],
+)
+@query_budget(6)
+async def set_operator_schedule(
+    operator_id: int, data: OperatorScheduleUpdate, service: OperatorServiceDep
+) -> StandardJSONResponse:
+    """Заменить расписание смен оператора (пустой список - доступен всегда)"""
+    schedule = await service.set_schedule(operator_id, data)
+    return StandardJSONResponse(schedule, OperatorScheduleResponse)
+
+
+@router.post(
+    "/{operator_id}/redistribute",
+    response_model=StandardResponse[RedistributionResponse],
+)
+@query_budget(6)
+async def redistribute_operator_contacts(
+    operator_id: int, service: OperatorServiceDep
+) -> StandardJSONResponse:
+    """Переназначить активные обращения оператора другим операторам источников"""
+    report = await service.redistribute_operator(operator_id)
+    return StandardJSONResponse(report, RedistributionResponse)
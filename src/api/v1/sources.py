@@ -1,10 +1,16 @@
 """Роутеры для источников"""
 
-from typing import List
+from typing import List, Optional, Union
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Query, Request, status
+from fastapi.responses import Response
 
-from src.core.schemas import StandardResponse
+from src.core.batch import parse_ids
+from src.core.conditional import conditional_response
+from src.core.fields import parse_fields, response_schema
+from src.core.query_budget import query_budget
+from src.core.responses import StandardJSONResponse
+from src.core.schemas import BatchRequest, BatchResponse, StandardResponse
 from src.domains.sources.dependencies import SourceServiceDep
 from src.domains.sources.schemas import (
     SourceCreate,
@@ -23,60 +29,109 @@ router = APIRouter()
     response_model=StandardResponse[SourceResponse],
     status_code=status.HTTP_201_CREATED,
 )
+@query_budget(4)
 async def create_source(
     data: SourceCreate, service: SourceServiceDep
-) -> StandardResponse[SourceResponse]:
+) -> StandardJSONResponse:
     """Создать источник"""
     source = await service.create_source(data)
-    return StandardResponse(success=True, data=source)
+    return StandardJSONResponse(
+        source, SourceResponse, status_code=status.HTTP_201_CREATED
+    )
 
 
-@router.get("", response_model=StandardResponse[List[SourceResponse]])
+@router.get(
+    "",
+    response_model=StandardResponse[
+        Union[List[SourceResponse], BatchResponse[SourceResponse]]
+    ],
+)
+@query_budget(4)
 async def get_sources(
-    service: SourceServiceDep, skip: int = 0, limit: int = 100
-) -> StandardResponse[List[SourceResponse]]:
-    """Получить список источников"""
-    sources = await service.get_all_sources(skip=skip, limit=limit)
-    return StandardResponse(success=True, data=sources)
+    request: Request,
+    service: SourceServiceDep,
+    skip: int = 0,
+    limit: int = 100,
+    ids: Optional[str] = Query(None, description="ID через запятую: 1,2,3"),
+    fields: Optional[str] = Query(None, description="Поля ответа через запятую"),
+) -> Response:
+    """Получить список источников (или источников по списку ID)"""
+    if ids is not None:
+        batch = await service.get_sources_by_ids(parse_ids(ids))
+        return StandardJSONResponse(batch, BatchResponse[SourceResponse])
+
+    field_set = parse_fields(fields, SourceResponse)
+    versions = await service.get_sources_versions(skip=skip, limit=limit)
+    return await conditional_response(
+        request,
+        versions,
+        lambda: service.get_all_sources(skip=skip, limit=limit, fields=field_set),
+        List[response_schema(SourceResponse, field_set)],
+        fields=field_set,
+    )
+
+
+@router.post("/batch", response_model=StandardResponse[BatchResponse[SourceResponse]])
+@query_budget(4)
+async def get_sources_batch(
+    data: BatchRequest, service: SourceServiceDep
+) -> StandardJSONResponse:
+    """Получить источников по списку ID (для больших наборов)"""
+    batch = await service.get_sources_by_ids(data.ids)
+    return StandardJSONResponse(batch, BatchResponse[SourceResponse])
 
 
 @router.get("/{source_id}", response_model=StandardResponse[SourceResponse])
+@query_budget(4)
 async def get_source(
-    source_id: int, service: SourceServiceDep
-) -> StandardResponse[SourceResponse]:
+    request: Request,
+    source_id: int,
+    service: SourceServiceDep,
+    fields: Optional[str] = Query(None, description="Поля ответа через запятую"),
+) -> Response:
     """Получить источник по ID"""
-    source = await service.get_source(source_id)
-    return StandardResponse(success=True, data=source)
+    field_set = parse_fields(fields, SourceResponse)
+    versions = await service.get_source_version(source_id)
+    return await conditional_response(
+        request,
+        versions,
+        lambda: service.get_source(source_id, field_set),
+        response_schema(SourceResponse, field_set),
+        fields=field_set,
+    )
 
 
 @router.get(
     "/{source_id}/with-weights",
     response_model=StandardResponse[SourceWithWeightsResponse],
 )
+@query_budget(5)
 async def get_source_with_weights(
     source_id: int, service: SourceServiceDep
-) -> StandardResponse[SourceWithWeightsResponse]:
+) -> StandardJSONResponse:
     """Получить источник с весами операторов"""
     source = await service.get_source_with_weights(source_id)
-    return StandardResponse(success=True, data=source)
+    return StandardJSONResponse(source, SourceWithWeightsResponse)
 
 
 @router.patch("/{source_id}", response_model=StandardResponse[SourceResponse])
+@query_budget(7)
 async def update_source(
     source_id: int, data: SourceUpdate, service: SourceServiceDep
-) -> StandardResponse[SourceResponse]:
+) -> StandardJSONResponse:
     """Обновить источник"""
     source = await service.update_source(source_id, data)
-    return StandardResponse(success=True, data=source)
+    return StandardJSONResponse(source, SourceResponse)
 
 
 @router.delete("/{source_id}", response_model=StandardResponse[dict])
+@query_budget(4)
 async def delete_source(
     source_id: int, service: SourceServiceDep
-) -> StandardResponse[dict]:
+) -> StandardJSONResponse:
     """Удалить источник"""
     await service.delete_source(source_id)
-    return StandardResponse(success=True, data={"deleted": True})
+    return StandardJSONResponse({"deleted": True}, dict)
 
 
 @router.post(
@@ -84,20 +139,24 @@ async def delete_source(
     response_model=StandardResponse[SourceOperatorWeightResponse],
     status_code=status.HTTP_201_CREATED,
 )
+@query_budget(21)
 async def set_operator_weight(
     source_id: int, data: SourceOperatorWeightCreate, service: SourceServiceDep
-) -> StandardResponse[SourceOperatorWeightResponse]:
+) -> StandardJSONResponse:
     """Установить вес оператора для источника"""
     weight = await service.set_operator_weight(source_id, data)
-    return StandardResponse(success=True, data=weight)
+    return StandardJSONResponse(
+        weight, SourceOperatorWeightResponse, status_code=status.HTTP_201_CREATED
+    )
 
 
 @router.delete(
     "/{source_id}/operator-weights/{operator_id}", response_model=StandardResponse[dict]
 )
+@query_budget(6)
 async def remove_operator_weight(
     source_id: int, operator_id: int, service: SourceServiceDep
-) -> StandardResponse[dict]:
+) -> StandardJSONResponse:
     """Удалить вес оператора для источника"""
     await service.remove_operator_weight(source_id, operator_id)
-    return StandardResponse(success=True, data={"deleted": True})
+    return StandardJSONResponse({"deleted": True}, dict)
@@ -0,0 +1,145 @@
+"""Контроль допуска запросов: лимиты конкурентности и сброс нагрузки по классам маршрутов"""
+
+import asyncio
+from typing import Dict, Iterable, Optional
+
+from fastapi import status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.metrics import registry
+
+INGEST = "ingest"
+READ = "read"
+ADMIN = "admin"
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+admission_in_flight = registry.gauge(
+    "admission_in_flight", "Requests admitted and being processed", ("route_class",)
+)
+admission_queue_depth = registry.gauge(
+    "admission_queue_depth", "Requests waiting for admission", ("route_class",)
+)
+admission_shed_total = registry.counter(
+    "admission_shed_total",
+    "Requests rejected by admission control",
+    ("route_class", "reason"),
+)
+
+
+class AdmissionLimiter:
+    """Лимит конкурентности с ограниченной очередью ожидания
+
+    Пока есть свободные слоты, запрос допускается сразу. Иначе он ждет в
+    очереди не дольше queue_timeout; если очередь заполнена или ожидание
+    истекло, запрос отклоняется без обращения к БД.
+    """
+
+    def __init__(
+        self,
+        route_class: str,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout: float,
+        status_code: int = status.HTTP_503_SERVICE_UNAVAILABLE,
+    ):
+        self.route_class = route_class
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.status_code = status_code
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._waiting = 0
+
+    async def acquire(self) -> Optional[str]:
+        """Занять слот; вернуть причину отказа или None, если запрос допущен"""
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+        elif self._waiting >= self.max_queue:
+            return "queue_full"
+        else:
+            self._waiting += 1
+            admission_queue_depth.inc(self.route_class)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                return "queue_timeout"
+            finally:
+                self._waiting -= 1
+                admission_queue_depth.dec(self.route_class)
+        admission_in_flight.inc(self.route_class)
+        return None
+
+    def release(self) -> None:
+        """Освободить слот"""
+        admission_in_flight.dec(self.route_class)
+        self._semaphore.release()
+
+
+def classify_request(
+    method: str, path: str, ingest_paths: Iterable[str]
+) -> Optional[str]:
+    """Класс маршрута запроса; None - запрос не ограничивается (health, metrics, docs)"""
+    if not path.startswith("/api/"):
+        return None
+    if method == "POST" and path.rstrip("/") in ingest_paths:
+        return INGEST
+    # POST /batch - чтение по списку ID, тело используется только для большого списка
+    if method in READ_METHODS or (method == "POST" and path.endswith("/batch")):
+        return READ
+    return ADMIN
+
+
+class AdmissionMiddleware:
+    """ASGI middleware контроля допуска
+
+    Каждый класс маршрутов (прием обращений, чтение, администрирование)
+    ограничен своим лимитером, поэтому перегрузка приема не блокирует
+    чтение и наоборот. Отклоненный запрос получает Retry-After.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiters: Dict[str, AdmissionLimiter],
+        ingest_paths: Iterable[str] = ("/api/v1/contacts",),
+        retry_after: int = 1,
+    ):
+        self.app = app
+        self.limiters = limiters
+        self.ingest_paths = frozenset(p.rstrip("/") for p in ingest_paths)
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify_request(
+            scope["method"], scope["path"], self.ingest_paths
+        )
+        limiter = self.limiters.get(route_class)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        reason = await limiter.acquire()
+        if reason is not None:
+            admission_shed_total.inc(route_class, reason)
+            response = JSONResponse(
+                status_code=limiter.status_code,
+                content={
+                    "success": False,
+                    "message": "Server is overloaded, retry later",
+                    "data": None,
+                },
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
@@ -0,0 +1,66 @@
+"""Периодические фоновые задачи приложения"""
+
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PeriodicTask:
+    """Задача, выполняемая с фиксированным интервалом в event loop"""
+
+    def __init__(
+        self,
+        name: str,
+        interval: float,
+        func: Callable[[], Awaitable[None]],
+    ):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        """Запущена ли задача"""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Запустить задачу"""
+        if self.running:
+            return
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self, timeout: float = 0.0) -> None:
+        """Остановить задачу; текущему запуску дается до timeout секунд"""
+        if self._task is None:
+            return
+        self._stopping.set()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        """Цикл выполнения; ошибки логируются и не останавливают задачу"""
+        while True:
+            # Ожидание интервала прерывается остановкой; запуск func - нет
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.func()
+            except Exception as exc:
+                logger.error(
+                    "Periodic task failed: name=%s, error=%s",
+                    self.name,
+                    exc,
+                    exc_info=True,
+                )
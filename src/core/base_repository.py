@@ -1,14 +1,29 @@
 """Базовый репозиторий для работы с БД"""
 
-from typing import Generic, TypeVar, Optional, List, Type, Any
+from datetime import datetime
+from typing import (
+    Generic,
+    TypeVar,
+    Optional,
+    List,
+    Sequence,
+    Tuple,
+    Type,
+    Any,
+    Collection,
+)
 
 from sqlalchemy import select, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.base_model import BaseModel
+from src.core.fields import projection_options
 
 ModelType = TypeVar("ModelType", bound=BaseModel)
 
+# Размер чанка для WHERE id IN (...), чтобы не упираться в лимит параметров драйвера
+GET_MANY_CHUNK_SIZE = 500
+
 
 class BaseRepository(Generic[ModelType]):
     """Базовый репозиторий с общими методами CRUD"""
@@ -17,20 +32,72 @@ class BaseRepository(Generic[ModelType]):
         self.session = session
         self.model = model
 
-    async def get_by_id(self, id: int) -> Optional[ModelType]:
+    def _select(self, fields: Optional[Collection[str]] = None):
+        """SELECT модели; с fields - только запрошенные колонки и связи"""
+        query = select(self.model)
+        if fields is not None:
+            query = query.options(*projection_options(self.model, fields))
+        return query
+
+    async def get_by_id(
+        self, id: int, fields: Optional[Collection[str]] = None
+    ) -> Optional[ModelType]:
         """Получить запись по ID"""
         result = await self.session.execute(
-            select(self.model).where(self.model.id == id)
+            self._select(fields).where(self.model.id == id)
         )
         return result.scalar_one_or_none()
 
-    async def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
+    async def get_many(
+        self,
+        ids: Sequence[int],
+        fields: Optional[Collection[str]] = None,
+        chunk_size: int = GET_MANY_CHUNK_SIZE,
+    ) -> List[Optional[ModelType]]:
+        """Получить записи по списку ID (в порядке ids, None - не найдена)
+
+        Один SELECT на чанк; с fields - только запрошенные колонки и связи
+        (по запросу на каждую связь в чанке), иначе все selectin-связи модели.
+        """
+        unique_ids = list(dict.fromkeys(ids))
+        found = {}
+        for start in range(0, len(unique_ids), chunk_size):
+            chunk = unique_ids[start : start + chunk_size]
+            result = await self.session.execute(
+                self._select(fields).where(self.model.id.in_(chunk))
+            )
+            found.update((item.id, item) for item in result.scalars().all())
+        return [found.get(id) for id in ids]
+
+    async def get_all(
+        self, skip: int = 0, limit: int = 100, fields: Optional[Collection[str]] = None
+    ) -> List[ModelType]:
         """Получить все записи с пагинацией"""
         result = await self.session.execute(
-            select(self.model).offset(skip).limit(limit)
+            self._select(fields).order_by(self.model.id).offset(skip).limit(limit)
         )
         return list(result.scalars().all())
 
+    async def get_version(self, id: int) -> Optional[Tuple[int, datetime]]:
+        """Получить (id, updated_at) записи без загрузки сущности"""
+        result = await self.session.execute(
+            select(self.model.id, self.model.updated_at).where(self.model.id == id)
+        )
+        row = result.one_or_none()
+        return tuple(row) if row else None
+
+    async def get_versions(
+        self, skip: int = 0, limit: int = 100
+    ) -> List[Tuple[int, datetime]]:
+        """Получить (id, updated_at) страницы записей (та же выборка, что get_all)"""
+        result = await self.session.execute(
+            select(self.model.id, self.model.updated_at)
+            .order_by(self.model.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return [tuple(row) for row in result.all()]
+
     async def create(self, **kwargs: Any) -> ModelType:
         """Создать новую запись"""
         try:
@@ -44,15 +111,17 @@ class BaseRepository(Generic[ModelType]):
             await self.session.rollback()
             raise
 
-    async def update(self, id: int, **kwargs: Any) -> Optional[ModelType]:
-        """Обновить запись"""
+    async def update(
+        self, id: int, *, fields: Optional[Collection[str]] = None, **kwargs: Any
+    ) -> Optional[ModelType]:
+        """Обновить запись (с fields - вернуть только запрошенные поля)"""
         try:
             await self.session.execute(
                 update(self.model).where(self.model.id == id).values(**kwargs)
             )
             await self.session.flush()
             await self.session.commit()
-            return await self.get_by_id(id)
+            return await self.get_by_id(id, fields)
         except Exception:
             await self.session.rollback()
             raise
@@ -0,0 +1,46 @@
+"""Пакетное получение записей по списку ID"""
+
+import math
+from typing import List, Optional, Sequence, Type
+
+from pydantic import BaseModel
+
+from src.core.base_repository import GET_MANY_CHUNK_SIZE
+from src.core.exceptions import ValidationError
+from src.core.fields import FieldSet
+from src.core.schemas import MAX_BATCH_IDS, BatchResponse
+
+# Сколько чанков WHERE id IN (...) выполняется на пакет максимального размера
+MAX_BATCH_CHUNKS = math.ceil(MAX_BATCH_IDS / GET_MANY_CHUNK_SIZE)
+
+
+def batch_budget(queries_per_chunk: int) -> int:
+    """Бюджет SQL-запросов пакетного эндпоинта на пакет максимального размера"""
+    return queries_per_chunk * MAX_BATCH_CHUNKS
+
+
+def batch_fields(schema: Type[BaseModel]) -> FieldSet:
+    """Поля схемы ответа: пакет загружает только их (и только их связи)"""
+    return frozenset(schema.model_fields)
+
+
+def parse_ids(value: str) -> List[int]:
+    """Разобрать параметр ids=1,2,3"""
+    try:
+        ids = [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise ValidationError("ids must be a comma-separated list of integers")
+    if not ids:
+        raise ValidationError("ids must not be empty")
+    if len(ids) > MAX_BATCH_IDS:
+        raise ValidationError(f"Too many ids: maximum is {MAX_BATCH_IDS}")
+    return ids
+
+
+def batch_response(
+    ids: Sequence[int], rows: Sequence[Optional[object]], schema: Type[BaseModel]
+) -> BatchResponse:
+    """Собрать ответ пакетного получения в порядке запрошенных ID"""
+    items = [schema.model_validate(row) if row is not None else None for row in rows]
+    not_found = list(dict.fromkeys(id for id, row in zip(ids, rows) if row is None))
+    return BatchResponse(items=items, not_found=not_found)
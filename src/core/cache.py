@@ -0,0 +1,214 @@
+"""In-process кеш ответов с TTL и stale-while-revalidate"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, TypeVar
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.exceptions import NotFoundError
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+Loader = Callable[[AsyncSession], Awaitable[T]]
+
+
+@dataclass
+class CacheEntry:
+    """Запись кеша"""
+
+    value: Any
+    stored_at: float
+    ttl: float
+
+
+class ResponseCache:
+    """Кеш ответов сервисов с LRU-вытеснением и фоновым обновлением
+
+    Состояния записи по возрасту:
+    - свежая (age < ttl) - отдается сразу;
+    - устаревшая (age < ttl + stale_ttl) - отдается сразу, в фоне запускается
+      обновление в отдельной сессии;
+    - просроченная - загружается синхронно, но при ошибке или таймауте БД
+      отдается старое значение, если ему не больше ttl + stale_if_error.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 5.0,
+        stale_ttl: float = 30.0,
+        stale_if_error: float = 300.0,
+        load_timeout: float = 2.0,
+        enabled: bool = True,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.stale_if_error = stale_if_error
+        self.load_timeout = load_timeout
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refreshing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Loader,
+        session: AsyncSession,
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """Получить значение из кеша или загрузить через loader"""
+        if not self.enabled:
+            return await loader(session)
+
+        ttl = self.ttl if ttl is None else ttl
+        entry = self._entries.get(key)
+        now = time.monotonic()
+
+        if entry is not None:
+            age = now - entry.stored_at
+            if age < entry.ttl:
+                self._entries.move_to_end(key)
+                return entry.value
+            if age < entry.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self._schedule_refresh(key, loader, session, ttl)
+                return entry.value
+
+        # Single-flight: параллельные запросы одного ключа ждут одну загрузку
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load(key, loader, session, ttl, entry)
+        except BaseException as exc:
+            if not future.done():
+                future.set_exception(exc)
+                # Исключение получат ожидающие, если они есть
+                future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _load(
+        self,
+        key: str,
+        loader: Loader,
+        session: AsyncSession,
+        ttl: float,
+        previous: Optional[CacheEntry],
+    ) -> Any:
+        """Синхронная загрузка с откатом на старое значение при сбое БД"""
+        generation = self._generation
+        try:
+            value = await asyncio.wait_for(loader(session), timeout=self.load_timeout)
+        except (SQLAlchemyError, asyncio.TimeoutError, OSError) as exc:
+            if previous is not None and (
+                time.monotonic() - previous.stored_at
+                < previous.ttl + self.stale_if_error
+            ):
+                logger.warning(
+                    "Serving stale cache entry: key=%s, error=%s",
+                    key,
+                    type(exc).__name__,
+                )
+                return previous.value
+            raise
+        if generation == self._generation:
+            self._store(key, value, ttl)
+        return value
+
+    def _schedule_refresh(
+        self, key: str, loader: Loader, session: AsyncSession, ttl: float
+    ) -> None:
+        """Запустить фоновое обновление ключа, если оно еще не идет"""
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.create_task(self._refresh(key, loader, session.bind, ttl))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, key: str, loader: Loader, bind: Any, ttl: float) -> None:
+        """Фоновое обновление в собственной сессии (сессия запроса будет закрыта)"""
+        generation = self._generation
+        try:
+            async with AsyncSession(bind=bind, expire_on_commit=False) as session:
+                value = await asyncio.wait_for(
+                    loader(session), timeout=self.load_timeout
+                )
+            if generation == self._generation and key in self._entries:
+                self._store(key, value, ttl)
+        except NotFoundError:
+            self._entries.pop(key, None)
+        except Exception as exc:
+            logger.warning(
+                "Background cache refresh failed: key=%s, error=%s",
+                key,
+                type(exc).__name__,
+            )
+        finally:
+            self._refreshing.discard(key)
+
+    def _store(self, key: str, value: Any, ttl: float) -> None:
+        """Сохранить значение с вытеснением самых старых записей"""
+        self._entries[key] = CacheEntry(
+            value=value, stored_at=time.monotonic(), ttl=ttl
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        """Удалить ключ из кеша"""
+        self._generation += 1
+        self._entries.pop(key, None)
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        """Удалить все ключи с указанным префиксом"""
+        self._generation += 1
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            del self._entries[key]
+
+    async def drain(self, timeout: float) -> None:
+        """Дождаться фоновых обновлений (при остановке), остальные отменить"""
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+
+    def clear(self) -> None:
+        """Очистить кеш"""
+        self._generation += 1
+        self._entries.clear()
+
+
+response_cache = ResponseCache(
+    max_size=settings.cache_max_size,
+    ttl=settings.cache_ttl_seconds,
+    stale_ttl=settings.cache_stale_ttl_seconds,
+    stale_if_error=settings.cache_stale_if_error_seconds,
+    load_timeout=settings.cache_load_timeout_seconds,
+    enabled=settings.cache_enabled,
+)
@@ -0,0 +1,241 @@
+"""Сжатие ответов (gzip, brotli и zstd при наличии библиотек)"""
+
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - опциональная зависимость
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - опциональная зависимость
+    zstandard = None
+
+
+class Compressor(Protocol):
+    """Инкрементальный компрессор"""
+
+    def compress(self, data: bytes) -> bytes:
+        """Сжать чанк и сбросить буфер, чтобы клиент получил данные сразу"""
+
+    def finish(self) -> bytes:
+        """Завершить поток"""
+
+
+class GzipCompressor:
+    """gzip через zlib"""
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    """brotli (пакет brotli)"""
+
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor:
+    """zstd (пакет zstandard)"""
+
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+# Кодировки в порядке предпочтения при равном q и уровни сжатия по умолчанию
+ENCODINGS: Dict[str, Callable[[int], Compressor]] = {
+    "br": BrotliCompressor,
+    "zstd": ZstdCompressor,
+    "gzip": GzipCompressor,
+}
+DEFAULT_LEVELS: Dict[str, int] = {"br": 4, "zstd": 3, "gzip": 6}
+
+
+def available_encodings() -> List[str]:
+    """Кодировки, для которых установлены библиотеки"""
+    encodings = ["gzip"]
+    if zstandard is not None:
+        encodings.insert(0, "zstd")
+    if brotli is not None:
+        encodings.insert(0, "br")
+    return encodings
+
+
+def select_encoding(accept_encoding: str, encodings: Iterable[str]) -> Optional[str]:
+    """Выбрать кодировку по Accept-Encoding с учетом q-значений"""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionMiddleware:
+    """ASGI middleware сжатия ответов
+
+    Сжимаются только ответы с разрешенным content-type и телом не меньше
+    minimum_size. Для потоковых ответов (StreamingResponse) первые чанки
+    буферизуются до порога: короткий поток уходит как есть, длинный
+    сжимается по чанкам со сбросом буфера компрессора, чтобы клиент получал
+    данные по мере генерации, а память не росла с размером ответа.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        content_types: Iterable[str] = ("application/json",),
+        encodings: Optional[Iterable[str]] = None,
+        levels: Optional[Dict[str, int]] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_types)
+        supported = available_encodings()
+        self.encodings = [
+            e for e in (encodings or supported) if e in supported and e in ENCODINGS
+        ]
+        self.levels = {**DEFAULT_LEVELS, **(levels or {})}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = select_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.encodings
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Состояние сжатия одного ответа"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self._start: Optional[Message] = None
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        self._compressor: Optional[Compressor] = None
+        self._passthrough = False
+
+    def _should_compress(self, headers: Headers, status: int) -> bool:
+        """Подходит ли ответ для сжатия по заголовкам"""
+        if status < 200 or status in (204, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return content_type.startswith(self.middleware.content_types)
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self._passthrough = not self._should_compress(headers, message["status"])
+            if self._passthrough:
+                await self._send(message)
+            else:
+                self._start = message
+            return
+
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._compressor is not None:
+            chunk = self._compressor.compress(body) if body else b""
+            if not more_body:
+                chunk += self._compressor.finish()
+            await self._send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
+            return
+
+        self._buffer.append(body)
+        self._buffered += len(body)
+        if more_body and self._buffered < self.middleware.minimum_size:
+            return
+
+        data = b"".join(self._buffer)
+        self._buffer = []
+        if self._buffered < self.middleware.minimum_size:
+            # Ответ закончился раньше порога - отдаем без сжатия
+            await self._send(self._start)
+            await self._send(
+                {"type": "http.response.body", "body": data, "more_body": False}
+            )
+            return
+
+        self._compressor = ENCODINGS[self.encoding](
+            self.middleware.levels[self.encoding]
+        )
+        headers = MutableHeaders(raw=self._start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if more_body:
+            del headers["Content-Length"]
+            await self._send(self._start)
+            await self._send(
+                {
+                    "type": "http.response.body",
+                    "body": self._compressor.compress(data),
+                    "more_body": True,
+                }
+            )
+            return
+
+        compressed = self._compressor.compress(data) + self._compressor.finish()
+        headers["Content-Length"] = str(len(compressed))
+        await self._send(self._start)
+        await self._send(
+            {"type": "http.response.body", "body": compressed, "more_body": False}
+        )
@@ -0,0 +1,130 @@
+"""Условные GET-запросы: ETag и Last-Modified по updated_at"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+from fastapi import Request, status
+from starlette.responses import Response
+
+from src.core.responses import StandardJSONResponse
+
+Version = Tuple[int, datetime]
+
+
+def make_etag(
+    versions: Iterable[Version], fields: Optional[Iterable[str]] = None
+) -> str:
+    """Слабый ETag по набору пар (id, updated_at) и набору полей ответа"""
+    digest = hashlib.blake2b(digest_size=16)
+    if fields is not None:
+        digest.update(f"fields={','.join(sorted(fields))};".encode())
+    for id, updated_at in versions:
+        digest.update(f"{id}:{updated_at.isoformat()};".encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+def last_modified(versions: Sequence[Version]) -> Optional[datetime]:
+    """Время последнего изменения набора записей"""
+    if not versions:
+        return None
+    return max(updated_at for _, updated_at in versions)
+
+
+def _http_date(value: datetime) -> str:
+    """Форматировать время (UTC без tzinfo) как HTTP-date"""
+    return format_datetime(value.replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def validator_headers(
+    versions: Sequence[Version], fields: Optional[Iterable[str]] = None
+) -> Dict[str, str]:
+    """Заголовки ETag и Last-Modified для набора записей"""
+    headers = {"ETag": make_etag(versions, fields)}
+    modified = last_modified(versions)
+    if modified is not None:
+        headers["Last-Modified"] = _http_date(modified)
+    return headers
+
+
+def is_not_modified(
+    request: Request,
+    versions: Sequence[Version],
+    fields: Optional[Iterable[str]] = None,
+) -> bool:
+    """Проверить, актуальна ли у клиента копия (If-None-Match / If-Modified-Since)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return bool(versions)
+        etag = make_etag(versions, fields)
+        # Слабое сравнение: префикс W/ не учитывается
+        candidates = {
+            tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+        }
+        return etag.removeprefix("W/") in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    modified = last_modified(versions)
+    if if_modified_since is None or modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP-date имеет точность до секунды
+    return modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+
+def cached_conditional_response(
+    request: Request,
+    versions: Sequence[Version],
+    data: Any,
+    data_type: Any,
+    fields: Optional[Iterable[str]] = None,
+) -> Response:
+    """Ответить 304 или отдать данные по одной записи кеша
+
+    versions и data берутся из одной записи кеша, поэтому валидаторы всегда
+    соответствуют отданному телу: пока кеш отдает устаревшие данные, клиент
+    получает их ETag, а после обновления записи - новый. Сверка со свежими
+    версиями из БД здесь не годится: устаревшее тело получило бы свежий
+    ETag, и клиент подтверждал бы его 304 бесконечно.
+    """
+    headers = validator_headers(versions, fields)
+    if is_not_modified(request, versions, fields):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return StandardJSONResponse(data, data_type, headers=headers)
+
+
+async def conditional_response(
+    request: Request,
+    versions: Sequence[Version],
+    loader: Callable[[], Awaitable[Any]],
+    data_type: Any,
+    fields: Optional[Iterable[str]] = None,
+) -> Response:
+    """Ответить 304 по дешевому запросу версий или загрузить и отдать данные
+
+    Валидаторы в полном ответе считаются по отданным данным, а не по
+    versions: если данные пришли из кеша с задержкой, клиент получит ETag
+    именно этой версии и при следующем запросе перезапросит актуальную.
+    Частичный ответ (fields) без updated_at валидируется по versions, а набор
+    полей входит в ETag, чтобы ответы с разными fields не совпадали.
+    """
+    if is_not_modified(request, versions, fields):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers=validator_headers(versions, fields),
+        )
+
+    data = await loader()
+    items = data if isinstance(data, list) else [data]
+    if fields is None or "updated_at" in fields:
+        versions = [(item.id, item.updated_at) for item in items]
+    return StandardJSONResponse(
+        data, data_type, headers=validator_headers(versions, fields)
+    )
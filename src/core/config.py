@@ -1,5 +1,7 @@
 """Конфигурация приложения"""
 
+from typing import Dict, List, Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -10,6 +12,132 @@ class Settings(BaseSettings):
     project_name: str = "Mini CRM Leads"
     debug: bool = False
 
+    # Логи: json или text; запись в stdout идет из отдельного потока через
+    # очередь (при переполнении записи отбрасываются)
+    log_format: str = "json"
+    log_queue_size: int = 10000
+    # Префикс логгера -> сколько записей одного шаблона сообщения в секунду
+    # пропускать (ошибки не ограничиваются)
+    log_sampling: Dict[str, int] = {"src.domains.contacts.service": 10}
+    # Заголовок с ID запроса (принимается от клиента или генерируется)
+    request_id_header: str = "X-Request-ID"
+
+    # Сериализация ответов напрямую через pydantic-core без повторной валидации
+    fast_json_responses: bool = True
+
+    # Кеш ответов (статистика и справочные данные)
+    cache_enabled: bool = True
+    cache_max_size: int = 1024
+    cache_ttl_seconds: float = 5.0
+    cache_stale_ttl_seconds: float = 30.0
+    cache_stale_if_error_seconds: float = 300.0
+    cache_load_timeout_seconds: float = 2.0
+
+    # Метрики запросов на /metrics
+    metrics_enabled: bool = True
+
+    # Учет SQL-запросов на HTTP-запрос (X-Query-Count, поиск N+1, бюджеты эндпоинтов)
+    query_budget_enabled: bool = False
+    query_budget_strict: bool = False
+    query_repeat_threshold: int = 5
+
+    # Контроль допуска: лимит одновременных запросов и длина очереди по классам
+    # маршрутов (прием обращений / чтение / администрирование)
+    admission_enabled: bool = True
+    admission_ingest_paths: List[str] = ["/api/v1/contacts"]
+    admission_ingest_concurrency: int = 32
+    admission_ingest_queue: int = 64
+    admission_read_concurrency: int = 64
+    admission_read_queue: int = 128
+    admission_admin_concurrency: int = 8
+    admission_admin_queue: int = 16
+    admission_queue_timeout_seconds: float = 1.0
+    admission_retry_after_seconds: int = 1
+
+    # Сжатие ответов (br/zstd используются, если установлены brotli/zstandard)
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_encodings: List[str] = ["br", "zstd", "gzip"]
+    compression_content_types: List[str] = [
+        "application/json",
+        "application/x-ndjson",
+        "text/csv",
+        "text/plain",
+    ]
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_zstd_level: int = 3
+
+    # Сколько последних обращений отдает /leads/{id}/with-contacts (остальные -
+    # через постраничный /leads/{id}/contacts)
+    lead_contacts_preview_limit: int = 20
+
+    # Ключи идемпотентности POST /api/v1/contacts: "memory" (в процессе) или
+    # "database" (таблица idempotency_keys, общая для нескольких воркеров)
+    idempotency_backend: str = "memory"
+    idempotency_ttl_seconds: float = 86400.0
+    idempotency_max_keys: int = 10000
+    idempotency_wait_timeout_seconds: float = 10.0
+    idempotency_purge_interval_seconds: float = 300.0
+
+    # Шина инвалидации кешей между воркерами: loopback (в пределах процесса)
+    # или postgres (LISTEN/NOTIFY, нужен при нескольких воркерах). Публикация
+    # на пути записи ограничена invalidation_publish_timeout_seconds; после
+    # сбоя она invalidation_reconnect_seconds не пытается подключиться снова
+    invalidation_backend: str = "loopback"
+    invalidation_channel: str = "mini_crm_cache_invalidation"
+    invalidation_reconnect_seconds: float = 1.0
+    invalidation_publish_timeout_seconds: float = 1.0
+
+    # Плавная остановка: сколько ждать выполняющихся запросов, затем фоновых
+    # задач и записи логов, прежде чем закрыть пул соединений
+    shutdown_drain_timeout_seconds: float = 20.0
+    shutdown_background_timeout_seconds: float = 5.0
+    # Сколько после SIGTERM еще принимать соединения в режиме draining (/ready
+    # - 503, запросы к /api/ - 503), чтобы балансировщик успел снять трафик;
+    # действует при запуске через python -m src.server
+    shutdown_drain_delay_seconds: float = 5.0
+
+    # Прогрев после старта (соединения пула, SQL горячего пути, снимок нагрузки,
+    # сериализаторы ответов); пока не открыты соединения пула и не выполнен SQL
+    # приема обращений, /ready отвечает 503, а эти шаги повторяются каждые
+    # warmup_retry_seconds. warmup_timeout_seconds - таймаут одного шага
+    warmup_enabled: bool = True
+    warmup_pool_connections: int = 5
+    warmup_timeout_seconds: float = 30.0
+    warmup_retry_seconds: float = 2.0
+
+    # На сколько дней вперед смены операторов разворачиваются в ленту переходов
+    shift_schedule_horizon_days: float = 7.0
+
+    # Автозакрытие простаивающих обращений: таймаут для источников без своего
+    # idle_timeout_minutes (None - не закрывать), интервал прохода и размер
+    # пачки UPDATE; за проход закрывается не больше batch_size * max_batches
+    contact_idle_timeout_minutes: Optional[int] = None
+    stale_contact_sweep_interval_seconds: float = 60.0
+    stale_contact_batch_size: int = 1000
+    stale_contact_max_batches: int = 20
+
+    # Переназначать активные обращения оператора другим операторам источников
+    # при его отключении (is_active=false) или удалении
+    operator_redistribute_on_deactivate: bool = True
+
+    # Ребалансировка: перенос обращений с операторов выше load_limit и (при
+    # shares) с тех, у кого обращений источника больше доли веса с допуском
+    # tolerance и не меньше чем на min_surplus; не больше max_moves за
+    # проход, пачками с паузой. Выравнивание долей выключено по умолчанию:
+    # оно передает идущие разговоры другому оператору
+    operator_rebalance_interval_seconds: float = 60.0
+    operator_rebalance_shares: bool = False
+    operator_rebalance_share_tolerance: float = 0.5
+    operator_rebalance_min_surplus: int = 5
+    operator_rebalance_max_moves: int = 500
+    operator_rebalance_batch_size: int = 100
+    operator_rebalance_batch_pause_seconds: float = 0.5
+
+    # Интервал сверки снимка нагрузки операторов с БД
+    operator_load_reconcile_interval_seconds: float = 30.0
+
     class Config:
         env_file = ".env"
         case_sensitive = False
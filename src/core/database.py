@@ -6,10 +6,12 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 from sqlalchemy.orm import declarative_base
 
 from src.core.config import settings
+from src.core.metrics import instrument_engine
 
 database_url = settings.database_url
 
 engine = create_async_engine(database_url, echo=False, future=True)
+instrument_engine(engine.sync_engine)
 
 AsyncSessionLocal = async_sessionmaker(
     engine,
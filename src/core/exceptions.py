@@ -5,7 +5,9 @@ from fastapi import Request, status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import IntegrityError, OperationalError, DatabaseError
-from src.utils.logger import logger
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class BaseAppException(Exception):
@@ -31,6 +33,13 @@ class ValidationError(BaseAppException):
         super().__init__(message, status.HTTP_422_UNPROCESSABLE_ENTITY)
 
 
+class ConflictError(BaseAppException):
+    """Ошибка - операция конфликтует с текущим состоянием ресурса"""
+
+    def __init__(self, message: str):
+        super().__init__(message, status.HTTP_409_CONFLICT)
+
+
 def _extract_integrity_error_message(exc: IntegrityError) -> str:
     """Извлечь понятное сообщение из ошибки целостности БД"""
     error_message = str(exc.orig) if exc.orig else str(exc)
@@ -82,7 +91,7 @@ async def integrity_error_handler(
     """Обработчик ошибок целостности БД"""
     message = _extract_integrity_error_message(exc)
     logger.warning(
-        f"Database integrity error: {str(exc.orig) if exc.orig else str(exc)}"
+        "Database integrity error: %s", str(exc.orig) if exc.orig else str(exc)
     )
     return JSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
@@ -92,7 +101,7 @@ async def integrity_error_handler(
 
 async def database_error_handler(request: Request, exc: DatabaseError) -> JSONResponse:
     """Обработчик общих ошибок БД"""
-    logger.error(f"Database error: {str(exc)}", exc_info=True)
+    logger.error("Database error: %s", exc, exc_info=True)
     return JSONResponse(
         status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
         content={
@@ -107,7 +116,7 @@ async def operational_error_handler(
     request: Request, exc: OperationalError
 ) -> JSONResponse:
     """Обработчик операционных ошибок БД"""
-    logger.error(f"Database operational error: {str(exc)}", exc_info=True)
+    logger.error("Database operational error: %s", exc, exc_info=True)
     return JSONResponse(
         status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
         content={
@@ -121,7 +130,9 @@ async def operational_error_handler(
 async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     """Глобальный обработчик всех необработанных исключений"""
     logger.error(
-        f"Unhandled exception: {type(exc).__name__}: {str(exc)}",
+        "Unhandled exception: %s: %s",
+        type(exc).__name__,
+        exc,
         exc_info=True,
         extra={"path": request.url.path, "method": request.method},
     )
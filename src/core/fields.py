@@ -0,0 +1,66 @@
+"""Частичные ответы (sparse fieldsets): ?fields=id,is_active,lead"""
+
+from functools import lru_cache
+from typing import Collection, FrozenSet, List, Optional, Type
+
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, noload, selectinload
+
+from src.core.exceptions import ValidationError
+
+FieldSet = FrozenSet[str]
+
+
+def parse_fields(value: Optional[str], schema: Type[BaseModel]) -> Optional[FieldSet]:
+    """Разобрать параметр fields по полям схемы ответа (id включается всегда)"""
+    if value is None:
+        return None
+    fields = {part.strip() for part in value.split(",") if part.strip()}
+    unknown = fields - schema.model_fields.keys()
+    if unknown:
+        raise ValidationError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return frozenset(fields | {"id"})
+
+
+@lru_cache(maxsize=None)
+def partial_schema(schema: Type[BaseModel], fields: FieldSet) -> Type[BaseModel]:
+    """Схема ответа только с запрошенными полями (кешируется по набору полей)"""
+    definitions = {
+        name: (info.annotation, info)
+        for name, info in schema.model_fields.items()
+        if name in fields
+    }
+    return create_model(
+        f"{schema.__name__}Partial",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions,
+    )
+
+
+def response_schema(
+    schema: Type[BaseModel], fields: Optional[FieldSet]
+) -> Type[BaseModel]:
+    """Схема ответа с учетом fields"""
+    return schema if fields is None else partial_schema(schema, fields)
+
+
+def projection_options(model: type, fields: Collection[str]) -> List:
+    """Опции загрузки ORM: только запрошенные колонки и связи
+
+    Незапрошенные связи не загружаются вовсе (в моделях они selectin), у
+    запрошенных не загружаются собственные связи - вложенные схемы ответа
+    содержат только колонки.
+    """
+    mapper = inspect(model)
+    column_keys = mapper.column_attrs.keys()
+    options = [
+        load_only(*(getattr(model, name) for name in fields if name in column_keys))
+    ]
+    for relationship in mapper.relationships:
+        attribute = getattr(model, relationship.key)
+        if relationship.key in fields:
+            options.append(selectinload(attribute).noload("*"))
+        else:
+            options.append(noload(attribute))
+    return options
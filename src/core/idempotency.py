@@ -0,0 +1,305 @@
+"""Идемпотентность POST-запросов по заголовку Idempotency-Key"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Protocol
+
+from fastapi import status
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.responses import Response
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal, Base
+from src.core.exceptions import BaseAppException, ValidationError
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MAX_KEY_LENGTH = 255
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotencyKey(Base):
+    """Сохраненный результат запроса с ключом идемпотентности"""
+
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(MAX_KEY_LENGTH), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)  # NULL - запрос еще выполняется
+    media_type = Column(String, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+@dataclass
+class IdempotencyRecord:
+    """Запись хранилища ключей"""
+
+    fingerprint: str
+    status_code: Optional[int] = None
+    media_type: Optional[str] = None
+    body: Optional[bytes] = None
+
+    @property
+    def completed(self) -> bool:
+        """Сохранен ли ответ"""
+        return self.status_code is not None
+
+
+class IdempotencyStore(Protocol):
+    """Хранилище ключей идемпотентности"""
+
+    async def claim(
+        self, key: str, fingerprint: str, ttl: float
+    ) -> Optional[IdempotencyRecord]:
+        """Занять ключ; вернуть существующую запись или None, если ключ занят нами"""
+
+    async def complete(self, key: str, record: IdempotencyRecord) -> None:
+        """Сохранить ответ"""
+
+    async def release(self, key: str) -> None:
+        """Освободить ключ (запрос завершился ошибкой и может быть повторен)"""
+
+    async def purge_expired(self) -> int:
+        """Удалить просроченные ключи"""
+
+
+class MemoryIdempotencyStore:
+    """In-process хранилище с TTL и LRU-ограничением размера"""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._records: "OrderedDict[str, tuple[IdempotencyRecord, float]]" = (
+            OrderedDict()
+        )
+
+    async def claim(
+        self, key: str, fingerprint: str, ttl: float
+    ) -> Optional[IdempotencyRecord]:
+        now = time.monotonic()
+        item = self._records.get(key)
+        if item is not None and item[1] > now:
+            self._records.move_to_end(key)
+            return item[0]
+        self._records[key] = (IdempotencyRecord(fingerprint), now + ttl)
+        self._records.move_to_end(key)
+        while len(self._records) > self.max_size:
+            self._records.popitem(last=False)
+        return None
+
+    async def complete(self, key: str, record: IdempotencyRecord) -> None:
+        item = self._records.get(key)
+        if item is not None:
+            self._records[key] = (record, item[1])
+
+    async def release(self, key: str) -> None:
+        self._records.pop(key, None)
+
+    async def purge_expired(self) -> int:
+        now = time.monotonic()
+        expired = [key for key, (_, expires) in self._records.items() if expires <= now]
+        for key in expired:
+            del self._records[key]
+        return len(expired)
+
+    def clear(self) -> None:
+        """Очистить хранилище"""
+        self._records.clear()
+
+
+class DatabaseIdempotencyStore:
+    """Хранилище в таблице idempotency_keys (общее для нескольких воркеров)"""
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+
+    async def claim(
+        self, key: str, fingerprint: str, ttl: float
+    ) -> Optional[IdempotencyRecord]:
+        now = datetime.utcnow()
+        async with self.session_factory() as session:
+            # Просроченный ключ освобождаем, чтобы его можно было занять заново
+            await session.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.key == key, IdempotencyKey.expires_at <= now
+                )
+            )
+            session.add(
+                IdempotencyKey(
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=now + timedelta(seconds=ttl),
+                )
+            )
+            try:
+                await session.commit()
+                return None
+            except IntegrityError:
+                await session.rollback()
+
+            row = await session.get(IdempotencyKey, key)
+            if row is None:
+                # Ключ освобожден между вставкой и чтением - считаем занятым
+                return IdempotencyRecord(fingerprint)
+            return IdempotencyRecord(
+                row.fingerprint, row.status_code, row.media_type, row.body
+            )
+
+    async def complete(self, key: str, record: IdempotencyRecord) -> None:
+        async with self.session_factory() as session:
+            row = await session.get(IdempotencyKey, key)
+            if row is not None:
+                row.status_code = record.status_code
+                row.media_type = record.media_type
+                row.body = record.body
+                await session.commit()
+
+    async def release(self, key: str) -> None:
+        async with self.session_factory() as session:
+            await session.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.key == key)
+            )
+            await session.commit()
+
+    async def purge_expired(self) -> int:
+        async with self.session_factory() as session:
+            result = await session.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.expires_at <= datetime.utcnow()
+                )
+            )
+            await session.commit()
+            return result.rowcount
+
+
+def request_fingerprint(body: bytes) -> str:
+    """Отпечаток тела запроса"""
+    return hashlib.sha256(body).hexdigest()
+
+
+class Idempotency:
+    """Выполнение запросов с ключом идемпотентности
+
+    Первый запрос с ключом выполняется, его ответ сохраняется на ttl секунд;
+    повторы получают сохраненный ответ с заголовком Idempotent-Replayed.
+    Повторы, пришедшие в этот же процесс, пока первый запрос выполняется,
+    ждут его завершения (single-flight); если первый запрос выполняет другой
+    воркер, повтор получает 409. Запрос, завершившийся исключением или 5xx,
+    не сохраняется и может быть повторен.
+    """
+
+    def __init__(
+        self, store: IdempotencyStore, ttl: float = 86400.0, wait_timeout: float = 10.0
+    ):
+        self.store = store
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def execute(
+        self,
+        key: Optional[str],
+        scope: str,
+        body: bytes,
+        handler: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        """Выполнить handler не более одного раза для ключа"""
+        if key is None:
+            return await handler()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise ValidationError(
+                f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters long"
+            )
+
+        store_key = f"{scope}:{key}"
+        fingerprint = request_fingerprint(body)
+
+        while True:
+            inflight = self._inflight.get(store_key)
+            if inflight is None:
+                break
+            try:
+                await asyncio.wait_for(asyncio.shield(inflight), self.wait_timeout)
+            except asyncio.TimeoutError:
+                raise self._in_progress_error()
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[store_key] = future
+        try:
+            existing = await self.store.claim(store_key, fingerprint, self.ttl)
+            if existing is not None:
+                return self._replay(existing, fingerprint)
+
+            try:
+                response = await handler()
+            except BaseException:
+                await self.store.release(store_key)
+                raise
+
+            if response.status_code >= 500:
+                await self.store.release(store_key)
+                return response
+            await self.store.complete(
+                store_key,
+                IdempotencyRecord(
+                    fingerprint,
+                    response.status_code,
+                    response.media_type,
+                    response.body,
+                ),
+            )
+            return response
+        finally:
+            del self._inflight[store_key]
+            future.set_result(None)
+
+    def _replay(self, record: IdempotencyRecord, fingerprint: str) -> Response:
+        """Ответ для повторного запроса"""
+        if record.fingerprint != fingerprint:
+            raise ValidationError(
+                "Idempotency-Key was already used with a different request body"
+            )
+        if not record.completed:
+            raise self._in_progress_error()
+        return Response(
+            content=record.body,
+            status_code=record.status_code,
+            media_type=record.media_type,
+            headers={REPLAYED_HEADER: "true"},
+        )
+
+    @staticmethod
+    def _in_progress_error() -> BaseAppException:
+        """Ошибка: запрос с этим ключом еще выполняется"""
+        return BaseAppException(
+            "A request with this Idempotency-Key is still in progress",
+            status.HTTP_409_CONFLICT,
+        )
+
+    async def purge_expired(self) -> None:
+        """Удалить просроченные ключи"""
+        purged = await self.store.purge_expired()
+        if purged:
+            logger.info("Idempotency keys purged: count=%s", purged)
+
+
+def _create_store() -> IdempotencyStore:
+    """Хранилище ключей по настройкам"""
+    if settings.idempotency_backend == "database":
+        return DatabaseIdempotencyStore(AsyncSessionLocal)
+    return MemoryIdempotencyStore(settings.idempotency_max_keys)
+
+
+idempotency = Idempotency(
+    _create_store(),
+    ttl=settings.idempotency_ttl_seconds,
+    wait_timeout=settings.idempotency_wait_timeout_seconds,
+)
@@ -0,0 +1,334 @@
+"""Шина инвалидации кешей между воркерами (Postgres LISTEN/NOTIFY)"""
+
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterable, Optional, Protocol, Set, Tuple
+
+from sqlalchemy.engine import make_url
+
+from src.core.cache import response_cache
+from src.core.config import settings
+from src.core.metrics import registry
+from src.domains.operators.load_snapshot import operator_load_snapshot
+from src.domains.operators.schedule import shift_schedule
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+invalidation_events_total = registry.counter(
+    "cache_invalidation_events_total",
+    "Cache invalidation events published and received",
+    ("direction",),
+)
+invalidation_lag_seconds = registry.histogram(
+    "cache_invalidation_lag_seconds",
+    "Delay between publishing an invalidation event and applying it",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+
+
+@dataclass(frozen=True)
+class InvalidationEvent:
+    """Событие изменения данных: какие ключи кеша вытеснить"""
+
+    origin: str
+    keys: Tuple[str, ...] = ()
+    prefixes: Tuple[str, ...] = ()
+    # Изменились операторы или веса - снимок нагрузки нужно пересобрать
+    operator_load: bool = False
+    # Изменились смены операторов - расписание нужно загрузить заново
+    schedule: bool = False
+    sent_at: float = 0.0
+
+    def encode(self) -> str:
+        """Сериализовать в payload NOTIFY (лимит Postgres - 8000 байт)"""
+        return json.dumps(
+            {
+                "o": self.origin,
+                "k": self.keys,
+                "p": self.prefixes,
+                "l": self.operator_load,
+                "s": self.schedule,
+                "t": self.sent_at,
+            },
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def decode(cls, payload: str) -> "InvalidationEvent":
+        """Разобрать payload NOTIFY"""
+        data = json.loads(payload)
+        return cls(
+            origin=data["o"],
+            keys=tuple(data.get("k", ())),
+            prefixes=tuple(data.get("p", ())),
+            operator_load=bool(data.get("l", False)),
+            schedule=bool(data.get("s", False)),
+            sent_at=float(data.get("t", 0.0)),
+        )
+
+
+class InvalidationBackend(Protocol):
+    """Транспорт событий между воркерами"""
+
+    async def publish(self, payload: str) -> None:
+        """Отправить событие всем воркерам"""
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        """Подписаться; поток завершается исключением при потере соединения"""
+
+    async def close(self) -> None:
+        """Закрыть соединения"""
+
+
+class LoopbackInvalidationBackend:
+    """Доставка в пределах процесса (SQLite, тесты, один воркер)
+
+    Несколько шин с одним экземпляром backend ведут себя как воркеры,
+    подписанные на один канал.
+    """
+
+    def __init__(self) -> None:
+        self._queues: Set[asyncio.Queue] = set()
+
+    async def publish(self, payload: str) -> None:
+        """Положить событие в очереди всех подписчиков"""
+        for queue in self._queues:
+            queue.put_nowait(payload)
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        """Подписаться на события"""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._queues.add(queue)
+        return self._iterate(queue)
+
+    async def _iterate(self, queue: asyncio.Queue) -> AsyncIterator[str]:
+        """События из очереди подписчика"""
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._queues.discard(queue)
+
+    async def close(self) -> None:
+        """Соединений нет"""
+
+
+class PostgresInvalidationBackend:
+    """LISTEN/NOTIFY на отдельных соединениях asyncpg (вне пула SQLAlchemy)
+
+    Слушающее соединение держится все время работы воркера, поэтому не
+    занимает соединение пула; публикация идет через второе соединение, чтобы
+    не ждать освобождения пула на пути записи. Публикация стоит на пути
+    каждого изменяющего запроса, поэтому ожидание соединения, подключение и
+    pg_notify ограничены publish_timeout, а после сбоя публикации в течение
+    retry_delay сразу отказывают, не подключаясь заново.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str,
+        publish_timeout: float = 1.0,
+        retry_delay: float = 1.0,
+    ) -> None:
+        self.dsn = dsn
+        self.channel = channel
+        self.publish_timeout = publish_timeout
+        self.retry_delay = retry_delay
+        self._publisher = None
+        self._publish_lock = asyncio.Lock()
+        self._retry_at = 0.0
+
+    async def publish(self, payload: str) -> None:
+        """pg_notify на соединении публикации (переоткрывается после сбоя)"""
+        import asyncpg
+
+        self._check_backoff()
+        await asyncio.wait_for(self._publish_lock.acquire(), self.publish_timeout)
+        try:
+            # Пока ждали блокировку, публикация могла только что упасть
+            self._check_backoff()
+            if self._publisher is None or self._publisher.is_closed():
+                self._publisher = await asyncpg.connect(
+                    self.dsn, timeout=self.publish_timeout
+                )
+            await self._publisher.execute(
+                "SELECT pg_notify($1, $2)",
+                self.channel,
+                payload,
+                timeout=self.publish_timeout,
+            )
+        except (
+            asyncpg.PostgresError,
+            asyncpg.InterfaceError,
+            OSError,
+            asyncio.TimeoutError,
+        ):
+            self._retry_at = time.monotonic() + self.retry_delay
+            if self._publisher is not None:
+                # Без ожидания: close() ждал бы ответа сервера под блокировкой
+                self._publisher.terminate()
+                self._publisher = None
+            raise
+        finally:
+            self._publish_lock.release()
+
+    def _check_backoff(self) -> None:
+        """Отказать сразу, если публикация недавно упала"""
+        if time.monotonic() < self._retry_at:
+            raise ConnectionError("publisher is unavailable after a recent failure")
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        """LISTEN на канале; разрыв соединения завершает поток исключением"""
+        import asyncpg
+
+        queue: asyncio.Queue = asyncio.Queue()
+        connection = await asyncpg.connect(self.dsn)
+        connection.add_termination_listener(
+            lambda _: queue.put_nowait(ConnectionError("LISTEN connection lost"))
+        )
+        await connection.add_listener(
+            self.channel,
+            lambda _conn, _pid, _channel, payload: queue.put_nowait(payload),
+        )
+        return self._iterate(connection, queue)
+
+    @staticmethod
+    async def _iterate(connection, queue: asyncio.Queue) -> AsyncIterator[str]:
+        """Уведомления канала до разрыва соединения"""
+        try:
+            while True:
+                item = await queue.get()
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            if not connection.is_closed():
+                await connection.close(timeout=1)
+
+    async def close(self) -> None:
+        """Закрыть соединение публикации"""
+        if self._publisher is not None and not self._publisher.is_closed():
+            await self._publisher.close(timeout=1)
+        self._publisher = None
+
+
+class InvalidationBus:
+    """Публикация изменений и вытеснение ключей в остальных воркерах
+
+    Пишущий воркер вытесняет свои ключи сразу и синхронно; событие в шину
+    нужно остальным. Свои события слушатель пропускает по origin. После
+    переподключения слушателя кеш очищается целиком: события за время
+    разрыва потеряны.
+    """
+
+    def __init__(
+        self,
+        backend: InvalidationBackend,
+        origin: Optional[str] = None,
+        reconnect_delay: float = 1.0,
+    ) -> None:
+        self.backend = backend
+        self.origin = (
+            origin or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        )
+        self.reconnect_delay = reconnect_delay
+
+    async def publish(
+        self,
+        keys: Iterable[str] = (),
+        prefixes: Iterable[str] = (),
+        operator_load: bool = False,
+        schedule: bool = False,
+    ) -> None:
+        """Вытеснить ключи локально и сообщить остальным воркерам"""
+        event = InvalidationEvent(
+            origin=self.origin,
+            keys=tuple(keys),
+            prefixes=tuple(prefixes),
+            operator_load=operator_load,
+            schedule=schedule,
+            sent_at=time.time(),
+        )
+        self._evict(event)
+        try:
+            await self.backend.publish(event.encode())
+        except Exception as exc:
+            # Запись уже зафиксирована; остальные воркеры догонят по TTL кеша
+            logger.warning("Invalidation publish failed: error=%s", exc)
+            return
+        invalidation_events_total.inc("published")
+
+    def handle(self, payload: str) -> None:
+        """Применить событие другого воркера"""
+        try:
+            event = InvalidationEvent.decode(payload)
+        except (ValueError, KeyError, TypeError) as exc:
+            logger.warning("Invalid invalidation payload: error=%s", exc)
+            return
+        if event.origin == self.origin:
+            return
+        self._evict(event)
+        # Снимок нагрузки пересоберется из БД при следующем обращении
+        if event.operator_load:
+            operator_load_snapshot.reset()
+        if event.schedule:
+            shift_schedule.reset()
+        invalidation_events_total.inc("received")
+        if event.sent_at:
+            invalidation_lag_seconds.observe(max(time.time() - event.sent_at, 0.0))
+
+    @staticmethod
+    def _evict(event: InvalidationEvent) -> None:
+        """Вытеснить ключи события из кеша ответов"""
+        for key in event.keys:
+            response_cache.invalidate(key)
+        for prefix in event.prefixes:
+            response_cache.invalidate_prefix(prefix)
+
+    async def run(self) -> None:
+        """Цикл слушателя (задача lifespan) с переподключением"""
+        retrying = False
+        while True:
+            try:
+                stream = await self.backend.subscribe()
+                # Пока подписки не было, события могли потеряться
+                if retrying:
+                    response_cache.clear()
+                    operator_load_snapshot.reset()
+                    shift_schedule.reset()
+                    logger.info("Invalidation listener reconnected, caches cleared")
+                async for payload in stream:
+                    self.handle(payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Invalidation listener failed: error=%s", exc)
+            retrying = True
+            await asyncio.sleep(self.reconnect_delay)
+
+
+def _create_backend() -> InvalidationBackend:
+    """Транспорт по настройкам"""
+    if settings.invalidation_backend == "postgres":
+        url = make_url(settings.database_url).set(drivername="postgresql")
+        dsn = url.render_as_string(hide_password=False)
+        return PostgresInvalidationBackend(
+            dsn,
+            settings.invalidation_channel,
+            publish_timeout=settings.invalidation_publish_timeout_seconds,
+            retry_delay=settings.invalidation_reconnect_seconds,
+        )
+    return LoopbackInvalidationBackend()
+
+
+invalidation_bus = InvalidationBus(
+    _create_backend(),
+    reconnect_delay=settings.invalidation_reconnect_seconds,
+)
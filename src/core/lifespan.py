@@ -1,22 +1,121 @@
 """Управление жизненным циклом приложения"""
 
+import asyncio
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 from fastapi import FastAPI
 
-from src.core.database import engine
+from src.core.background import PeriodicTask
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal, engine
+from src.core.cache import response_cache
+from src.core.idempotency import idempotency
+from src.core.invalidation import invalidation_bus
+from src.core.shutdown import shutdown
+from src.core.warmup import readiness, warm_up
+from src.domains.contacts.rebalancer import operator_rebalancer
+from src.domains.contacts.sweeper import stale_contact_sweeper
+from src.domains.operators.load_snapshot import operator_load_snapshot
+from src.domains.operators.schedule import shift_schedule
+from src.utils.logger import flush_logs, get_logger
 
 # Импорт всех моделей для регистрации в Base.metadata
-from src.domains.operators.model import Operator  # noqa: F401
+from src.domains.operators.model import Operator, OperatorShift  # noqa: F401
 from src.domains.sources.model import Source, SourceOperatorWeight  # noqa: F401
 from src.domains.leads.model import Lead  # noqa: F401
 from src.domains.contacts.model import Contact  # noqa: F401
 
+logger = get_logger(__name__)
+
+
+async def reconcile_operator_load() -> None:
+    """Сверить снимок нагрузки операторов с БД"""
+    async with AsyncSessionLocal() as session:
+        await operator_load_snapshot.reconcile(session)
+
+
+async def run_warm_up(app: FastAPI) -> None:
+    """Прогрев в фоне: /health отвечает сразу, /ready - после прогрева"""
+    await warm_up(
+        app,
+        engine,
+        AsyncSessionLocal,
+        pool_connections=settings.warmup_pool_connections,
+        step_timeout=settings.warmup_timeout_seconds,
+        retry_interval=settings.warmup_retry_seconds,
+    )
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Управление жизненным циклом приложения"""
+    reconcile_task = PeriodicTask(
+        "operator-load-reconcile",
+        settings.operator_load_reconcile_interval_seconds,
+        reconcile_operator_load,
+    )
+    purge_task = PeriodicTask(
+        "idempotency-purge",
+        settings.idempotency_purge_interval_seconds,
+        idempotency.purge_expired,
+    )
+    sweep_task = PeriodicTask(
+        "stale-contact-sweep",
+        settings.stale_contact_sweep_interval_seconds,
+        stale_contact_sweeper.sweep,
+    )
+    rebalance_task = PeriodicTask(
+        "operator-rebalance",
+        settings.operator_rebalance_interval_seconds,
+        operator_rebalancer.rebalance,
+    )
+    if settings.warmup_enabled:
+        warm_up_task = asyncio.create_task(run_warm_up(app), name="warm-up")
+    else:
+        readiness.ready = True
+        warm_up_task = None
+    invalidation_task = asyncio.create_task(
+        invalidation_bus.run(), name="cache-invalidation"
+    )
+    # Переходы смен операторов: задача спит до ближайшей границы смены
+    shift_task = asyncio.create_task(
+        shift_schedule.run(AsyncSessionLocal), name="operator-shifts"
+    )
+    reconcile_task.start()
+    purge_task.start()
+    sweep_task.start()
+    rebalance_task.start()
     yield
-    # При остановке: закрытие соединений
-    await engine.dispose()
+    # При остановке: отказ в новых запросах, ожидание принятых, завершение
+    # фоновых задач, закрытие соединений и запись оставшихся логов. Под
+    # src.server отказ и ожидание начинаются раньше, по сигналу (здесь
+    # begin() уже ничего не делает); здесь - для запуска без него
+    readiness.draining = True
+    shutdown.begin()
+    await shutdown.wait_for_requests(settings.shutdown_drain_timeout_seconds)
+
+    timeout = settings.shutdown_background_timeout_seconds
+    with shutdown.phase("background"):
+        if warm_up_task is not None and not warm_up_task.done():
+            warm_up_task.cancel()
+        await asyncio.gather(
+            reconcile_task.stop(timeout),
+            purge_task.stop(timeout),
+            sweep_task.stop(timeout),
+            rebalance_task.stop(timeout),
+            response_cache.drain(timeout),
+        )
+        for task in (invalidation_task, shift_task):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await invalidation_bus.backend.close()
+
+    with shutdown.phase("pool"):
+        await engine.dispose()
+    shutdown.finish()
+    await flush_logs(timeout)
+    readiness.reset()
@@ -0,0 +1,295 @@
+"""Метрики запросов и БД в формате Prometheus без внешних зависимостей"""
+
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.query_budget import record_statement
+
+LabelValues = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 8, 13, 21, 34, 55)
+
+
+def _escape(value: str) -> str:
+    """Экранировать значение метки"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Iterable[str]) -> str:
+    """Отформатировать набор меток"""
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """Отформатировать значение метрики"""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Монотонный счетчик"""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Увеличить значение"""
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def get(self, *labels: str) -> float:
+        """Текущее значение"""
+        return self._values.get(labels, 0)
+
+    def samples(self) -> List[str]:
+        """Строки с сэмплами"""
+        return [
+            f"{self.name}{_format_labels(self.labels, lv)} {_format_value(v)}"
+            for lv, v in sorted(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    """Значение, которое может расти и уменьшаться"""
+
+    type = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        """Уменьшить значение"""
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        """Установить значение"""
+        self._values[labels] = value
+
+
+@dataclass
+class _HistogramState:
+    """Состояние гистограммы для одного набора меток"""
+
+    buckets: List[int]
+    sum: float = 0.0
+    count: int = 0
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами бакетов"""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.bounds = tuple(sorted(buckets))
+        self._states: Dict[LabelValues, _HistogramState] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Учесть наблюдение"""
+        state = self._states.get(labels)
+        if state is None:
+            state = self._states[labels] = _HistogramState([0] * len(self.bounds))
+        # Храним не кумулятивно, кумулятивные суммы считаются при выводе
+        index = bisect_left(self.bounds, value)
+        if index < len(self.bounds):
+            state.buckets[index] += 1
+        state.sum += value
+        state.count += 1
+
+    def count(self, *labels: str) -> int:
+        """Количество наблюдений"""
+        state = self._states.get(labels)
+        return state.count if state else 0
+
+    def samples(self) -> List[str]:
+        """Строки с сэмплами (бакеты кумулятивные)"""
+        lines = []
+        bucket_labels = self.labels + ("le",)
+        for lv, state in sorted(self._states.items()):
+            cumulative = 0
+            for bound, hits in zip(self.bounds, state.buckets):
+                cumulative += hits
+                labels = _format_labels(bucket_labels, lv + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(bucket_labels, lv + ("+Inf",))
+            lines.append(f"{self.name}_bucket{labels} {state.count}")
+            labels = _format_labels(self.labels, lv)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state.sum)}")
+            lines.append(f"{self.name}_count{labels} {state.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Реестр метрик процесса"""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        """Зарегистрировать метрику (повторная регистрация возвращает существующую)"""
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        """Создать счетчик"""
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        """Создать gauge"""
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Создать гистограмму"""
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        """Текстовый формат Prometheus (exposition format 0.0.4)"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests_total = registry.counter(
+    "http_requests_total", "Total HTTP requests", ("method", "route", "status")
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being processed"
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency in seconds",
+    ("method", "route"),
+)
+http_request_db_queries = registry.histogram(
+    "http_request_db_queries",
+    "SQL statements executed per HTTP request",
+    ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+http_request_db_duration_seconds = registry.histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in SQL statements per HTTP request in seconds",
+    ("method", "route"),
+)
+db_queries_total = registry.counter("db_queries_total", "Total SQL statements executed")
+db_query_duration_seconds = registry.histogram(
+    "db_query_duration_seconds", "SQL statement latency in seconds"
+)
+
+
+@dataclass
+class RequestDBStats:
+    """Статистика запросов к БД в рамках одного HTTP-запроса"""
+
+    queries: int = 0
+    duration: float = 0.0
+
+
+_request_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar(
+    "request_db_stats", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Запомнить время начала выполнения SQL"""
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Учесть выполненный SQL в метриках и статистике текущего запроса"""
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    record_statement(statement)
+    db_queries_total.inc()
+    db_query_duration_seconds.observe(elapsed)
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.duration += elapsed
+
+
+def _handle_error(exception_context) -> None:
+    """Снять время начала упавшего SQL (after_cursor_execute не вызывается)"""
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Подключить сбор метрик SQL к движку (для AsyncEngine - engine.sync_engine)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """ASGI middleware сбора метрик по маршрутам
+
+    Маршрут берется как шаблон пути (/api/v1/contacts/{contact_id}), чтобы
+    число серий не зависело от ID; несовпавшие пути собираются в "unmatched".
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats = RequestDBStats()
+        token = _request_db_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_flight.dec()
+            _request_db_stats.reset(token)
+
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests_total.inc(method, route_path, str(status_code))
+            http_request_duration_seconds.observe(elapsed, method, route_path)
+            http_request_db_queries.observe(stats.queries, method, route_path)
+            http_request_db_duration_seconds.observe(stats.duration, method, route_path)
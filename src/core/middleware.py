@@ -1,7 +1,21 @@
 """Настройка middleware"""
 
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI
+from fastapi import FastAPI, status
+
+from src.core.admission import (
+    ADMIN,
+    INGEST,
+    READ,
+    AdmissionLimiter,
+    AdmissionMiddleware,
+)
+from src.core.compression import CompressionMiddleware
+from src.core.config import settings
+from src.core.metrics import MetricsMiddleware
+from src.core.query_budget import QueryBudgetMiddleware
+from src.core.request_id import RequestIdMiddleware
+from src.core.shutdown import DrainMiddleware
 
 
 def setup_cors(app: FastAPI) -> None:
@@ -13,3 +27,83 @@ def setup_cors(app: FastAPI) -> None:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+
+
+def setup_compression(app: FastAPI) -> None:
+    """Настройка сжатия ответов"""
+    if not settings.compression_enabled:
+        return
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        content_types=settings.compression_content_types,
+        encodings=settings.compression_encodings,
+        levels={
+            "gzip": settings.compression_gzip_level,
+            "br": settings.compression_brotli_quality,
+            "zstd": settings.compression_zstd_level,
+        },
+    )
+
+
+def setup_query_budget(app: FastAPI) -> None:
+    """Настройка учета SQL-запросов (по умолчанию только в режиме отладки)"""
+    if settings.query_budget_enabled or settings.debug:
+        app.add_middleware(
+            QueryBudgetMiddleware,
+            strict=settings.query_budget_strict,
+            repeat_threshold=settings.query_repeat_threshold,
+        )
+
+
+def setup_admission(app: FastAPI) -> None:
+    """Настройка контроля допуска запросов"""
+    if not settings.admission_enabled:
+        return
+    timeout = settings.admission_queue_timeout_seconds
+    limiters = {
+        # Источникам обращений отвечаем 429: это сигнал отступить и повторить
+        INGEST: AdmissionLimiter(
+            INGEST,
+            settings.admission_ingest_concurrency,
+            settings.admission_ingest_queue,
+            timeout,
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        ),
+        READ: AdmissionLimiter(
+            READ,
+            settings.admission_read_concurrency,
+            settings.admission_read_queue,
+            timeout,
+        ),
+        ADMIN: AdmissionLimiter(
+            ADMIN,
+            settings.admission_admin_concurrency,
+            settings.admission_admin_queue,
+            timeout,
+        ),
+    }
+    app.add_middleware(
+        AdmissionMiddleware,
+        limiters=limiters,
+        ingest_paths=settings.admission_ingest_paths,
+        retry_after=settings.admission_retry_after_seconds,
+    )
+
+
+def setup_drain(app: FastAPI) -> None:
+    """Настройка учета выполняющихся запросов для плавной остановки"""
+    app.add_middleware(
+        DrainMiddleware, retry_after=settings.admission_retry_after_seconds
+    )
+
+
+def setup_metrics(app: FastAPI) -> None:
+    """Настройка сбора метрик запросов (снаружи от него только ID запроса)"""
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+
+
+def setup_request_id(app: FastAPI) -> None:
+    """Настройка ID запроса (внешний middleware: ID есть во всех логах запроса)"""
+    app.add_middleware(RequestIdMiddleware, header=settings.request_id_header)
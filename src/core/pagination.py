@@ -0,0 +1,25 @@
+"""Keyset-пагинация по (created_at, id)"""
+
+import base64
+from datetime import datetime
+from typing import Tuple
+
+from src.core.exceptions import ValidationError
+
+Cursor = Tuple[datetime, int]
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Курсор на позицию после записи (непрозрачная строка для клиента)"""
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Разобрать курсор"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(id)
+    except ValueError:
+        raise ValidationError("Invalid cursor")
@@ -0,0 +1,158 @@
+"""Учет SQL-запросов на HTTP-запрос: бюджеты эндпоинтов и поиск N+1"""
+
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional, Tuple, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+F = TypeVar("F", bound=Callable)
+
+BUDGET_ATTRIBUTE = "__query_budget__"
+
+_active_recorders: ContextVar[Tuple["QueryRecorder", ...]] = ContextVar(
+    "active_query_recorders", default=()
+)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAM_LISTS = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)\s*,?)+\)")
+_POSTCOMPILE = re.compile(r"\(?__\[POSTCOMPILE_\w+\]\)?")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Нормализовать SQL до "формы": без литералов и длины списков параметров"""
+    shape = _LITERALS.sub("?", statement)
+    shape = _POSTCOMPILE.sub("(?)", shape)
+    shape = _PARAM_LISTS.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass
+class QueryRecorder:
+    """Записанные SQL-запросы"""
+
+    statements: List[str] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        """Количество запросов"""
+        return len(self.statements)
+
+    def add(self, statement: str) -> None:
+        """Записать запрос"""
+        self.statements.append(statement)
+
+    def repeated_shapes(self, threshold: int = 2) -> List[Tuple[str, int]]:
+        """Формы запросов, выполненные не менее threshold раз (кандидаты в N+1)"""
+        shapes = Counter(statement_shape(s) for s in self.statements)
+        return [(shape, n) for shape, n in shapes.most_common() if n >= threshold]
+
+    def report(self) -> str:
+        """Текстовый отчет по запросам"""
+        lines = [f"{self.count} queries:"]
+        lines.extend(f"  {i + 1}. {s}" for i, s in enumerate(self.statements))
+        repeated = self.repeated_shapes()
+        if repeated:
+            lines.append("Repeated statement shapes:")
+            lines.extend(f"  {n}x {shape}" for shape, n in repeated)
+        return "\n".join(lines)
+
+
+def record_statement(statement: str) -> None:
+    """Передать выполненный запрос всем активным записывающим (вызывается из событий движка)"""
+    for recorder in _active_recorders.get():
+        recorder.add(statement)
+
+
+@contextmanager
+def record_queries() -> Iterator[QueryRecorder]:
+    """Записывать все SQL-запросы, выполненные внутри блока"""
+    recorder = QueryRecorder()
+    token = _active_recorders.set(_active_recorders.get() + (recorder,))
+    try:
+        yield recorder
+    finally:
+        _active_recorders.reset(token)
+
+
+def query_budget(max_queries: int) -> Callable[[F], F]:
+    """Объявить бюджет SQL-запросов эндпоинта"""
+
+    def decorator(endpoint: F) -> F:
+        setattr(endpoint, BUDGET_ATTRIBUTE, max_queries)
+        return endpoint
+
+    return decorator
+
+
+def get_query_budget(scope: Scope) -> Optional[int]:
+    """Бюджет эндпоинта совпавшего маршрута, если объявлен"""
+    return getattr(scope.get("endpoint"), BUDGET_ATTRIBUTE, None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Эндпоинт выполнил больше запросов, чем объявлено в бюджете"""
+
+
+class QueryBudgetMiddleware:
+    """ASGI middleware учета запросов к БД
+
+    Добавляет заголовок X-Query-Count (запросы до начала ответа), пишет в лог
+    повторяющиеся формы запросов и превышения бюджета. В strict-режиме
+    (тесты) превышение бюджета поднимает QueryBudgetExceeded.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        strict: bool = False,
+        repeat_threshold: int = 5,
+    ):
+        self.app = app
+        self.strict = strict
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with record_queries() as recorder:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-query-count", str(recorder.count).encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        endpoint = (
+            f"{scope['method']} {getattr(scope.get('route'), 'path', scope['path'])}"
+        )
+        repeated = recorder.repeated_shapes(self.repeat_threshold)
+        if repeated:
+            logger.warning(
+                "Repeated SQL statements (possible N+1): endpoint=%s, %s",
+                endpoint,
+                "; ".join(f"{n}x {shape}" for shape, n in repeated),
+            )
+
+        budget = get_query_budget(scope)
+        if budget is not None and recorder.count > budget:
+            message = (
+                f"Query budget exceeded: endpoint={endpoint}, "
+                f"budget={budget}, actual={recorder.count}"
+            )
+            if self.strict:
+                raise QueryBudgetExceeded(f"{message}\n{recorder.report()}")
+            logger.warning(message)
@@ -0,0 +1,76 @@
+"""Быстрая сериализация ответов в формате StandardResponse"""
+
+import json
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+
+from pydantic import TypeAdapter
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+
+from src.core.config import settings
+from src.core.schemas import StandardResponse
+
+
+@lru_cache(maxsize=None)
+def get_type_adapter(data_type: Any) -> TypeAdapter:
+    """Получить закешированный TypeAdapter для типа данных ответа"""
+    return TypeAdapter(data_type)
+
+
+class StandardJSONResponse(Response):
+    """JSON-ответ с оберткой StandardResponse
+
+    Данные уже провалидированы сервисами через model_validate, поэтому в
+    быстром режиме (settings.fast_json_responses) они сериализуются напрямую
+    в pydantic-core без повторной валидации через response_model и без
+    промежуточных dict/json.dumps. Обертка собирается из байтов.
+
+    В обычном режиме повторяется путь FastAPI: валидация в
+    StandardResponse[data_type], dump_python(mode="json") и json.dumps.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        data: Any = None,
+        data_type: Any = None,
+        message: Optional[str] = None,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        background: Optional[BackgroundTask] = None,
+    ):
+        self.data_type = data_type if data_type is not None else type(data)
+        self.message = message
+        super().__init__(
+            content=data,
+            status_code=status_code,
+            headers=headers,
+            background=background,
+        )
+
+    def render(self, content: Any) -> bytes:
+        """Сериализовать данные в тело ответа"""
+        if not settings.fast_json_responses:
+            adapter = get_type_adapter(StandardResponse[self.data_type])
+            payload = adapter.validate_python(
+                StandardResponse(success=True, data=content, message=self.message),
+                from_attributes=True,
+            )
+            return json.dumps(
+                adapter.dump_python(payload, mode="json"),
+                ensure_ascii=False,
+                allow_nan=False,
+                separators=(",", ":"),
+            ).encode("utf-8")
+
+        return b"".join(
+            (
+                b'{"success":true,"data":',
+                get_type_adapter(self.data_type).dump_json(content),
+                b',"message":',
+                json.dumps(self.message, ensure_ascii=False).encode("utf-8"),
+                b"}",
+            )
+        )
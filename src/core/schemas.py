@@ -1,12 +1,15 @@
 """Общие Pydantic схемы"""
 
 from datetime import datetime
-from typing import Generic, TypeVar, Optional
+from typing import Generic, List, TypeVar, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 T = TypeVar("T")
 
+# Максимальное количество ID в одном пакетном запросе
+MAX_BATCH_IDS = 1000
+
 
 class StandardResponse(BaseModel, Generic[T]):
     """Стандартный ответ API"""
@@ -25,3 +28,23 @@ class TimestampMixin(BaseModel):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class BatchRequest(BaseModel):
+    """Запрос пакетного получения по ID"""
+
+    ids: List[int] = Field(min_length=1, max_length=MAX_BATCH_IDS)
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """Страница keyset-пагинации; next_cursor - null на последней странице"""
+
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+class BatchResponse(BaseModel, Generic[T]):
+    """Ответ пакетного получения: items в порядке запрошенных ID, null - не найдено"""
+
+    items: List[Optional[T]]
+    not_found: List[int]
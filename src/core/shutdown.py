@@ -0,0 +1,168 @@
+"""Плавная остановка: отказ в новых запросах и ожидание выполняющихся"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.metrics import registry
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+shutdown_phase_seconds = registry.gauge(
+    "shutdown_phase_seconds", "Duration of the last shutdown phase", ("phase",)
+)
+shutdown_requests = registry.gauge(
+    "shutdown_requests",
+    "In-flight requests when draining started and when the deadline passed",
+    ("state",),
+)
+shutdown_rejected_total = registry.counter(
+    "shutdown_rejected_total", "Requests rejected because the server is draining"
+)
+
+
+class ShutdownCoordinator:
+    """Учет выполняющихся запросов и состояние остановки
+
+    После begin() новые запросы к API отклоняются (503, Connection: close),
+    чтобы балансировщик переключил их на другой экземпляр, а lifespan ждет
+    завершения уже принятых запросов не дольше заданного срока.
+    """
+
+    def __init__(self) -> None:
+        self.draining = False
+        self.in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._started_at: Optional[float] = None
+        self.phases: Dict[str, float] = {}
+
+    def reset(self) -> None:
+        """Вернуть в рабочее состояние"""
+        self.draining = False
+        self.in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._started_at = None
+        self.phases = {}
+
+    def request_started(self) -> None:
+        """Запрос принят"""
+        self.in_flight += 1
+        self._idle.clear()
+
+    def request_finished(self) -> None:
+        """Запрос завершен"""
+        self.in_flight -= 1
+        if self.in_flight <= 0:
+            self.in_flight = 0
+            self._idle.set()
+
+    def begin(self) -> None:
+        """Начать остановку: новые запросы больше не принимаются"""
+        if self.draining:
+            return
+        self.draining = True
+        self._started_at = time.monotonic()
+        shutdown_requests.set(self.in_flight, "at_start")
+        logger.info("Shutdown started: in_flight=%s", self.in_flight)
+
+    async def wait_for_requests(self, timeout: float) -> int:
+        """Дождаться принятых запросов; вернуть число незавершенных к сроку"""
+        with self.phase("requests"):
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "Shutdown deadline passed with requests in flight: count=%s",
+                    self.in_flight,
+                )
+        shutdown_requests.set(self.in_flight, "abandoned")
+        return self.in_flight
+
+    def phase(self, name: str) -> "_Phase":
+        """Контекст замера длительности этапа остановки"""
+        return _Phase(self, name)
+
+    def finish(self) -> None:
+        """Зафиксировать общую длительность остановки"""
+        if self._started_at is None:
+            return
+        total = time.monotonic() - self._started_at
+        self.phases["total"] = total
+        shutdown_phase_seconds.set(total, "total")
+        logger.info(
+            "Shutdown finished: %s",
+            {name: round(seconds, 3) for name, seconds in self.phases.items()},
+        )
+
+
+class _Phase:
+    """Замер этапа остановки (метрика shutdown_phase_seconds)"""
+
+    def __init__(self, coordinator: ShutdownCoordinator, name: str):
+        self.coordinator = coordinator
+        self.name = name
+        self._start = 0.0
+
+    def __enter__(self) -> "_Phase":
+        self._start = time.monotonic()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        duration = time.monotonic() - self._start
+        self.coordinator.phases[self.name] = duration
+        shutdown_phase_seconds.set(duration, self.name)
+
+
+shutdown = ShutdownCoordinator()
+
+
+class DrainMiddleware:
+    """ASGI middleware учета запросов для плавной остановки
+
+    Запросы вне /api/ (health, ready, metrics) не отклоняются: по ним
+    балансировщик и мониторинг видят, что экземпляр останавливается.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        coordinator: Optional[ShutdownCoordinator] = None,
+        retry_after: int = 1,
+    ):
+        self.app = app
+        self.coordinator = coordinator or shutdown
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if self.coordinator.draining and scope["path"].startswith("/api/"):
+            shutdown_rejected_total.inc()
+            response = JSONResponse(
+                status_code=503,
+                content={
+                    "success": False,
+                    "message": "Server is shutting down, retry later",
+                    "data": None,
+                },
+                headers={
+                    "Retry-After": str(self.retry_after),
+                    "Connection": "close",
+                },
+            )
+            await response(scope, receive, send)
+            return
+
+        self.coordinator.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.coordinator.request_finished()
@@ -0,0 +1,166 @@
+"""Прогрев приложения после старта и состояние готовности (/ready)"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from src.core.responses import get_type_adapter
+from src.core.schemas import StandardResponse
+from src.domains.leads.repository import LeadRepository
+from src.domains.operators.load_snapshot import operator_load_snapshot
+from src.domains.operators.repository import OperatorRepository
+from src.domains.operators.schedule import shift_schedule
+from src.domains.sources.repository import SourceOperatorWeightRepository
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Шаги, без которых экземпляр не может обслуживать запросы: пока они не
+# выполнены, /ready отвечает 503, а прогрев повторяет их
+REQUIRED_STEPS = ("pool", "queries")
+
+
+class Readiness:
+    """Состояние готовности: прогрев завершен, идет ли остановка"""
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.draining = False
+        self.steps: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def accepting(self) -> bool:
+        """Можно ли направлять трафик на этот экземпляр"""
+        return self.ready and not self.draining
+
+    def reset(self) -> None:
+        """Сбросить состояние (приложение снова не готово)"""
+        self.ready = False
+        self.draining = False
+        self.steps = {}
+
+    def report(self) -> Dict[str, Any]:
+        """Состояние для /ready"""
+        if self.draining:
+            status = "draining"
+        else:
+            status = "ready" if self.ready else "warming_up"
+        return {"status": status, "steps": self.steps}
+
+
+readiness = Readiness()
+
+
+async def warm_up_pool(engine: AsyncEngine, connections: int) -> None:
+    """Открыть несколько соединений пула одновременно (они возвращаются в пул)"""
+
+    async def open_connection() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(open_connection() for _ in range(connections)))
+
+
+async def warm_up_queries(session: AsyncSession) -> None:
+    """Выполнить запросы приема обращений, чтобы скомпилировать и закешировать SQL"""
+    # Поиск лида по идентификаторам и выбор оператора - горячий путь POST /contacts
+    leads = LeadRepository(session)
+    await leads.find_by_identifiers(external_id="-", phone="-", email="-")
+    await leads.find_by_identifiers(phone="-")
+    await OperatorRepository(session).get_available_operators(0)
+    await SourceOperatorWeightRepository(session).get_by_source(0)
+
+
+def response_data_types(app: FastAPI) -> Set[Any]:
+    """Типы данных ответов всех маршрутов (T из StandardResponse[T])"""
+    data_types = set()
+    for route in app.routes:
+        model = getattr(route, "response_model", None)
+        if not isinstance(route, APIRoute) or model is None:
+            continue
+        args = getattr(model, "__pydantic_generic_metadata__", {}).get("args")
+        if args:
+            data_types.add(args[0])
+    return data_types
+
+
+def warm_up_serializers(app: FastAPI) -> None:
+    """Построить сериализаторы ответов заранее, а не на первом запросе"""
+    for data_type in response_data_types(app):
+        get_type_adapter(data_type)
+        get_type_adapter(StandardResponse[data_type])
+
+
+async def warm_up(
+    app: FastAPI,
+    engine: AsyncEngine,
+    session_factory: async_sessionmaker[AsyncSession],
+    pool_connections: int = 5,
+    step_timeout: Optional[float] = None,
+    retry_interval: float = 2.0,
+) -> None:
+    """Прогреть приложение и отметить его готовым
+
+    Ошибка или таймаут шага (step_timeout) логируется и не останавливает
+    прогрев. Не выполненные шаги повторяются каждые retry_interval секунд,
+    пока не выполнены все REQUIRED_STEPS: без пула и SQL приема обращений
+    (например, при недоступной БД) экземпляр не готов. Остальные шаги только
+    ускоряют первые запросы, их ошибки готовность не задерживают.
+    """
+
+    async def load_routing() -> None:
+        async with session_factory() as session:
+            await operator_load_snapshot.reconcile(session)
+            await shift_schedule.ensure_loaded(session)
+
+    async def run_queries() -> None:
+        async with session_factory() as session:
+            await warm_up_queries(session)
+
+    async def build_serializers() -> None:
+        warm_up_serializers(app)
+
+    steps: List[tuple[str, Callable[[], Awaitable[None]]]] = [
+        ("pool", lambda: warm_up_pool(engine, pool_connections)),
+        ("queries", run_queries),
+        ("routing", load_routing),
+        ("serializers", build_serializers),
+    ]
+    attempt = 0
+    while True:
+        attempt += 1
+        for name, step in steps:
+            if readiness.steps.get(name, {}).get("ok"):
+                continue
+            start = time.perf_counter()
+            ok = False
+            try:
+                await asyncio.wait_for(step(), step_timeout)
+                ok = True
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "Warm-up step timed out: step=%s, timeout=%ss", name, step_timeout
+                )
+            except Exception as exc:
+                logger.warning("Warm-up step failed: step=%s, error=%s", name, exc)
+            readiness.steps[name] = {
+                "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+                "ok": ok,
+                "attempts": attempt,
+            }
+        if all(readiness.steps[name]["ok"] for name in REQUIRED_STEPS):
+            break
+        logger.warning(
+            "Warm-up incomplete, retrying: attempt=%s, retry_in=%ss",
+            attempt,
+            retry_interval,
+        )
+        await asyncio.sleep(retry_interval)
+
+    readiness.ready = True
+    logger.info("Warm-up finished: %s", readiness.steps)
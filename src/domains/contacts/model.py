@@ -1,6 +1,17 @@
 """Модель обращения"""
 
-from sqlalchemy import Column, Integer, ForeignKey, Boolean, Text
+from datetime import datetime
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Integer,
+    ForeignKey,
+    Boolean,
+    Text,
+    Index,
+)
 from sqlalchemy.orm import relationship
 
 from src.core.base_model import BaseModel
@@ -22,8 +33,21 @@ class Contact(BaseModel):
     )
     is_active = Column(Boolean, default=True, nullable=False)  # Активно ли обращение
     message = Column(Text, nullable=True)  # Текст обращения
+    # Навыки, требуемые для обращения (в дополнение к навыкам источника)
+    required_skills = Column(JSON, default=list, server_default="[]", nullable=False)
+    # Последняя активность (создание, изменение через API); в отличие от
+    # updated_at не меняется при переназначении - от нее считается простой
+    last_activity_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Связи
     lead = relationship("Lead", back_populates="contacts", lazy="selectin")
     source = relationship("Source", back_populates="contacts", lazy="selectin")
     operator = relationship("Operator", back_populates="contacts", lazy="selectin")
+
+    __table_args__ = (
+        # Лента обращений лида: WHERE lead_id = ? ORDER BY created_at DESC, id DESC
+        Index("idx_contact_lead_created", "lead_id", "created_at"),
+        # Закрытие простаивающих: WHERE is_active AND last_activity_at < ?
+        # ORDER BY last_activity_at
+        Index("idx_contact_active_activity", "is_active", "last_activity_at"),
+    )
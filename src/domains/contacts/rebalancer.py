@@ -0,0 +1,346 @@
+"""Ребалансировка активных обращений между операторами"""
+
+import asyncio
+import math
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.core.invalidation import invalidation_bus
+from src.core.metrics import registry
+from src.domains.contacts.repository import ContactRepository
+from src.domains.operators.load_snapshot import operator_load_snapshot
+from src.domains.operators.repository import OperatorRepository
+from src.domains.operators.schedule import shift_schedule
+from src.domains.operators.schemas import RebalanceMove, RebalancePlanResponse
+from src.domains.operators.skills import normalize_skills, skill_index
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+rebalance_moves_total = registry.counter(
+    "operator_rebalance_moves_total", "Contacts moved between operators by rebalancing"
+)
+
+# (источник, оператор)
+Pair = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class QuotaMove:
+    """Перенос одного обращения на уровне счетчиков (без конкретного ID)"""
+
+    source_id: int
+    from_operator_id: int
+    to_operator_id: int
+    reason: str
+
+
+def plan_quotas(
+    counts: Dict[Pair, int],
+    weights: Dict[int, Dict[int, int]],
+    limits: Dict[int, int],
+    receivers: Dict[int, Set[int]],
+    tolerance: Optional[float] = 0.5,
+    max_moves: int = 500,
+    min_surplus: int = 5,
+) -> List[QuotaMove]:
+    """Минимальный набор переносов: сначала load_limit, затем доли весов
+
+    counts - активные обращения по (источник, оператор), weights - источник
+    -> оператор -> вес, limits - load_limit активных операторов, receivers -
+    источник -> операторы, которые могут принимать его обращения (на смене,
+    с навыками источника).
+
+    Целевая доля оператора в источнике - target = обращения источника *
+    вес / сумма весов. Перегруженный оператор отдает ровно превышение
+    load_limit, в первую очередь из источников, где он выше своей доли, и
+    тем, кто ниже своей. Затем (если tolerance не None) оператор, у которого
+    в источнике больше max(floor(target * (1 + tolerance)),
+    floor(target + min_surplus)) обращений, отдает излишек операторам ниже
+    их target. Абсолютный порог min_surplus отсекает обычный разброс
+    случайного взвешенного распределения: при малом числе обращений
+    относительный допуск срабатывает уже на одном-двух лишних. Получатель
+    не выходит за load_limit и при выравнивании долей - за свою долю,
+    поэтому следующий проход не переносит обращения обратно.
+    """
+    counts = Counter({pair: n for pair, n in counts.items() if n > 0})
+    load: Counter = Counter()
+    totals: Counter = Counter()
+    for (source_id, operator_id), n in counts.items():
+        load[operator_id] += n
+        totals[source_id] += n
+
+    targets: Dict[Pair, float] = {}
+    weighted = set()
+    for source_id, source_weights in weights.items():
+        total_weight = sum(source_weights.values())
+        if total_weight <= 0:
+            continue
+        weighted.add(source_id)
+        for operator_id, weight in source_weights.items():
+            targets[(source_id, operator_id)] = (
+                totals[source_id] * weight / total_weight
+            )
+
+    def target(source_id: int, operator_id: int) -> float:
+        # Без весов у источника доли не заданы: текущее распределение и есть цель
+        if source_id not in weighted:
+            return float(counts[(source_id, operator_id)])
+        return targets.get((source_id, operator_id), 0.0)
+
+    def has_room(operator_id: int) -> bool:
+        return operator_id in limits and load[operator_id] < limits[operator_id]
+
+    moves: List[QuotaMove] = []
+
+    def move(source_id: int, from_id: int, to_id: int, reason: str) -> None:
+        counts[(source_id, from_id)] -= 1
+        counts[(source_id, to_id)] += 1
+        load[from_id] -= 1
+        load[to_id] += 1
+        moves.append(QuotaMove(source_id, from_id, to_id, reason))
+
+    source_ids = sorted(totals)
+    overloaded = sorted(op for op, limit in limits.items() if load[op] > limit)
+    for operator_id in overloaded:
+        while load[operator_id] > limits[operator_id] and len(moves) < max_moves:
+            best = None
+            for source_id in source_ids:
+                if counts[(source_id, operator_id)] <= 0:
+                    continue
+                surplus = counts[(source_id, operator_id)] - target(
+                    source_id, operator_id
+                )
+                for receiver_id in receivers.get(source_id, ()):
+                    if receiver_id == operator_id or not has_room(receiver_id):
+                        continue
+                    deficit = (
+                        target(source_id, receiver_id)
+                        - counts[(source_id, receiver_id)]
+                    )
+                    key = (surplus + deficit, -source_id, -receiver_id)
+                    if best is None or key > best[0]:
+                        best = (key, source_id, receiver_id)
+            if best is None:
+                break
+            move(best[1], operator_id, best[2], "capacity")
+
+    if tolerance is None:
+        return moves
+
+    for source_id in sorted(weighted):
+
+        def allowed(operator_id: int) -> int:
+            share = target(source_id, operator_id)
+            return max(
+                math.floor(share * (1 + tolerance)),
+                math.floor(share + min_surplus),
+                math.ceil(share),
+            )
+
+        while len(moves) < max_moves:
+            donors = [
+                (counts[(source_id, op)] - allowed(op), -op)
+                for op in limits
+                if counts[(source_id, op)] > allowed(op)
+            ]
+            recipients = [
+                (target(source_id, op) - counts[(source_id, op)], -op)
+                for op in receivers.get(source_id, ())
+                if has_room(op) and counts[(source_id, op)] < target(source_id, op)
+            ]
+            if not donors or not recipients:
+                break
+            move(source_id, -max(donors)[1], -max(recipients)[1], "share")
+    return moves
+
+
+@dataclass
+class RebalanceReport:
+    """Итог прохода: сколько переносов запланировано и выполнено"""
+
+    planned: int = 0
+    moved: int = 0
+    batches: int = 0
+
+
+class OperatorRebalancer:
+    """Перенос активных обращений с перегруженных операторов
+
+    Снижение load_limit или резкое изменение весов само по себе не трогает
+    уже назначенные обращения. Ребалансировщик строит по счетчикам
+    минимальный план переносов (plan_quotas), подбирает под него конкретные
+    обращения - новые первыми, с учетом навыков обращения - и применяет его
+    пачками по batch_size с паузой между пачками, чтобы не занимать БД и
+    event loop. За проход переносится не больше max_moves обращений,
+    остальное - в следующих проходах.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        tolerance: Optional[float] = 0.5,
+        max_moves: int = 500,
+        batch_size: int = 100,
+        batch_pause: float = 0.5,
+        min_surplus: int = 5,
+    ) -> None:
+        self.session_factory = session_factory
+        self.tolerance = tolerance
+        self.min_surplus = min_surplus
+        self.max_moves = max_moves
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+
+    async def plan(self, session: AsyncSession) -> RebalancePlanResponse:
+        """Построить план переносов без изменений в БД (dry-run)"""
+        contacts = ContactRepository(session)
+        limits: Dict[int, int] = {}
+        masks: Dict[int, int] = {}
+        weights: Dict[int, Dict[int, int]] = defaultdict(dict)
+        source_skills: Dict[int, List[str]] = {}
+        state = await OperatorRepository(session).get_rebalance_state()
+        for operator_id, limit, skills, source_id, weight, required in state:
+            limits[operator_id] = limit
+            masks[operator_id] = skill_index.mask(skills)
+            if source_id is not None:
+                weights[source_id][operator_id] = weight
+                source_skills[source_id] = required or []
+
+        counts = {
+            (source_id, operator_id): n
+            for source_id, operator_id, n in (
+                await contacts.count_active_by_source_operator()
+            )
+            if operator_id in limits
+        }
+        load: Counter = Counter()
+        for (_, operator_id), n in counts.items():
+            load[operator_id] += n
+        overloaded = {
+            op: load[op] - limit for op, limit in limits.items() if load[op] > limit
+        }
+
+        await shift_schedule.ensure_loaded(session)
+        receivers: Dict[int, Set[int]] = {}
+        for source_id, source_weights in weights.items():
+            required = skill_index.required_mask(source_skills[source_id])
+            if required is None:
+                continue
+            receivers[source_id] = {
+                op
+                for op, weight in source_weights.items()
+                if weight > 0
+                and masks[op] & required == required
+                and shift_schedule.on_shift(op)
+            }
+
+        quotas = plan_quotas(
+            counts,
+            weights,
+            limits,
+            receivers,
+            self.tolerance,
+            self.max_moves,
+            self.min_surplus,
+        )
+        moves: List[RebalanceMove] = []
+        if quotas:
+            pending: Dict[Pair, List[QuotaMove]] = defaultdict(list)
+            for quota in quotas:
+                pending[(quota.source_id, quota.from_operator_id)].append(quota)
+            donors = sorted({operator_id for _, operator_id in pending})
+            for (
+                contact_id,
+                source_id,
+                operator_id,
+                skills,
+            ) in await contacts.get_active_of_operators(donors):
+                planned = pending.get((source_id, operator_id))
+                if not planned:
+                    continue
+                required = skill_index.required_mask(
+                    normalize_skills(
+                        [*source_skills.get(source_id, []), *(skills or ())]
+                    )
+                )
+                if required is None:
+                    continue
+                for index, quota in enumerate(planned):
+                    if masks[quota.to_operator_id] & required == required:
+                        moves.append(
+                            RebalanceMove(
+                                contact_id=contact_id,
+                                source_id=source_id,
+                                from_operator_id=operator_id,
+                                to_operator_id=quota.to_operator_id,
+                                reason=quota.reason,
+                            )
+                        )
+                        del planned[index]
+                        break
+
+        for item in moves:
+            load[item.from_operator_id] -= 1
+            load[item.to_operator_id] += 1
+        return RebalancePlanResponse(
+            moves=moves,
+            overloaded=overloaded,
+            unresolved={
+                op: load[op] - limit for op, limit in limits.items() if load[op] > limit
+            },
+        )
+
+    async def rebalance(self) -> RebalanceReport:
+        """Выполнить проход: построить план и применить его пачками"""
+        report = RebalanceReport()
+        async with self.session_factory() as session:
+            plan = await self.plan(session)
+            report.planned = len(plan.moves)
+            repository = ContactRepository(session)
+            for start in range(0, len(plan.moves), self.batch_size):
+                if start:
+                    await asyncio.sleep(self.batch_pause)
+                batch: Dict[int, Dict[int, int]] = defaultdict(dict)
+                for item in plan.moves[start : start + self.batch_size]:
+                    batch[item.from_operator_id][item.contact_id] = item.to_operator_id
+                for from_id, assignments in sorted(batch.items()):
+                    # Обращения, закрытые или переназначенные после построения
+                    # плана, reassign пропускает
+                    moved = await repository.reassign(from_id, assignments)
+                    operator_load_snapshot.contacts_reassigned(from_id, moved)
+                    report.moved += sum(moved.values())
+                report.batches += 1
+
+        if report.moved:
+            await invalidation_bus.publish(
+                keys=["contacts:statistics"], operator_load=True
+            )
+            rebalance_moves_total.inc(amount=report.moved)
+            logger.info(
+                "Operators rebalanced: moved=%s, planned=%s, batches=%s, unresolved=%s",
+                report.moved,
+                report.planned,
+                report.batches,
+                plan.unresolved,
+            )
+        return report
+
+
+operator_rebalancer = OperatorRebalancer(
+    AsyncSessionLocal,
+    tolerance=(
+        settings.operator_rebalance_share_tolerance
+        if settings.operator_rebalance_shares
+        else None
+    ),
+    max_moves=settings.operator_rebalance_max_moves,
+    batch_size=settings.operator_rebalance_batch_size,
+    batch_pause=settings.operator_rebalance_batch_pause_seconds,
+    min_surplus=settings.operator_rebalance_min_surplus,
+)
@@ -0,0 +1,119 @@
+"""Переназначение активных обращений оператора другим операторам"""
+
+import heapq
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domains.contacts.repository import ContactRepository
+from src.domains.operators.repository import OperatorRepository
+from src.domains.operators.schedule import shift_schedule
+from src.domains.operators.schemas import RedistributionResponse
+from src.domains.operators.skills import normalize_skills, skill_index
+
+
+def apportion(
+    count: int, weights: Dict[int, int], capacity: Dict[int, int]
+) -> Dict[int, int]:
+    """Распределить count обращений пропорционально весам в пределах емкости
+
+    Метод наибольшего частного (Д'Онта): очередное обращение получает
+    оператор с наибольшим weight / (назначено + 1) среди тех, у кого еще
+    есть место. capacity уменьшается на назначенное - емкость общая для
+    всех источников оператора.
+    """
+    heap = [(-weight, operator_id) for operator_id, weight in weights.items()]
+    heap = [item for item in heap if capacity.get(item[1], 0) > 0]
+    heapq.heapify(heap)
+    assigned: Dict[int, int] = defaultdict(int)
+    while heap and count > 0:
+        _, operator_id = heapq.heappop(heap)
+        assigned[operator_id] += 1
+        capacity[operator_id] -= 1
+        count -= 1
+        if capacity[operator_id] > 0:
+            priority = weights[operator_id] / (assigned[operator_id] + 1)
+            heapq.heappush(heap, (-priority, operator_id))
+    return dict(assigned)
+
+
+class ContactRedistributor:
+    """Переназначение активных обращений оператора (при отключении или удалении)
+
+    Кандидаты по каждому источнику - активные операторы на смене с весом для
+    источника и навыками источника и обращения; обращения делятся между
+    ними пропорционально весам в пределах свободной емкости (load_limit
+    минус активные обращения). Данные читаются двумя запросами, запись -
+    UPDATE с CASE на чанк обращений одной транзакцией. Обращения, которым
+    не нашлось места, остаются за исходным оператором.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.contacts = ContactRepository(session)
+        self.operators = OperatorRepository(session)
+
+    async def redistribute(self, operator_id: int) -> RedistributionResponse:
+        """Переназначить активные обращения оператора"""
+        contacts = await self.contacts.get_active_assignments(operator_id)
+        if not contacts:
+            return RedistributionResponse(operator_id=operator_id)
+
+        source_ids = sorted({contact.source_id for contact in contacts})
+        rows = await self.operators.get_redistribution_candidates(
+            source_ids, operator_id
+        )
+        await shift_schedule.ensure_loaded(self.session)
+
+        capacity: Dict[int, int] = {}
+        source_skills: Dict[int, List[str]] = {}
+        # Источник -> [(оператор, вес, маска навыков)]
+        candidates: Dict[int, List[Tuple[int, int, int]]] = defaultdict(list)
+        for source_id, required, candidate_id, weight, limit, load, skills in rows:
+            source_skills[source_id] = required or []
+            if not shift_schedule.on_shift(candidate_id):
+                continue
+            capacity[candidate_id] = max(limit - load, 0)
+            candidates[source_id].append(
+                (candidate_id, weight, skill_index.mask(skills))
+            )
+
+        # Обращения с одинаковыми требованиями распределяются вместе
+        groups: Dict[Tuple[int, Tuple[str, ...]], List[int]] = defaultdict(list)
+        for contact_id, source_id, required_skills in contacts:
+            groups[(source_id, tuple(required_skills or ()))].append(contact_id)
+
+        assignments: Dict[int, int] = {}
+        for (source_id, skills), contact_ids in sorted(groups.items()):
+            required = skill_index.required_mask(
+                normalize_skills([*source_skills.get(source_id, []), *skills])
+            )
+            if required is None:
+                continue
+            weights = {
+                candidate_id: weight
+                for candidate_id, weight, mask in candidates[source_id]
+                if mask & required == required
+            }
+            position = 0
+            for candidate_id, count in apportion(
+                len(contact_ids), weights, capacity
+            ).items():
+                for contact_id in contact_ids[position : position + count]:
+                    assignments[contact_id] = candidate_id
+                position += count
+
+        moved = (
+            await self.contacts.reassign(operator_id, assignments)
+            if assignments
+            else {}
+        )
+        reassigned = sum(moved.values())
+        return RedistributionResponse(
+            operator_id=operator_id,
+            total=len(contacts),
+            reassigned=reassigned,
+            remaining=len(contacts) - reassigned,
+            assignments=moved,
+        )
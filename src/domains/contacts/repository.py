@@ -1,23 +1,41 @@
 """Репозиторий для работы с обращениями"""
 
-from typing import List, Optional
+from datetime import datetime
+from typing import AsyncIterator, Collection, Dict, List, Optional, Sequence
 
-from sqlalchemy import select, func
+from sqlalchemy import Row, case, select, func, true, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import noload, selectinload
 
-from src.core.base_repository import BaseRepository
+from src.core.base_repository import GET_MANY_CHUNK_SIZE, BaseRepository
+from src.core.pagination import Cursor
 from src.domains.contacts.model import Contact
 
 
+EXPORT_COLUMNS = (
+    "id",
+    "lead_id",
+    "source_id",
+    "operator_id",
+    "is_active",
+    "message",
+    "created_at",
+    "updated_at",
+)
+
+
 class ContactRepository(BaseRepository[Contact]):
     """Репозиторий обращений"""
 
     def __init__(self, session: AsyncSession):
         super().__init__(session, Contact)
 
-    async def get_by_id_with_relations(self, id: int) -> Optional[Contact]:
+    async def get_by_id_with_relations(
+        self, id: int, fields: Optional[Collection[str]] = None
+    ) -> Optional[Contact]:
         """Получить обращение по ID с загрузкой связанных объектов"""
+        if fields is not None:
+            return await self.get_by_id(id, fields)
         result = await self.session.execute(
             select(Contact)
             .options(
@@ -29,6 +47,121 @@ class ContactRepository(BaseRepository[Contact]):
         )
         return result.scalar_one_or_none()
 
+    async def close_stale(
+        self, source_ids: List[int], cutoff: datetime, limit: int
+    ) -> List[Optional[int]]:
+        """Закрыть до limit активных обращений источников без активности с cutoff
+
+        Один UPDATE по подзапросу (индекс is_active, last_activity_at);
+        возвращает operator_id закрытых обращений. Подзапрос и UPDATE при
+        READ COMMITTED видят разные снимки, поэтому условия повторяются во
+        внешнем WHERE: is_active - чтобы два воркера не закрыли одно обращение
+        дважды, last_activity_at - чтобы не закрыть обращение, обновленное
+        между ними.
+        """
+        # Явное сравнение (не голая колонка), чтобы и SQLite выбрал индекс
+        stale = (
+            select(Contact.id)
+            .where(Contact.is_active == true())
+            .where(Contact.last_activity_at < cutoff)
+            .where(Contact.source_id.in_(source_ids))
+            .order_by(Contact.last_activity_at)
+            .limit(limit)
+        )
+        try:
+            result = await self.session.execute(
+                update(Contact)
+                .where(Contact.id.in_(stale.scalar_subquery()))
+                .where(Contact.is_active == true())
+                .where(Contact.last_activity_at < cutoff)
+                .values(is_active=False, updated_at=datetime.utcnow())
+                .returning(Contact.operator_id)
+                .execution_options(synchronize_session=False)
+            )
+            operator_ids = list(result.scalars().all())
+            await self.session.commit()
+            return operator_ids
+        except Exception:
+            await self.session.rollback()
+            raise
+
+    async def get_active_assignments(self, operator_id: int) -> List[Row]:
+        """Активные обращения оператора без загрузки сущностей:
+        (id, source_id, required_skills)"""
+        result = await self.session.execute(
+            select(Contact.id, Contact.source_id, Contact.required_skills)
+            .where(Contact.operator_id == operator_id)
+            .where(Contact.is_active == true())
+            .order_by(Contact.id)
+        )
+        return list(result.all())
+
+    async def count_active_by_source_operator(self) -> List[Row]:
+        """Активные обращения с оператором: (source_id, operator_id, count)"""
+        result = await self.session.execute(
+            select(Contact.source_id, Contact.operator_id, func.count(Contact.id))
+            .where(Contact.is_active == true())
+            .where(Contact.operator_id.isnot(None))
+            .group_by(Contact.source_id, Contact.operator_id)
+        )
+        return list(result.all())
+
+    async def get_active_of_operators(self, operator_ids: Collection[int]) -> List[Row]:
+        """Активные обращения операторов, новые первыми:
+        (id, source_id, operator_id, required_skills)"""
+        result = await self.session.execute(
+            select(
+                Contact.id,
+                Contact.source_id,
+                Contact.operator_id,
+                Contact.required_skills,
+            )
+            .where(Contact.operator_id.in_(list(operator_ids)))
+            .where(Contact.is_active == true())
+            .order_by(Contact.id.desc())
+        )
+        return list(result.all())
+
+    async def reassign(
+        self,
+        from_operator_id: int,
+        assignments: Dict[int, int],
+        chunk_size: int = GET_MANY_CHUNK_SIZE,
+    ) -> Dict[int, int]:
+        """Переназначить обращения одной транзакцией: ID обращения -> оператор
+
+        UPDATE ... SET operator_id = CASE id ... на чанк ID (обычно все
+        обращения оператора - один запрос). Обращения, которые успели закрыть
+        или переназначить, не затрагиваются. updated_at обновляется, а
+        last_activity_at - нет: перенос активностью не является, и таймаут
+        простоя продолжает отсчитываться. Возвращает, сколько обращений
+        получил каждый оператор.
+        """
+        contact_ids = list(assignments)
+        moved: Dict[int, int] = {}
+        try:
+            for start in range(0, len(contact_ids), chunk_size):
+                chunk = {
+                    id: assignments[id]
+                    for id in contact_ids[start : start + chunk_size]
+                }
+                result = await self.session.execute(
+                    update(Contact)
+                    .where(Contact.id.in_(list(chunk)))
+                    .where(Contact.operator_id == from_operator_id)
+                    .where(Contact.is_active == true())
+                    .values(operator_id=case(chunk, value=Contact.id))
+                    .returning(Contact.operator_id)
+                    .execution_options(synchronize_session=False)
+                )
+                for operator_id in result.scalars().all():
+                    moved[operator_id] = moved.get(operator_id, 0) + 1
+            await self.session.commit()
+            return moved
+        except Exception:
+            await self.session.rollback()
+            raise
+
     async def get_by_lead(self, lead_id: int) -> List[Contact]:
         """Получить все обращения лида с загрузкой связанных объектов"""
         result = await self.session.execute(
@@ -42,6 +175,38 @@ class ContactRepository(BaseRepository[Contact]):
         )
         return list(result.scalars().all())
 
+    async def get_lead_timeline(
+        self,
+        lead_id: int,
+        limit: int,
+        cursor: Optional[Cursor] = None,
+        source_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+    ) -> List[Contact]:
+        """Страница обращений лида от новых к старым (keyset по created_at, id)"""
+        query = (
+            select(Contact)
+            .options(noload("*"))
+            .where(Contact.lead_id == lead_id)
+            .order_by(Contact.created_at.desc(), Contact.id.desc())
+            .limit(limit)
+        )
+        if cursor is not None:
+            query = query.where(tuple_(Contact.created_at, Contact.id) < cursor)
+        if source_id is not None:
+            query = query.where(Contact.source_id == source_id)
+        if is_active is not None:
+            query = query.where(Contact.is_active == is_active)
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def count_by_lead(self, lead_id: int) -> int:
+        """Количество обращений лида"""
+        result = await self.session.execute(
+            select(func.count(Contact.id)).where(Contact.lead_id == lead_id)
+        )
+        return result.scalar_one()
+
     async def get_by_source(self, source_id: int) -> List[Contact]:
         """Получить все обращения по источнику"""
         result = await self.session.execute(
@@ -87,3 +252,32 @@ class ContactRepository(BaseRepository[Contact]):
             stats[source_id][operator_id] = count
 
         return stats
+
+    async def stream_for_export(
+        self,
+        source_id: Optional[int] = None,
+        operator_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Потоково выгрузить обращения пачками через серверный курсор"""
+        query = select(*(getattr(Contact, c) for c in EXPORT_COLUMNS))
+        if source_id is not None:
+            query = query.where(Contact.source_id == source_id)
+        if operator_id is not None:
+            query = query.where(Contact.operator_id == operator_id)
+        if is_active is not None:
+            query = query.where(Contact.is_active == is_active)
+        if created_from is not None:
+            query = query.where(Contact.created_at >= created_from)
+        if created_to is not None:
+            query = query.where(Contact.created_at < created_to)
+
+        # Только колонки, без ORM-сущностей: identity map не растет
+        result = await self.session.stream(
+            query.order_by(Contact.id).execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions():
+            yield partition
@@ -1,13 +1,13 @@
 """Pydantic схемы для обращений"""
 
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel
 
 from src.core.schemas import TimestampMixin
 from src.domains.leads.schemas import LeadResponse
 from src.domains.sources.schemas import SourceResponse
-from src.domains.operators.schemas import OperatorResponse
+from src.domains.operators.schemas import OperatorResponse, SkillList
 
 
 class ContactBase(BaseModel):
@@ -32,6 +32,8 @@ class ContactCreate(BaseModel):
 
     # Дополнительные данные
     message: Optional[str] = None
+    # Навыки оператора, нужные для обращения (в дополнение к навыкам источника)
+    required_skills: SkillList = []
 
 
 class ContactUpdate(BaseModel):
@@ -48,6 +50,7 @@ class ContactResponse(ContactBase, TimestampMixin):
     id: int
     operator_id: Optional[int] = None
     is_active: bool
+    required_skills: List[str] = []
 
     model_config = {"from_attributes": True}
 
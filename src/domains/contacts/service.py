@@ -1,10 +1,17 @@
 """Сервис для бизнес-логики обращений"""
 
 import random
-from typing import List, Optional
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Sequence
 
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.cache import response_cache
+from src.core.batch import batch_fields, batch_response
 from src.core.exceptions import NotFoundError
-from src.domains.contacts.repository import ContactRepository
+from src.core.fields import FieldSet, response_schema
+from src.core.schemas import BatchResponse
+from src.domains.contacts.repository import ContactRepository, EXPORT_COLUMNS
 from src.domains.contacts.schemas import (
     ContactCreate,
     ContactUpdate,
@@ -16,8 +23,14 @@ from src.domains.sources.repository import (
     SourceRepository,
     SourceOperatorWeightRepository,
 )
+from src.domains.operators.load_snapshot import operator_load_snapshot
 from src.domains.operators.repository import OperatorRepository
-from src.utils.logger import logger
+from src.domains.operators.schedule import shift_schedule
+from src.domains.operators.skills import normalize_skills, skill_index
+from src.utils.export import ExportFormat, encode_rows
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class ContactService:
@@ -42,7 +55,7 @@ class ContactService:
         # Проверяем существование источника
         source = await self.source_repository.get_by_id(data.source_id)
         if not source:
-            logger.warning(f"Source not found: source_id={data.source_id}")
+            logger.warning("Source not found: source_id=%s", data.source_id)
             raise NotFoundError("Source")
 
         # Находим или создаем лида
@@ -53,8 +66,12 @@ class ContactService:
             name=data.name,
         )
 
-        # Выбираем оператора
-        operator_id = await self._select_operator(data.source_id)
+        # Выбираем оператора с навыками источника и обращения
+        required_skills = normalize_skills(data.required_skills)
+        operator_id = await self._select_operator(
+            data.source_id,
+            normalize_skills([*source.required_skills, *required_skills]),
+        )
 
         # Создаем обращение
         contact = await self.repository.create(
@@ -63,25 +80,52 @@ class ContactService:
             operator_id=operator_id,
             message=data.message,
             is_active=True,
+            required_skills=required_skills,
         )
+        operator_load_snapshot.contact_created(operator_id, is_active=True)
 
         # Загружаем связанные данные
         contact = await self.repository.get_by_id_with_relations(contact.id)
         if not contact:
-            logger.error(f"Contact created but not found: contact_id={contact.id}")
+            logger.error("Contact created but not found: contact_id=%s", contact.id)
             raise NotFoundError("Contact")
 
         return ContactDetailResponse.model_validate(contact)
 
-    async def _select_operator(self, source_id: int) -> Optional[int]:
+    async def _select_operator(
+        self, source_id: int, required_skills: Sequence[str] = ()
+    ) -> Optional[int]:
         """Выбрать оператора для источника по алгоритму распределения"""
         # Получаем доступных операторов
         available_operators = await self.operator_repository.get_available_operators(
             source_id
         )
+        # Операторы вне смены новых обращений не получают (проверка в памяти)
+        await shift_schedule.ensure_loaded(self.operator_repository.session)
+        available_operators = [
+            op for op in available_operators if shift_schedule.on_shift(op.id)
+        ]
+
+        # Навыки: маски операторов считаются до маски требований - навык,
+        # которого нет ни у одного кандидата, не получает бита
+        if required_skills:
+            masks = [(op, skill_index.mask(op.skills)) for op in available_operators]
+            required = skill_index.required_mask(required_skills)
+            available_operators = (
+                []
+                if required is None
+                else [op for op, mask in masks if mask & required == required]
+            )
+            if not available_operators:
+                logger.warning(
+                    "No operators with required skills: source_id=%s, skills=%s",
+                    source_id,
+                    required_skills,
+                )
+                return None
 
         if not available_operators:
-            logger.warning(f"No available operators for source: source_id={source_id}")
+            logger.warning("No available operators for source: source_id=%s", source_id)
             return None
 
         # Получаем веса для этих операторов
@@ -95,7 +139,7 @@ class ContactService:
 
         if not operators_with_weights:
             logger.warning(
-                f"No operators with weights for source: source_id={source_id}"
+                "No operators with weights for source: source_id=%s", source_id
             )
             return None
 
@@ -119,39 +163,90 @@ class ContactService:
         # На всякий случай возвращаем первого
         return operators_with_weights[0].id
 
-    async def get_contact(self, contact_id: int) -> ContactDetailResponse:
-        """Получить обращение по ID"""
-        contact = await self.repository.get_by_id_with_relations(contact_id)
+    async def get_contact(
+        self, contact_id: int, fields: Optional[FieldSet] = None
+    ) -> ContactDetailResponse:
+        """Получить обращение по ID (с fields - только запрошенные поля)"""
+        contact = await self.repository.get_by_id_with_relations(contact_id, fields)
         if not contact:
-            logger.warning(f"Contact not found: contact_id={contact_id}")
+            logger.warning("Contact not found: contact_id=%s", contact_id)
             raise NotFoundError("Contact")
-        return ContactDetailResponse.model_validate(contact)
+        return response_schema(ContactDetailResponse, fields).model_validate(contact)
+
+    async def get_contacts_by_ids(
+        self, ids: List[int]
+    ) -> BatchResponse[ContactDetailResponse]:
+        """Получить обращений по списку ID одним запросом"""
+        rows = await self.repository.get_many(ids, batch_fields(ContactDetailResponse))
+        return batch_response(ids, rows, ContactDetailResponse)
 
     async def get_all_contacts(
-        self, skip: int = 0, limit: int = 100
+        self, skip: int = 0, limit: int = 100, fields: Optional[FieldSet] = None
     ) -> List[ContactResponse]:
-        """Получить все обращения"""
-        contacts = await self.repository.get_all(skip=skip, limit=limit)
-        return [ContactResponse.model_validate(c) for c in contacts]
+        """Получить все обращения (с fields - только запрошенные поля)"""
+        contacts = await self.repository.get_all(skip=skip, limit=limit, fields=fields)
+        schema = response_schema(ContactResponse, fields)
+        return [schema.model_validate(c) for c in contacts]
 
     async def get_contacts_by_lead(self, lead_id: int) -> List[ContactDetailResponse]:
         """Получить все обращения лида"""
         contacts = await self.repository.get_by_lead(lead_id)
         return [ContactDetailResponse.model_validate(c) for c in contacts]
 
+    def export_contacts(
+        self,
+        export_format: ExportFormat,
+        source_id: Optional[int] = None,
+        operator_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> AsyncIterator[bytes]:
+        """Потоковая выгрузка обращений
+
+        Строки читаются сессией запроса уже во время отправки тела ответа:
+        FastAPI закрывает yield-зависимости (get_db) после ответа с 0.118.
+        """
+        partitions = self.repository.stream_for_export(
+            source_id=source_id,
+            operator_id=operator_id,
+            is_active=is_active,
+            created_from=created_from,
+            created_to=created_to,
+        )
+        return encode_rows(partitions, EXPORT_COLUMNS, export_format)
+
     async def update_contact(
         self, contact_id: int, data: ContactUpdate
     ) -> ContactResponse:
         """Обновить обращение"""
         contact = await self.repository.get_by_id(contact_id)
         if not contact:
-            logger.warning(f"Contact not found for update: contact_id={contact_id}")
+            logger.warning("Contact not found for update: contact_id=%s", contact_id)
             raise NotFoundError("Contact")
 
+        # Старые значения фиксируем до UPDATE: он синхронизирует identity map
+        old_operator_id, old_is_active = contact.operator_id, contact.is_active
+
         update_data = data.model_dump(exclude_unset=True)
-        updated_contact = await self.repository.update(contact_id, **update_data)
+        # Изменение через API - активность: таймаут простоя отсчитывается заново
+        updated_contact = await self.repository.update(
+            contact_id, last_activity_at=datetime.utcnow(), **update_data
+        )
+        operator_load_snapshot.contact_updated(
+            old_operator_id,
+            old_is_active,
+            updated_contact.operator_id,
+            updated_contact.is_active,
+        )
         return ContactResponse.model_validate(updated_contact)
 
     async def get_statistics(self) -> dict:
         """Получить статистику распределения обращений"""
-        return await self.repository.get_statistics()
+
+        async def load(session: AsyncSession) -> dict:
+            return await ContactRepository(session).get_statistics()
+
+        return await response_cache.get_or_load(
+            "contacts:statistics", load, self.repository.session
+        )
@@ -0,0 +1,123 @@
+"""Автоматическое закрытие простаивающих обращений"""
+
+import asyncio
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.core.invalidation import invalidation_bus
+from src.core.metrics import registry
+from src.domains.contacts.repository import ContactRepository
+from src.domains.operators.load_snapshot import operator_load_snapshot
+from src.domains.sources.model import Source
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+stale_contacts_closed_total = registry.counter(
+    "stale_contacts_closed_total", "Idle contacts closed by the sweeper"
+)
+stale_contacts_freed_slots_total = registry.counter(
+    "stale_contacts_freed_slots_total",
+    "Operator slots freed by closing idle contacts",
+)
+
+
+@dataclass
+class SweepReport:
+    """Итог прохода: сколько обращений закрыто и сколько мест освобождено"""
+
+    closed: int = 0
+    # Оператор -> освобожденные места (закрытые обращения с оператором)
+    freed: Dict[int, int] = field(default_factory=dict)
+    batches: int = 0
+
+    @property
+    def freed_slots(self) -> int:
+        return sum(self.freed.values())
+
+
+class StaleContactSweeper:
+    """Закрытие активных обращений без активности дольше таймаута источника
+
+    Источники группируются по таймауту; для каждой группы обращения
+    закрываются пачками по batch_size одним UPDATE на пачку, каждая пачка -
+    отдельная транзакция. За проход выполняется не больше max_batches
+    пачек, остальное закроется в следующих проходах.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        batch_size: int = 1000,
+        max_batches: int = 20,
+        default_idle_minutes: Optional[int] = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.default_idle_minutes = default_idle_minutes
+
+    async def _timeout_groups(self, session: AsyncSession) -> Dict[int, List[int]]:
+        """Таймаут в минутах -> источники с этим таймаутом"""
+        rows = await session.execute(select(Source.id, Source.idle_timeout_minutes))
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for source_id, minutes in rows.all():
+            minutes = minutes or self.default_idle_minutes
+            if minutes:
+                groups[minutes].append(source_id)
+        return groups
+
+    async def sweep(self, now: Optional[datetime] = None) -> SweepReport:
+        """Выполнить проход и учесть освобожденные места в снимке нагрузки"""
+        now = now or datetime.utcnow()
+        report = SweepReport()
+        freed: Counter = Counter()
+        async with self.session_factory() as session:
+            groups = await self._timeout_groups(session)
+            repository = ContactRepository(session)
+            for minutes, source_ids in sorted(groups.items()):
+                cutoff = now - timedelta(minutes=minutes)
+                while report.batches < self.max_batches:
+                    operator_ids = await repository.close_stale(
+                        source_ids, cutoff, self.batch_size
+                    )
+                    report.batches += 1
+                    report.closed += len(operator_ids)
+                    freed.update(op for op in operator_ids if op is not None)
+                    if len(operator_ids) < self.batch_size:
+                        break
+                    # Между пачками отдаем event loop обработке запросов
+                    await asyncio.sleep(0)
+        report.freed = dict(freed)
+
+        if report.closed:
+            operator_load_snapshot.contacts_closed(report.freed)
+            await invalidation_bus.publish(
+                keys=["contacts:statistics"], operator_load=True
+            )
+            stale_contacts_closed_total.inc(amount=report.closed)
+            stale_contacts_freed_slots_total.inc(amount=report.freed_slots)
+            logger.info(
+                "Stale contacts closed: closed=%s, freed_slots=%s, operators=%s, "
+                "batches=%s",
+                report.closed,
+                report.freed_slots,
+                len(report.freed),
+                report.batches,
+            )
+        return report
+
+
+stale_contact_sweeper = StaleContactSweeper(
+    AsyncSessionLocal,
+    batch_size=settings.stale_contact_batch_size,
+    max_batches=settings.stale_contact_max_batches,
+    default_idle_minutes=settings.contact_idle_timeout_minutes,
+)
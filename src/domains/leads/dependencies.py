@@ -5,6 +5,7 @@ from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.database import get_db
+from src.domains.contacts.repository import ContactRepository
 from src.domains.leads.repository import LeadRepository
 from src.domains.leads.service import LeadService
 
@@ -14,11 +15,19 @@ def get_lead_repository(session: AsyncSession = Depends(get_db)) -> LeadReposito
     return LeadRepository(session)
 
 
+def get_contact_repository(
+    session: AsyncSession = Depends(get_db),
+) -> ContactRepository:
+    """Получить репозиторий обращений"""
+    return ContactRepository(session)
+
+
 def get_lead_service(
     repository: LeadRepository = Depends(get_lead_repository),
+    contact_repository: ContactRepository = Depends(get_contact_repository),
 ) -> LeadService:
     """Получить сервис лидов"""
-    return LeadService(repository)
+    return LeadService(repository, contact_repository)
 
 
 LeadServiceDep = Annotated[LeadService, Depends(get_lead_service)]
@@ -1,15 +1,26 @@
 """Репозиторий для работы с лидами"""
 
-from typing import Optional
+from datetime import datetime
+from typing import AsyncIterator, Optional, Sequence
 
-from sqlalchemy import select, or_
+from sqlalchemy import Row, select, or_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from src.core.base_repository import BaseRepository
 from src.domains.leads.model import Lead
 
 
+EXPORT_COLUMNS = (
+    "id",
+    "external_id",
+    "phone",
+    "email",
+    "name",
+    "created_at",
+    "updated_at",
+)
+
+
 class LeadRepository(BaseRepository[Lead]):
     """Репозиторий лидов"""
 
@@ -61,16 +72,45 @@ class LeadRepository(BaseRepository[Lead]):
             await self.session.rollback()
             raise
 
-    async def get_by_id_with_contacts(self, id: int) -> Optional[Lead]:
-        """Получить лида по ID с загрузкой обращений и их связанных объектов"""
+    async def stream_for_export(
+        self,
+        source_id: Optional[int] = None,
+        operator_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Потоково выгрузить лидов пачками через серверный курсор
+
+        Фильтры по источнику, оператору и активности применяются к обращениям
+        лида: выгружаются лиды, у которых есть хотя бы одно подходящее обращение.
+        """
         from src.domains.contacts.model import Contact
 
-        result = await self.session.execute(
-            select(Lead)
-            .options(
-                selectinload(Lead.contacts).selectinload(Contact.source),
-                selectinload(Lead.contacts).selectinload(Contact.operator),
+        query = select(*(getattr(Lead, c) for c in EXPORT_COLUMNS))
+
+        contact_conditions = []
+        if source_id is not None:
+            contact_conditions.append(Contact.source_id == source_id)
+        if operator_id is not None:
+            contact_conditions.append(Contact.operator_id == operator_id)
+        if is_active is not None:
+            contact_conditions.append(Contact.is_active == is_active)
+        if contact_conditions:
+            query = query.where(
+                select(Contact.id)
+                .where(Contact.lead_id == Lead.id, *contact_conditions)
+                .exists()
             )
-            .where(Lead.id == id)
+
+        if created_from is not None:
+            query = query.where(Lead.created_at >= created_from)
+        if created_to is not None:
+            query = query.where(Lead.created_at < created_to)
+
+        result = await self.session.stream(
+            query.order_by(Lead.id).execution_options(yield_per=batch_size)
         )
-        return result.scalar_one_or_none()
+        async for partition in result.partitions():
+            yield partition
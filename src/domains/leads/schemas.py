@@ -45,8 +45,10 @@ class LeadResponse(LeadBase, TimestampMixin):
 
 
 class LeadWithContactsResponse(LeadResponse):
-    """Схема лида с обращениями"""
+    """Схема лида с последними обращениями и их общим количеством"""
 
     contacts: List["ContactResponse"] = Field(default_factory=list)
+    contacts_total: int = 0
+    contacts_next_cursor: Optional[str] = None
 
     model_config = {"from_attributes": True}
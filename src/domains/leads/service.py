@@ -1,61 +1,176 @@
 """Сервис для бизнес-логики лидов"""
 
-from typing import List
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
 
+from src.core.batch import batch_fields, batch_response
+from src.core.config import settings
 from src.core.exceptions import NotFoundError
-from src.domains.leads.repository import LeadRepository
+from src.core.fields import FieldSet, response_schema
+from src.core.invalidation import invalidation_bus
+from src.core.pagination import Cursor, decode_cursor, encode_cursor
+from src.core.schemas import BatchResponse, CursorPage
+from src.domains.contacts.repository import ContactRepository
+from src.domains.contacts.schemas import ContactResponse
+from src.domains.leads.repository import LeadRepository, EXPORT_COLUMNS
 from src.domains.leads.schemas import (
     LeadCreate,
     LeadUpdate,
     LeadResponse,
     LeadWithContactsResponse,
 )
-from src.utils.logger import logger
+from src.utils.export import ExportFormat, encode_rows
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Колонки лида для ответа без загрузки обращений
+LEAD_COLUMNS = frozenset(LeadResponse.model_fields)
 
 
 class LeadService:
     """Сервис лидов"""
 
-    def __init__(self, repository: LeadRepository):
+    def __init__(
+        self, repository: LeadRepository, contact_repository: ContactRepository
+    ):
         self.repository = repository
+        self.contact_repository = contact_repository
 
     async def create_lead(self, data: LeadCreate) -> LeadResponse:
         """Создать лида"""
         lead = await self.repository.create(**data.model_dump())
         return LeadResponse.model_validate(lead)
 
-    async def get_lead(self, lead_id: int) -> LeadResponse:
-        """Получить лида по ID"""
-        lead = await self.repository.get_by_id(lead_id)
+    async def get_lead(
+        self, lead_id: int, fields: Optional[FieldSet] = None
+    ) -> LeadResponse:
+        """Получить лида по ID (с fields - только запрошенные поля)"""
+        lead = await self.repository.get_by_id(lead_id, fields)
         if not lead:
-            logger.warning(f"Lead not found: lead_id={lead_id}")
+            logger.warning("Lead not found: lead_id=%s", lead_id)
             raise NotFoundError("Lead")
-        return LeadResponse.model_validate(lead)
+        return response_schema(LeadResponse, fields).model_validate(lead)
 
     async def get_lead_with_contacts(self, lead_id: int) -> LeadWithContactsResponse:
-        """Получить лида с обращениями"""
-        lead = await self.repository.get_by_id_with_contacts(lead_id)
+        """Получить лида с последними обращениями (не больше preview-лимита)"""
+        # Только колонки лида: все обращения (Lead.contacts) не загружаем
+        lead = await self.repository.get_by_id(lead_id, LEAD_COLUMNS)
         if not lead:
-            logger.warning(f"Lead not found: lead_id={lead_id}")
+            logger.warning("Lead not found: lead_id=%s", lead_id)
             raise NotFoundError("Lead")
-        return LeadWithContactsResponse.model_validate(lead)
+        page = await self._contacts_page(lead_id, settings.lead_contacts_preview_limit)
+        total = len(page.items)
+        if page.next_cursor is not None:
+            total = await self.contact_repository.count_by_lead(lead_id)
+        return LeadWithContactsResponse(
+            **LeadResponse.model_validate(lead).model_dump(),
+            contacts=page.items,
+            contacts_total=total,
+            contacts_next_cursor=page.next_cursor,
+        )
 
-    async def get_all_leads(
+    async def get_lead_contacts(
+        self,
+        lead_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        source_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+    ) -> CursorPage[ContactResponse]:
+        """Получить страницу обращений лида от новых к старым"""
+        page = await self._contacts_page(
+            lead_id,
+            limit,
+            decode_cursor(cursor) if cursor else None,
+            source_id=source_id,
+            is_active=is_active,
+        )
+        # Существование лида проверяем, только если страница пустая
+        if not page.items and not await self.repository.get_version(lead_id):
+            logger.warning("Lead not found: lead_id=%s", lead_id)
+            raise NotFoundError("Lead")
+        return page
+
+    async def _contacts_page(
+        self,
+        lead_id: int,
+        limit: int,
+        cursor: Optional[Cursor] = None,
+        source_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+    ) -> CursorPage[ContactResponse]:
+        """Страница обращений лида (лишняя запись показывает, есть ли следующая)"""
+        contacts = await self.contact_repository.get_lead_timeline(
+            lead_id,
+            limit + 1,
+            cursor,
+            source_id=source_id,
+            is_active=is_active,
+        )
+        next_cursor = None
+        if len(contacts) > limit:
+            contacts = contacts[:limit]
+            next_cursor = encode_cursor(contacts[-1].created_at, contacts[-1].id)
+        return CursorPage[ContactResponse](
+            items=[ContactResponse.model_validate(c) for c in contacts],
+            next_cursor=next_cursor,
+        )
+
+    async def get_leads_by_ids(self, ids: List[int]) -> BatchResponse[LeadResponse]:
+        """Получить лидов по списку ID одним запросом"""
+        rows = await self.repository.get_many(ids, batch_fields(LeadResponse))
+        return batch_response(ids, rows, LeadResponse)
+
+    async def get_lead_version(self, lead_id: int) -> List[Tuple[int, datetime]]:
+        """Получить версию лида для условного GET (пустой список, если нет)"""
+        version = await self.repository.get_version(lead_id)
+        return [version] if version else []
+
+    async def get_leads_versions(
         self, skip: int = 0, limit: int = 100
+    ) -> List[Tuple[int, datetime]]:
+        """Получить версии страницы лидов для условного GET"""
+        return await self.repository.get_versions(skip=skip, limit=limit)
+
+    async def get_all_leads(
+        self, skip: int = 0, limit: int = 100, fields: Optional[FieldSet] = None
     ) -> List[LeadResponse]:
-        """Получить всех лидов"""
-        leads = await self.repository.get_all(skip=skip, limit=limit)
-        return [LeadResponse.model_validate(lead) for lead in leads]
+        """Получить всех лидов (с fields - только запрошенные поля)"""
+        leads = await self.repository.get_all(skip=skip, limit=limit, fields=fields)
+        schema = response_schema(LeadResponse, fields)
+        return [schema.model_validate(lead) for lead in leads]
+
+    def export_leads(
+        self,
+        export_format: ExportFormat,
+        source_id: Optional[int] = None,
+        operator_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> AsyncIterator[bytes]:
+        """Потоковая выгрузка лидов (сессия запроса читается во время отправки
+        тела ответа - см. ContactService.export_contacts)"""
+        partitions = self.repository.stream_for_export(
+            source_id=source_id,
+            operator_id=operator_id,
+            is_active=is_active,
+            created_from=created_from,
+            created_to=created_to,
+        )
+        return encode_rows(partitions, EXPORT_COLUMNS, export_format)
 
     async def update_lead(self, lead_id: int, data: LeadUpdate) -> LeadResponse:
         """Обновить лида"""
         lead = await self.repository.get_by_id(lead_id)
         if not lead:
-            logger.warning(f"Lead not found for update: lead_id={lead_id}")
+            logger.warning("Lead not found for update: lead_id=%s", lead_id)
             raise NotFoundError("Lead")
 
         update_data = data.model_dump(exclude_unset=True)
         updated_lead = await self.repository.update(lead_id, **update_data)
+        await invalidation_bus.publish(prefixes=[f"leads:{lead_id}:"])
         return LeadResponse.model_validate(updated_lead)
 
     async def find_or_create_lead(self, data: LeadCreate) -> LeadResponse:
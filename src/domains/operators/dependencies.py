@@ -5,7 +5,10 @@ from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.database import get_db
-from src.domains.operators.repository import OperatorRepository
+from src.domains.operators.repository import (
+    OperatorRepository,
+    OperatorShiftRepository,
+)
 from src.domains.operators.service import OperatorService
 
 
@@ -16,11 +19,19 @@ def get_operator_repository(
     return OperatorRepository(session)
 
 
+def get_operator_shift_repository(
+    session: AsyncSession = Depends(get_db),
+) -> OperatorShiftRepository:
+    """Получить репозиторий смен операторов"""
+    return OperatorShiftRepository(session)
+
+
 def get_operator_service(
     repository: OperatorRepository = Depends(get_operator_repository),
+    shift_repository: OperatorShiftRepository = Depends(get_operator_shift_repository),
 ) -> OperatorService:
     """Получить сервис операторов"""
-    return OperatorService(repository)
+    return OperatorService(repository, shift_repository)
 
 
 OperatorServiceDep = Annotated[OperatorService, Depends(get_operator_service)]
@@ -0,0 +1,239 @@
+"""In-memory снимок нагрузки операторов"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domains.contacts.model import Contact
+from src.domains.operators.model import Operator
+from src.domains.operators.schemas import OperatorLoadResponse
+from src.domains.sources.model import SourceOperatorWeight
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class OperatorLoad:
+    """Нагрузка оператора в снимке"""
+
+    operator_id: int
+    name: str
+    is_active: bool
+    load_limit: int
+    active_load: int = 0
+    source_ids: Set[int] = field(default_factory=set)
+
+
+class OperatorLoadSnapshot:
+    """Снимок нагрузки всех операторов
+
+    Полностью пересобирается из БД (reconcile) при первом обращении и
+    периодически в фоне, а между сверками обновляется инкрементально при
+    создании и изменении обращений. Готовый ответ кешируется до следующего
+    изменения снимка.
+    """
+
+    def __init__(self) -> None:
+        self._operators: Dict[int, OperatorLoad] = {}
+        self._loaded = False
+        self._version = 0
+        self._response: Optional[List[OperatorLoadResponse]] = None
+        self._response_version = -1
+
+    @property
+    def loaded(self) -> bool:
+        """Собран ли снимок"""
+        return self._loaded
+
+    def reset(self) -> None:
+        """Сбросить снимок (будет пересобран при следующем обращении)"""
+        self._operators = {}
+        self._loaded = False
+        self._touch()
+
+    def _touch(self) -> None:
+        """Отметить изменение снимка"""
+        self._version += 1
+
+    def _unloaded(self) -> bool:
+        """Снимок не собран: изменение только отмечается (для reconcile)"""
+        if self._loaded:
+            return False
+        self._touch()
+        return True
+
+    async def reconcile(self, session: AsyncSession, attempts: int = 3) -> None:
+        """Пересобрать снимок из БД тремя запросами
+
+        Изменение, пришедшее во время запросов, в собранный снимок могло не
+        попасть или попасть дважды (и в счетчик из БД, и инкрементом). Как в
+        ResponseCache, версия сверяется до и после сборки: если она
+        изменилась, снимок собирается заново, не больше attempts раз -
+        последняя сборка принимается, расхождение исправит следующая сверка.
+        """
+        for _ in range(attempts):
+            version = self._version
+            snapshot = await self._load(session)
+            if self._version == version:
+                break
+        else:
+            logger.info(
+                "Operator load snapshot changed during reconcile: attempts=%s",
+                attempts,
+            )
+
+        drift = sum(
+            abs(snapshot[op_id].active_load - current.active_load)
+            for op_id, current in self._operators.items()
+            if op_id in snapshot
+        )
+        if self._loaded and drift:
+            logger.info("Operator load snapshot reconciled: drift=%s", drift)
+
+        self._operators = snapshot
+        self._loaded = True
+        self._touch()
+
+    async def _load(self, session: AsyncSession) -> Dict[int, OperatorLoad]:
+        """Собрать снимок из БД"""
+        operators = (await session.execute(select(Operator))).scalars().all()
+        loads = await session.execute(
+            select(Contact.operator_id, func.count(Contact.id))
+            .where(Contact.is_active)
+            .where(Contact.operator_id.isnot(None))
+            .group_by(Contact.operator_id)
+        )
+        load_map = {operator_id: count for operator_id, count in loads.all()}
+        weights = await session.execute(
+            select(SourceOperatorWeight.operator_id, SourceOperatorWeight.source_id)
+        )
+
+        snapshot = {
+            op.id: OperatorLoad(
+                operator_id=op.id,
+                name=op.name,
+                is_active=op.is_active,
+                load_limit=op.load_limit,
+                active_load=load_map.get(op.id, 0),
+            )
+            for op in operators
+        }
+        for operator_id, source_id in weights.all():
+            if operator_id in snapshot:
+                snapshot[operator_id].source_ids.add(source_id)
+        return snapshot
+
+    async def get_all(self, session: AsyncSession) -> List[OperatorLoadResponse]:
+        """Получить нагрузку всех операторов"""
+        if not self._loaded:
+            await self.reconcile(session)
+        if self._response_version != self._version:
+            self._response = [
+                OperatorLoadResponse(
+                    operator_id=load.operator_id,
+                    name=load.name,
+                    is_active=load.is_active,
+                    load_limit=load.load_limit,
+                    active_load=load.active_load,
+                    headroom=max(load.load_limit - load.active_load, 0),
+                    source_ids=sorted(load.source_ids),
+                )
+                for load in sorted(
+                    self._operators.values(), key=lambda x: x.operator_id
+                )
+            ]
+            self._response_version = self._version
+        return self._response
+
+    def _adjust(self, operator_id: Optional[int], delta: int) -> None:
+        """Изменить счетчик активных обращений оператора"""
+        if operator_id is None:
+            return
+        load = self._operators.get(operator_id)
+        if load is not None:
+            load.active_load = max(load.active_load + delta, 0)
+            self._touch()
+
+    def contact_created(self, operator_id: Optional[int], is_active: bool) -> None:
+        """Учесть созданное обращение"""
+        if not self._unloaded() and is_active:
+            self._adjust(operator_id, 1)
+
+    def contact_updated(
+        self,
+        old_operator_id: Optional[int],
+        old_is_active: bool,
+        new_operator_id: Optional[int],
+        new_is_active: bool,
+    ) -> None:
+        """Учесть изменение оператора или активности обращения"""
+        if self._unloaded():
+            return
+        if old_is_active:
+            self._adjust(old_operator_id, -1)
+        if new_is_active:
+            self._adjust(new_operator_id, 1)
+
+    def contacts_closed(self, closed: Dict[int, int]) -> None:
+        """Учесть пакетное закрытие обращений: оператор -> сколько закрыто"""
+        if self._unloaded():
+            return
+        for operator_id, count in closed.items():
+            self._adjust(operator_id, -count)
+
+    def contacts_reassigned(self, from_operator_id: int, moved: Dict[int, int]):
+        """Учесть переназначение обращений: оператор -> сколько получил"""
+        if self._unloaded():
+            return
+        self._adjust(from_operator_id, -sum(moved.values()))
+        for operator_id, count in moved.items():
+            self._adjust(operator_id, count)
+
+    def operator_saved(self, operator: Operator) -> None:
+        """Учесть создание или изменение оператора"""
+        if self._unloaded():
+            return
+        load = self._operators.get(operator.id)
+        if load is None:
+            self._operators[operator.id] = OperatorLoad(
+                operator_id=operator.id,
+                name=operator.name,
+                is_active=operator.is_active,
+                load_limit=operator.load_limit,
+            )
+        else:
+            load.name = operator.name
+            load.is_active = operator.is_active
+            load.load_limit = operator.load_limit
+        self._touch()
+
+    def operator_deleted(self, operator_id: int) -> None:
+        """Учесть удаление оператора"""
+        self._operators.pop(operator_id, None)
+        self._touch()
+
+    def weight_set(self, source_id: int, operator_id: int) -> None:
+        """Учесть назначение оператора на источник"""
+        load = self._operators.get(operator_id)
+        if load is not None:
+            load.source_ids.add(source_id)
+        self._touch()
+
+    def weight_removed(self, source_id: int, operator_id: int) -> None:
+        """Учесть снятие оператора с источника"""
+        load = self._operators.get(operator_id)
+        if load is not None:
+            load.source_ids.discard(source_id)
+        self._touch()
+
+    def source_deleted(self, source_id: int) -> None:
+        """Учесть удаление источника (веса удаляются каскадно)"""
+        for load in self._operators.values():
+            load.source_ids.discard(source_id)
+        self._touch()
+
+
+operator_load_snapshot = OperatorLoadSnapshot()
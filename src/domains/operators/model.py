@@ -1,6 +1,6 @@
 """Модель оператора"""
 
-from sqlalchemy import Column, Boolean, Integer, String
+from sqlalchemy import JSON, Column, Boolean, ForeignKey, Integer, String, Time
 from sqlalchemy.orm import relationship
 
 from src.core.base_model import BaseModel
@@ -14,9 +14,32 @@ class Operator(BaseModel):
     name = Column(String, nullable=False, index=True)
     is_active = Column(Boolean, default=True, nullable=False)
     load_limit = Column(Integer, default=10, nullable=False)  # Лимит активных обращений
+    # Навыки (язык, продуктовая линия): нижний регистр, без повторов, по порядку
+    skills = Column(JSON, default=list, server_default="[]", nullable=False)
 
     # Связи
     contacts = relationship("Contact", back_populates="operator", lazy="selectin")
     source_weights = relationship(
         "SourceOperatorWeight", back_populates="operator", lazy="selectin"
     )
+
+
+class OperatorShift(BaseModel):
+    """Еженедельная смена оператора в его часовом поясе
+
+    Если end_time не позже start_time, смена заканчивается на следующий день.
+    Оператор без смен доступен всегда.
+    """
+
+    __tablename__ = "operator_shifts"
+
+    operator_id = Column(
+        Integer,
+        ForeignKey("operators.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    weekday = Column(Integer, nullable=False)  # 0 - понедельник, 6 - воскресенье
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+    timezone = Column(String, nullable=False, default="UTC")  # Имя зоны IANA
@@ -1,12 +1,12 @@
 """Репозиторий для работы с операторами"""
 
-from typing import List, Optional
+from typing import Collection, List, Optional
 
-from sqlalchemy import select, func
+from sqlalchemy import Row, delete, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.base_repository import BaseRepository
-from src.domains.operators.model import Operator
+from src.domains.operators.model import Operator, OperatorShift
 from src.domains.contacts.model import Contact
 
 
@@ -61,3 +61,104 @@ class OperatorRepository(BaseRepository[Operator]):
         )
 
         return list(result.scalars().all())
+
+    async def get_redistribution_candidates(
+        self, source_ids: Collection[int], exclude_operator_id: int
+    ) -> List[Row]:
+        """Кандидаты для переназначения обращений источников одним запросом
+
+        Строки (source_id, required_skills источника, operator_id, weight,
+        load_limit, current_load, skills) по активным операторам с весом для
+        источника, кроме exclude_operator_id. Загружаются только колонки, без
+        связей операторов.
+        """
+        from src.domains.sources.model import Source, SourceOperatorWeight
+
+        load_subquery = (
+            select(Contact.operator_id, func.count(Contact.id).label("current_load"))
+            .where(Contact.is_active)
+            .where(Contact.operator_id.isnot(None))
+            .group_by(Contact.operator_id)
+        ).subquery()
+
+        result = await self.session.execute(
+            select(
+                SourceOperatorWeight.source_id,
+                Source.required_skills,
+                Operator.id,
+                SourceOperatorWeight.weight,
+                Operator.load_limit,
+                func.coalesce(load_subquery.c.current_load, 0),
+                Operator.skills,
+            )
+            .join(SourceOperatorWeight, Operator.id == SourceOperatorWeight.operator_id)
+            .join(Source, Source.id == SourceOperatorWeight.source_id)
+            .outerjoin(load_subquery, Operator.id == load_subquery.c.operator_id)
+            .where(SourceOperatorWeight.source_id.in_(source_ids))
+            .where(Operator.is_active)
+            .where(Operator.id != exclude_operator_id)
+            .order_by(SourceOperatorWeight.source_id, Operator.id)
+        )
+        return list(result.all())
+
+    async def get_rebalance_state(self) -> List[Row]:
+        """Активные операторы с весами по источникам одним запросом
+
+        Строки (operator_id, load_limit, skills, source_id, weight,
+        required_skills источника); у оператора без весов source_id и
+        остальные колонки источника - NULL.
+        """
+        from src.domains.sources.model import Source, SourceOperatorWeight
+
+        result = await self.session.execute(
+            select(
+                Operator.id,
+                Operator.load_limit,
+                Operator.skills,
+                SourceOperatorWeight.source_id,
+                SourceOperatorWeight.weight,
+                Source.required_skills,
+            )
+            .outerjoin(
+                SourceOperatorWeight, Operator.id == SourceOperatorWeight.operator_id
+            )
+            .outerjoin(Source, Source.id == SourceOperatorWeight.source_id)
+            .where(Operator.is_active)
+            .order_by(Operator.id, SourceOperatorWeight.source_id)
+        )
+        return list(result.all())
+
+
+class OperatorShiftRepository(BaseRepository[OperatorShift]):
+    """Репозиторий смен операторов"""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, OperatorShift)
+
+    async def get_by_operator(self, operator_id: int) -> List[OperatorShift]:
+        """Получить смены оператора"""
+        result = await self.session.execute(
+            select(OperatorShift)
+            .where(OperatorShift.operator_id == operator_id)
+            .order_by(OperatorShift.weekday, OperatorShift.start_time)
+        )
+        return list(result.scalars().all())
+
+    async def replace_for_operator(
+        self, operator_id: int, shifts: List[dict]
+    ) -> List[OperatorShift]:
+        """Заменить все смены оператора одной транзакцией"""
+        try:
+            await self.session.execute(
+                delete(OperatorShift).where(OperatorShift.operator_id == operator_id)
+            )
+            instances = [
+                OperatorShift(operator_id=operator_id, **shift) for shift in shifts
+            ]
+            self.session.add_all(instances)
+            await self.session.flush()
+            await self.session.commit()
+            return instances
+        except Exception:
+            await self.session.rollback()
+            raise
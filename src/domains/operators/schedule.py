@@ -0,0 +1,222 @@
+"""Расписание смен операторов для распределения обращений"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, time as dt_time, timedelta
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.metrics import registry
+from src.domains.operators.model import OperatorShift
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+operators_on_shift = registry.gauge(
+    "operators_on_shift", "Operators with a schedule who are currently on shift"
+)
+
+# Запас на случай скачка системных часов: задача переходов не спит дольше
+MAX_SLEEP_SECONDS = 3600.0
+RETRY_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class ShiftWindow:
+    """Еженедельная смена оператора (без привязки к БД)"""
+
+    operator_id: int
+    weekday: int
+    start_time: dt_time
+    end_time: dt_time
+    timezone: str = "UTC"
+
+    @classmethod
+    def from_model(cls, shift: OperatorShift) -> "ShiftWindow":
+        return cls(
+            operator_id=shift.operator_id,
+            weekday=shift.weekday,
+            start_time=shift.start_time,
+            end_time=shift.end_time,
+            timezone=shift.timezone,
+        )
+
+    def intervals(self, start: float, end: float) -> Iterator[Tuple[float, float]]:
+        """Интервалы смены (UTC timestamp), пересекающиеся с [start, end)
+
+        Границы считаются в местном времени зоны, поэтому при переходе на
+        летнее время смена начинается в то же местное время.
+        """
+        zone = ZoneInfo(self.timezone)
+        # Смена, начавшаяся накануне, может еще идти
+        first = datetime.fromtimestamp(start, zone).date() - timedelta(days=1)
+        last = datetime.fromtimestamp(end, zone).date()
+        day = first + timedelta(days=(self.weekday - first.weekday()) % 7)
+        overnight = self.end_time <= self.start_time
+        while day <= last:
+            begin = datetime.combine(day, self.start_time, tzinfo=zone).timestamp()
+            end_day = day + timedelta(days=1) if overnight else day
+            finish = datetime.combine(end_day, self.end_time, tzinfo=zone).timestamp()
+            if finish > start and begin < end:
+                yield begin, finish
+            day += timedelta(days=7)
+
+
+class ShiftSchedule:
+    """Скомпилированное расписание смен всех операторов
+
+    Смены разворачиваются в отсортированную ленту переходов (время UTC,
+    оператор, +1/-1) на horizon_days вперед. Состояние - счетчик открытых
+    смен каждого оператора - продвигается по ленте только при наступлении
+    следующего перехода, поэтому on_shift - сравнение времени и поиск в
+    словаре без запросов к БД. Фоновая задача run() продвигает состояние
+    точно на границах смен и пересобирает ленту по окончании горизонта.
+    Операторы без смен доступны всегда.
+    """
+
+    def __init__(
+        self, horizon_days: float = 7.0, clock: Callable[[], float] = time.time
+    ) -> None:
+        self.horizon = horizon_days * 86400
+        self.clock = clock
+        self._wakeup: Optional[asyncio.Event] = None
+        self.reset()
+
+    @property
+    def loaded(self) -> bool:
+        """Загружено ли расписание"""
+        return self._loaded
+
+    def reset(self) -> None:
+        """Сбросить расписание (будет загружено из БД при следующем обращении)"""
+        self._windows: List[ShiftWindow] = []
+        self._scheduled: FrozenSet[int] = frozenset()
+        self._open: Dict[int, int] = {}
+        self._timeline: List[Tuple[float, int, int]] = []
+        self._position = 0
+        self._next_at = float("inf")
+        self._compiled_until = 0.0
+        self._loaded = False
+        self._wake()
+
+    def _wake(self) -> None:
+        """Разбудить задачу переходов (расписание изменилось)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def load(self, session: AsyncSession) -> None:
+        """Загрузить смены из БД одним запросом и скомпилировать"""
+        shifts = (await session.execute(select(OperatorShift))).scalars().all()
+        self.compile(ShiftWindow.from_model(shift) for shift in shifts)
+
+    async def ensure_loaded(self, session: AsyncSession) -> None:
+        """Загрузить расписание, если оно еще не загружено"""
+        if not self._loaded:
+            await self.load(session)
+
+    def compile(self, windows: Iterable[ShiftWindow], now: Optional[float] = None):
+        """Развернуть смены в ленту переходов на горизонт от now"""
+        now = self.clock() if now is None else now
+        self._windows = list(windows)
+        self._scheduled = frozenset(window.operator_id for window in self._windows)
+        self._compiled_until = now + self.horizon
+        timeline = []
+        for window in self._windows:
+            for begin, finish in window.intervals(now, self._compiled_until):
+                timeline.append((begin, window.operator_id, 1))
+                timeline.append((finish, window.operator_id, -1))
+        timeline.sort()
+        self._timeline = timeline
+        self._open = {}
+        self._position = 0
+        self._loaded = True
+        self._advance(now, log=False)
+        self._wake()
+
+    def _advance(self, now: float, log: bool = True) -> None:
+        """Применить переходы ленты, наступившие к now"""
+        if now >= self._compiled_until:
+            self.compile(self._windows, now)
+            return
+        timeline, position = self._timeline, self._position
+        # Оператор -> был ли на смене до применения переходов
+        touched: Dict[int, bool] = {}
+        while position < len(timeline) and timeline[position][0] <= now:
+            _, operator_id, delta = timeline[position]
+            touched.setdefault(operator_id, operator_id in self._open)
+            count = self._open.get(operator_id, 0) + delta
+            if count > 0:
+                self._open[operator_id] = count
+            else:
+                self._open.pop(operator_id, None)
+            position += 1
+        self._position = position
+        next_at = timeline[position][0] if position < len(timeline) else float("inf")
+        self._next_at = min(next_at, self._compiled_until)
+        operators_on_shift.set(len(self._open))
+        # Смена, закрытая и открытая в один момент, переходом не считается
+        started = sorted(
+            op for op, was in touched.items() if not was and op in self._open
+        )
+        ended = sorted(
+            op for op, was in touched.items() if was and op not in self._open
+        )
+        if log and (started or ended):
+            logger.info("Operator shifts changed: started=%s, ended=%s", started, ended)
+
+    @property
+    def next_transition(self) -> float:
+        """Время (UTC timestamp) следующего перехода"""
+        return self._next_at
+
+    def on_shift(self, operator_id: int, now: Optional[float] = None) -> bool:
+        """На смене ли оператор (O(1), без запросов к БД)"""
+        if operator_id not in self._scheduled:
+            return True
+        now = self.clock() if now is None else now
+        if now >= self._next_at:
+            self._advance(now)
+        return operator_id in self._open
+
+    def replace_operator(self, operator_id: int, windows: Iterable[ShiftWindow]):
+        """Заменить смены оператора (после записи в БД) и пересобрать ленту"""
+        if not self._loaded:
+            return
+        others = [w for w in self._windows if w.operator_id != operator_id]
+        self.compile(others + list(windows))
+
+    async def run(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        """Задача переходов (lifespan): спит до следующей границы смены"""
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                self._wakeup.clear()
+                try:
+                    if not self._loaded:
+                        async with session_factory() as session:
+                            await self.load(session)
+                    now = self.clock()
+                    if now >= self._next_at:
+                        self._advance(now)
+                    delay = max(self._next_at - self.clock(), 0.0)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    logger.warning("Shift schedule update failed: error=%s", exc)
+                    delay = RETRY_SECONDS
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), min(delay, MAX_SLEEP_SECONDS)
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._wakeup = None
+
+
+shift_schedule = ShiftSchedule(horizon_days=settings.shift_schedule_horizon_days)
@@ -1,18 +1,25 @@
 """Pydantic схемы для операторов"""
 
-from typing import Optional
+from datetime import time
+from typing import Annotated, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
 from src.core.schemas import TimestampMixin
 
 
+# Навык оператора или требование источника/обращения (язык, продуктовая линия)
+Skill = Annotated[str, Field(min_length=1, max_length=64)]
+SkillList = Annotated[List[Skill], Field(max_length=32)]
+
+
 class OperatorBase(BaseModel):
     """Базовая схема оператора"""
 
     name: str = Field(..., min_length=1, max_length=255)
     is_active: bool = True
     load_limit: int = Field(default=10, ge=1)
+    skills: SkillList = []
 
 
 class OperatorCreate(OperatorBase):
@@ -27,6 +34,7 @@ class OperatorUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=255)
     is_active: Optional[bool] = None
     load_limit: Optional[int] = Field(None, ge=1)
+    skills: Optional[SkillList] = None
 
 
 class OperatorResponse(OperatorBase, TimestampMixin):
@@ -35,3 +43,72 @@ class OperatorResponse(OperatorBase, TimestampMixin):
     id: int
 
     model_config = {"from_attributes": True}
+
+
+class OperatorLoadResponse(BaseModel):
+    """Схема текущей нагрузки оператора"""
+
+    operator_id: int
+    name: str
+    is_active: bool
+    load_limit: int
+    active_load: int
+    headroom: int
+    source_ids: List[int] = []
+
+
+class OperatorShiftSchema(BaseModel):
+    """Еженедельная смена: если end_time не позже start_time - до следующего дня"""
+
+    weekday: int = Field(..., ge=0, le=6, description="0 - понедельник")
+    start_time: time
+    end_time: time
+
+
+class OperatorScheduleUpdate(BaseModel):
+    """Схема замены расписания оператора (пустой список - доступен всегда)"""
+
+    timezone: str = Field(default="UTC", description="Часовой пояс IANA")
+    shifts: List[OperatorShiftSchema] = Field(default_factory=list, max_length=100)
+
+
+class OperatorScheduleResponse(BaseModel):
+    """Схема расписания оператора"""
+
+    operator_id: int
+    timezone: str
+    on_shift: bool
+    shifts: List[OperatorShiftSchema] = []
+
+
+class RedistributionResponse(BaseModel):
+    """Итог переназначения активных обращений оператора"""
+
+    operator_id: int
+    total: int = 0
+    reassigned: int = 0
+    # Не нашлось оператора с местом - обращения остались за исходным
+    remaining: int = 0
+    # Оператор -> сколько обращений получил
+    assignments: Dict[int, int] = {}
+
+
+class RebalanceMove(BaseModel):
+    """Перенос обращения в плане ребалансировки"""
+
+    contact_id: int
+    source_id: int
+    from_operator_id: int
+    to_operator_id: int
+    # capacity - оператор выше load_limit, share - доля источника выше веса
+    reason: Literal["capacity", "share"]
+
+
+class RebalancePlanResponse(BaseModel):
+    """План ребалансировки обращений между операторами"""
+
+    moves: List[RebalanceMove] = []
+    # Оператор -> на сколько обращений превышен load_limit до плана
+    overloaded: Dict[int, int] = {}
+    # Оператор -> превышение load_limit, которое план не устраняет
+    unresolved: Dict[int, int] = {}
@@ -1,60 +1,276 @@
 """Сервис для бизнес-логики операторов"""
 
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from src.core.exceptions import NotFoundError
-from src.domains.operators.repository import OperatorRepository
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.cache import response_cache
+from src.core.config import settings
+from src.core.batch import batch_fields, batch_response
+from src.core.exceptions import ConflictError, NotFoundError, ValidationError
+from src.core.invalidation import invalidation_bus
+from src.core.fields import FieldSet, response_schema
+from src.core.schemas import BatchResponse
+from src.domains.contacts.rebalancer import operator_rebalancer
+from src.domains.contacts.redistribution import ContactRedistributor
+from src.domains.operators.load_snapshot import operator_load_snapshot
+from src.domains.operators.model import OperatorShift
+from src.domains.operators.repository import (
+    OperatorRepository,
+    OperatorShiftRepository,
+)
+from src.domains.operators.schedule import ShiftWindow, shift_schedule
+from src.domains.operators.skills import normalize_skills
 from src.domains.operators.schemas import (
     OperatorCreate,
     OperatorUpdate,
     OperatorResponse,
+    OperatorLoadResponse,
+    OperatorScheduleResponse,
+    OperatorScheduleUpdate,
+    OperatorShiftSchema,
+    RebalancePlanResponse,
+    RedistributionResponse,
 )
-from src.utils.logger import logger
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Колонки ответа: без связей (selectin), которые тянут все обращения оператора
+OPERATOR_FIELDS = frozenset(OperatorResponse.model_fields)
 
 
 class OperatorService:
     """Сервис операторов"""
 
-    def __init__(self, repository: OperatorRepository):
+    def __init__(
+        self,
+        repository: OperatorRepository,
+        shift_repository: OperatorShiftRepository,
+    ):
         self.repository = repository
+        self.shift_repository = shift_repository
 
     async def create_operator(self, data: OperatorCreate) -> OperatorResponse:
         """Создать оператора"""
-        operator = await self.repository.create(**data.model_dump())
+        values = data.model_dump()
+        values["skills"] = normalize_skills(data.skills)
+        operator = await self.repository.create(**values)
+        await invalidation_bus.publish(prefixes=["operators:"], operator_load=True)
+        operator_load_snapshot.operator_saved(operator)
         return OperatorResponse.model_validate(operator)
 
-    async def get_operator(self, operator_id: int) -> OperatorResponse:
-        """Получить оператора по ID"""
-        operator = await self.repository.get_by_id(operator_id)
+    async def get_operator(
+        self, operator_id: int, fields: Optional[FieldSet] = None
+    ) -> OperatorResponse:
+        """Получить оператора по ID (с fields - только запрошенные поля)"""
+        operator = await self.repository.get_by_id(operator_id, fields)
         if not operator:
-            logger.warning(f"Operator not found: operator_id={operator_id}")
+            logger.warning("Operator not found: operator_id=%s", operator_id)
             raise NotFoundError("Operator")
-        return OperatorResponse.model_validate(operator)
+        return response_schema(OperatorResponse, fields).model_validate(operator)
+
+    async def get_operators_by_ids(
+        self, ids: List[int]
+    ) -> BatchResponse[OperatorResponse]:
+        """Получить операторов по списку ID одним запросом"""
+        rows = await self.repository.get_many(ids, batch_fields(OperatorResponse))
+        return batch_response(ids, rows, OperatorResponse)
+
+    async def get_operator_version(
+        self, operator_id: int
+    ) -> List[Tuple[int, datetime]]:
+        """Получить версию оператора для условного GET (пустой список, если нет)"""
+        version = await self.repository.get_version(operator_id)
+        return [version] if version else []
 
     async def get_all_operators(
-        self, skip: int = 0, limit: int = 100
-    ) -> List[OperatorResponse]:
-        """Получить всех операторов"""
-        operators = await self.repository.get_all(skip=skip, limit=limit)
-        return [OperatorResponse.model_validate(op) for op in operators]
+        self, skip: int = 0, limit: int = 100, fields: Optional[FieldSet] = None
+    ) -> Tuple[List[Tuple[int, datetime]], List[OperatorResponse]]:
+        """Получить страницу операторов и ее версии (с fields - только
+        запрошенные поля)
+
+        Версии кешируются вместе с телом: ETag считается по той же записи
+        кеша, что и ответ, даже если в fields нет updated_at.
+        """
+        schema = response_schema(OperatorResponse, fields)
+        load_fields = None if fields is None else fields | {"id", "updated_at"}
+
+        async def load(
+            session: AsyncSession,
+        ) -> Tuple[List[Tuple[int, datetime]], List[OperatorResponse]]:
+            operators = await OperatorRepository(session).get_all(
+                skip=skip, limit=limit, fields=load_fields
+            )
+            versions = [(op.id, op.updated_at) for op in operators]
+            return versions, [schema.model_validate(op) for op in operators]
+
+        key = f"operators:list:{skip}:{limit}"
+        if fields is not None:
+            key += ":" + ",".join(sorted(fields))
+        return await response_cache.get_or_load(key, load, self.repository.session)
+
+    async def get_operators_load(self) -> List[OperatorLoadResponse]:
+        """Получить текущую нагрузку всех операторов из in-memory снимка"""
+        return await operator_load_snapshot.get_all(self.repository.session)
 
     async def update_operator(
         self, operator_id: int, data: OperatorUpdate
     ) -> OperatorResponse:
         """Обновить оператора"""
-        operator = await self.repository.get_by_id(operator_id)
+        operator = await self.repository.get_by_id(operator_id, OPERATOR_FIELDS)
         if not operator:
-            logger.warning(f"Operator not found for update: operator_id={operator_id}")
+            logger.warning("Operator not found for update: operator_id=%s", operator_id)
             raise NotFoundError("Operator")
 
+        was_active = operator.is_active
         update_data = data.model_dump(exclude_unset=True)
-        updated_operator = await self.repository.update(operator_id, **update_data)
+        if "skills" in update_data:
+            update_data["skills"] = normalize_skills(update_data["skills"])
+        updated_operator = await self.repository.update(
+            operator_id, fields=OPERATOR_FIELDS, **update_data
+        )
+        await invalidation_bus.publish(prefixes=["operators:"], operator_load=True)
+        operator_load_snapshot.operator_saved(updated_operator)
+        if (
+            was_active
+            and not updated_operator.is_active
+            and settings.operator_redistribute_on_deactivate
+        ):
+            await self.redistribute_contacts(operator_id)
         return OperatorResponse.model_validate(updated_operator)
 
-    async def delete_operator(self, operator_id: int) -> bool:
-        """Удалить оператора"""
-        operator = await self.repository.get_by_id(operator_id)
+    async def delete_operator(self, operator_id: int) -> None:
+        """Удалить оператора
+
+        Активные обращения сначала переназначаются. Если части из них не
+        нашлось места, удаление отклоняется (ConflictError): внешний ключ
+        оставил бы их без оператора, и никто бы их больше не подобрал.
+        Перенесенные обращения остаются у новых операторов, как при отключении.
+        """
+        operator = await self.repository.get_by_id(operator_id, OPERATOR_FIELDS)
         if not operator:
-            logger.warning(f"Operator not found for delete: operator_id={operator_id}")
+            logger.warning("Operator not found for delete: operator_id=%s", operator_id)
+            raise NotFoundError("Operator")
+        if settings.operator_redistribute_on_deactivate:
+            report = await self.redistribute_contacts(operator_id)
+            remaining = report.remaining
+        else:
+            remaining = await self.repository.get_current_load(operator_id)
+        if remaining:
+            logger.warning(
+                "Operator delete refused, active contacts remain: operator_id=%s, "
+                "remaining=%s",
+                operator_id,
+                remaining,
+            )
+            raise ConflictError(
+                f"Operator has {remaining} active contacts that could not be "
+                "reassigned; free capacity for them or close them and retry"
+            )
+        await self.repository.delete(operator_id)
+        # Удаление каскадно затрагивает веса и статистику обращений
+        await invalidation_bus.publish(
+            keys=["contacts:statistics"],
+            prefixes=["operators:", "sources:"],
+            operator_load=True,
+            schedule=True,
+        )
+        operator_load_snapshot.operator_deleted(operator_id)
+        shift_schedule.replace_operator(operator_id, [])
+
+    async def redistribute_contacts(self, operator_id: int) -> RedistributionResponse:
+        """Переназначить активные обращения оператора другим операторам"""
+        report = await ContactRedistributor(self.repository.session).redistribute(
+            operator_id
+        )
+        if report.reassigned:
+            operator_load_snapshot.contacts_reassigned(operator_id, report.assignments)
+            await invalidation_bus.publish(
+                keys=["contacts:statistics"], operator_load=True
+            )
+        if report.total:
+            logger.info(
+                "Operator contacts redistributed: operator_id=%s, total=%s, "
+                "reassigned=%s, remaining=%s",
+                operator_id,
+                report.total,
+                report.reassigned,
+                report.remaining,
+            )
+        return report
+
+    async def redistribute_operator(self, operator_id: int) -> RedistributionResponse:
+        """Переназначить обращения оператора по запросу"""
+        if not await self.repository.get_version(operator_id):
+            logger.warning(
+                "Operator not found for redistribution: operator_id=%s", operator_id
+            )
             raise NotFoundError("Operator")
-        return await self.repository.delete(operator_id)
+        return await self.redistribute_contacts(operator_id)
+
+    async def plan_rebalance(self) -> RebalancePlanResponse:
+        """План ребалансировки обращений без изменений в БД"""
+        return await operator_rebalancer.plan(self.repository.session)
+
+    async def get_schedule(self, operator_id: int) -> OperatorScheduleResponse:
+        """Получить расписание смен оператора"""
+        if not await self.repository.get_version(operator_id):
+            logger.warning("Operator not found: operator_id=%s", operator_id)
+            raise NotFoundError("Operator")
+        shifts = await self.shift_repository.get_by_operator(operator_id)
+        await shift_schedule.ensure_loaded(self.repository.session)
+        return self._schedule_response(operator_id, shifts)
+
+    async def set_schedule(
+        self, operator_id: int, data: OperatorScheduleUpdate
+    ) -> OperatorScheduleResponse:
+        """Заменить расписание смен оператора"""
+        try:
+            ZoneInfo(data.timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValidationError(f"Unknown timezone: {data.timezone}")
+        if any(shift.start_time == shift.end_time for shift in data.shifts):
+            raise ValidationError("Shift start_time and end_time must differ")
+        if not await self.repository.get_version(operator_id):
+            logger.warning(
+                "Operator not found for schedule: operator_id=%s", operator_id
+            )
+            raise NotFoundError("Operator")
+
+        shifts = await self.shift_repository.replace_for_operator(
+            operator_id,
+            [
+                {**shift.model_dump(), "timezone": data.timezone}
+                for shift in data.shifts
+            ],
+        )
+        # Локально лента пересобирается сразу, остальные воркеры загрузят
+        # расписание из БД
+        shift_schedule.replace_operator(
+            operator_id, [ShiftWindow.from_model(shift) for shift in shifts]
+        )
+        await invalidation_bus.publish(schedule=True)
+        await shift_schedule.ensure_loaded(self.repository.session)
+        return self._schedule_response(operator_id, shifts)
+
+    @staticmethod
+    def _schedule_response(
+        operator_id: int, shifts: List[OperatorShift]
+    ) -> OperatorScheduleResponse:
+        """Ответ с расписанием и текущим состоянием смены"""
+        return OperatorScheduleResponse(
+            operator_id=operator_id,
+            timezone=shifts[0].timezone if shifts else "UTC",
+            on_shift=shift_schedule.on_shift(operator_id),
+            shifts=[
+                OperatorShiftSchema(
+                    weekday=shift.weekday,
+                    start_time=shift.start_time,
+                    end_time=shift.end_time,
+                )
+                for shift in shifts
+            ],
+        )
@@ -0,0 +1,55 @@
+"""Навыки операторов и их сопоставление битовыми масками"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+def normalize_skills(skills: Optional[Iterable[str]]) -> List[str]:
+    """Привести навыки к каноничному виду: нижний регистр, без повторов, по порядку"""
+    if not skills:
+        return []
+    return sorted({skill.strip().lower() for skill in skills if skill.strip()})
+
+
+class SkillIndex:
+    """Номера битов навыков и маски наборов навыков операторов
+
+    Навык получает бит при первой встрече в наборе навыков оператора; маска
+    набора вычисляется один раз и дальше берется из словаря по кортежу
+    навыков. Проверка оператора при распределении - поиск в словаре и одно
+    AND с маской требований. Биты локальны для процесса и в БД не хранятся.
+    """
+
+    def __init__(self) -> None:
+        self._bits: Dict[str, int] = {}
+        self._masks: Dict[Tuple[str, ...], int] = {}
+
+    def mask(self, skills: Optional[Sequence[str]]) -> int:
+        """Маска набора навыков оператора (новые навыки получают биты)"""
+        if not skills:
+            return 0
+        key = tuple(skills)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = 0
+            for skill in key:
+                bit = self._bits.setdefault(skill, len(self._bits))
+                mask |= 1 << bit
+            self._masks[key] = mask
+        return mask
+
+    def required_mask(self, skills: Optional[Iterable[str]]) -> Optional[int]:
+        """Маска требований; None - требуется навык, которого нет ни у кого
+
+        Биты для требований не создаются: навыки обращений приходят от
+        клиентов, и набор битов не должен расти от произвольных строк.
+        """
+        mask = 0
+        for skill in skills or ():
+            bit = self._bits.get(skill)
+            if bit is None:
+                return None
+            mask |= 1 << bit
+        return mask
+
+
+skill_index = SkillIndex()
@@ -1,6 +1,6 @@
 """Модель источника"""
 
-from sqlalchemy import Column, String, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy import JSON, Column, String, Integer, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from src.core.base_model import BaseModel
@@ -13,6 +13,11 @@ class Source(BaseModel):
 
     name = Column(String, nullable=False, unique=True, index=True)
     description = Column(String, nullable=True)
+    # Навыки, обязательные для операторов, получающих обращения источника
+    required_skills = Column(JSON, default=list, server_default="[]", nullable=False)
+    # Через сколько минут без изменений активное обращение закрывается
+    # автоматически (None - по настройке CONTACT_IDLE_TIMEOUT_MINUTES)
+    idle_timeout_minutes = Column(Integer, nullable=True)
 
     # Связи
     contacts = relationship("Contact", back_populates="source", lazy="selectin")
@@ -5,6 +5,7 @@ from typing import Optional, List
 from pydantic import BaseModel, Field
 
 from src.core.schemas import TimestampMixin
+from src.domains.operators.schemas import SkillList
 
 
 class SourceBase(BaseModel):
@@ -12,6 +13,8 @@ class SourceBase(BaseModel):
 
     name: str = Field(..., min_length=1, max_length=255)
     description: Optional[str] = None
+    required_skills: SkillList = []
+    idle_timeout_minutes: Optional[int] = Field(None, ge=1)
 
 
 class SourceCreate(SourceBase):
@@ -25,6 +28,8 @@ class SourceUpdate(BaseModel):
 
     name: Optional[str] = Field(None, min_length=1, max_length=255)
     description: Optional[str] = None
+    required_skills: Optional[SkillList] = None
+    idle_timeout_minutes: Optional[int] = Field(None, ge=1)
 
 
 class SourceResponse(SourceBase, TimestampMixin):
@@ -1,8 +1,16 @@
 """Сервис для бизнес-логики источников"""
 
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Tuple
 
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.cache import response_cache
+from src.core.batch import batch_fields, batch_response
 from src.core.exceptions import NotFoundError
+from src.core.invalidation import invalidation_bus
+from src.core.fields import FieldSet, response_schema
+from src.core.schemas import BatchResponse
 from src.domains.sources.repository import (
     SourceRepository,
     SourceOperatorWeightRepository,
@@ -15,8 +23,12 @@ from src.domains.sources.schemas import (
     SourceOperatorWeightResponse,
     SourceWithWeightsResponse,
 )
+from src.domains.operators.load_snapshot import operator_load_snapshot
 from src.domains.operators.repository import OperatorRepository
-from src.utils.logger import logger
+from src.domains.operators.skills import normalize_skills
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class SourceService:
@@ -34,60 +46,99 @@ class SourceService:
 
     async def create_source(self, data: SourceCreate) -> SourceResponse:
         """Создать источник"""
-        source = await self.repository.create(**data.model_dump())
+        values = data.model_dump()
+        values["required_skills"] = normalize_skills(data.required_skills)
+        source = await self.repository.create(**values)
         return SourceResponse.model_validate(source)
 
-    async def get_source(self, source_id: int) -> SourceResponse:
-        """Получить источник по ID"""
-        source = await self.repository.get_by_id(source_id)
+    async def get_source(
+        self, source_id: int, fields: Optional[FieldSet] = None
+    ) -> SourceResponse:
+        """Получить источник по ID (с fields - только запрошенные поля)"""
+        source = await self.repository.get_by_id(source_id, fields)
         if not source:
-            logger.warning(f"Source not found: source_id={source_id}")
+            logger.warning("Source not found: source_id=%s", source_id)
             raise NotFoundError("Source")
-        return SourceResponse.model_validate(source)
+        return response_schema(SourceResponse, fields).model_validate(source)
+
+    async def get_sources_by_ids(self, ids: List[int]) -> BatchResponse[SourceResponse]:
+        """Получить источников по списку ID одним запросом"""
+        rows = await self.repository.get_many(ids, batch_fields(SourceResponse))
+        return batch_response(ids, rows, SourceResponse)
 
     async def get_source_with_weights(
         self, source_id: int
     ) -> SourceWithWeightsResponse:
         """Получить источник с весами операторов"""
-        source = await self.repository.get_with_weights(source_id)
-        if not source:
-            logger.warning(f"Source not found: source_id={source_id}")
-            raise NotFoundError("Source")
 
-        # Веса уже загружены через eager loading в get_with_weights
-        return SourceWithWeightsResponse(
-            **SourceResponse.model_validate(source).model_dump(),
-            operator_weights=[
-                SourceOperatorWeightResponse.model_validate(w)
-                for w in source.operator_weights
-            ],
+        async def load(session: AsyncSession) -> SourceWithWeightsResponse:
+            source = await SourceRepository(session).get_with_weights(source_id)
+            if not source:
+                logger.warning("Source not found: source_id=%s", source_id)
+                raise NotFoundError("Source")
+
+            # Веса уже загружены через eager loading в get_with_weights
+            return SourceWithWeightsResponse(
+                **SourceResponse.model_validate(source).model_dump(),
+                operator_weights=[
+                    SourceOperatorWeightResponse.model_validate(w)
+                    for w in source.operator_weights
+                ],
+            )
+
+        return await response_cache.get_or_load(
+            f"sources:{source_id}:with-weights", load, self.repository.session
         )
 
-    async def get_all_sources(
+    async def get_source_version(self, source_id: int) -> List[Tuple[int, datetime]]:
+        """Получить версию источника для условного GET (пустой список, если нет)"""
+        version = await self.repository.get_version(source_id)
+        return [version] if version else []
+
+    async def get_sources_versions(
         self, skip: int = 0, limit: int = 100
+    ) -> List[Tuple[int, datetime]]:
+        """Получить версии страницы источников для условного GET"""
+        return await self.repository.get_versions(skip=skip, limit=limit)
+
+    async def get_all_sources(
+        self, skip: int = 0, limit: int = 100, fields: Optional[FieldSet] = None
     ) -> List[SourceResponse]:
-        """Получить все источники"""
-        sources = await self.repository.get_all(skip=skip, limit=limit)
-        return [SourceResponse.model_validate(s) for s in sources]
+        """Получить все источники (с fields - только запрошенные поля)"""
+        sources = await self.repository.get_all(skip=skip, limit=limit, fields=fields)
+        schema = response_schema(SourceResponse, fields)
+        return [schema.model_validate(s) for s in sources]
 
     async def update_source(self, source_id: int, data: SourceUpdate) -> SourceResponse:
         """Обновить источник"""
         source = await self.repository.get_by_id(source_id)
         if not source:
-            logger.warning(f"Source not found for update: source_id={source_id}")
+            logger.warning("Source not found for update: source_id=%s", source_id)
             raise NotFoundError("Source")
 
         update_data = data.model_dump(exclude_unset=True)
+        if "required_skills" in update_data:
+            update_data["required_skills"] = normalize_skills(
+                update_data["required_skills"]
+            )
         updated_source = await self.repository.update(source_id, **update_data)
+        await invalidation_bus.publish(prefixes=[f"sources:{source_id}:"])
         return SourceResponse.model_validate(updated_source)
 
     async def delete_source(self, source_id: int) -> bool:
         """Удалить источник"""
         source = await self.repository.get_by_id(source_id)
         if not source:
-            logger.warning(f"Source not found for delete: source_id={source_id}")
+            logger.warning("Source not found for delete: source_id=%s", source_id)
             raise NotFoundError("Source")
-        return await self.repository.delete(source_id)
+        deleted = await self.repository.delete(source_id)
+        await invalidation_bus.publish(
+            keys=["contacts:statistics"],
+            prefixes=[f"sources:{source_id}:"],
+            operator_load=True,
+        )
+        operator_load_snapshot.source_deleted(source_id)
+        return deleted
 
     async def set_operator_weight(
         self, source_id: int, data: SourceOperatorWeightCreate
@@ -96,12 +147,12 @@ class SourceService:
         # Проверяем существование источника и оператора
         source = await self.repository.get_by_id(source_id)
         if not source:
-            logger.warning(f"Source not found: source_id={source_id}")
+            logger.warning("Source not found: source_id=%s", source_id)
             raise NotFoundError("Source")
 
         operator = await self.operator_repository.get_by_id(data.operator_id)
         if not operator:
-            logger.warning(f"Operator not found: operator_id={data.operator_id}")
+            logger.warning("Operator not found: operator_id=%s", data.operator_id)
             raise NotFoundError("Operator")
 
         # Проверяем, существует ли уже такая связь
@@ -111,16 +162,20 @@ class SourceService:
 
         if existing:
             # Обновляем существующий вес
-            updated = await self.weight_repository.update(
+            weight = await self.weight_repository.update(
                 existing.id, weight=data.weight
             )
-            return SourceOperatorWeightResponse.model_validate(updated)
         else:
             # Создаем новую связь
             weight = await self.weight_repository.create(
                 source_id=source_id, operator_id=data.operator_id, weight=data.weight
             )
-            return SourceOperatorWeightResponse.model_validate(weight)
+
+        await invalidation_bus.publish(
+            prefixes=[f"sources:{source_id}:"], operator_load=True
+        )
+        operator_load_snapshot.weight_set(source_id, data.operator_id)
+        return SourceOperatorWeightResponse.model_validate(weight)
 
     async def remove_operator_weight(self, source_id: int, operator_id: int) -> bool:
         """Удалить вес оператора для источника"""
@@ -129,7 +184,14 @@ class SourceService:
         )
         if not weight:
             logger.warning(
-                f"SourceOperatorWeight not found: source_id={source_id}, operator_id={operator_id}"
+                "SourceOperatorWeight not found: source_id=%s, operator_id=%s",
+                source_id,
+                operator_id,
             )
             raise NotFoundError("SourceOperatorWeight")
-        return await self.weight_repository.delete(weight.id)
+        deleted = await self.weight_repository.delete(weight.id)
+        await invalidation_bus.publish(
+            prefixes=[f"sources:{source_id}:"], operator_load=True
+        )
+        operator_load_snapshot.weight_removed(source_id, operator_id)
+        return deleted
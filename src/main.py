@@ -14,7 +14,15 @@ from src.core.exceptions import (
     global_exception_handler,
 )
 from src.core.lifespan import lifespan
-from src.core.middleware import setup_cors
+from src.core.middleware import (
+    setup_cors,
+    setup_compression,
+    setup_query_budget,
+    setup_admission,
+    setup_drain,
+    setup_metrics,
+    setup_request_id,
+)
 from src.core.config import settings
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import IntegrityError, OperationalError, DatabaseError
@@ -31,8 +39,15 @@ ContactResponse.model_rebuild()
 
 app = FastAPI(title=settings.project_name, lifespan=lifespan)
 
-# Настройка CORS
+# Настройка CORS, сжатия ответов, учета SQL-запросов, контроля допуска,
+# плавной остановки, метрик и ID запроса
 setup_cors(app)
+setup_compression(app)
+setup_query_budget(app)
+setup_admission(app)
+setup_drain(app)
+setup_metrics(app)
+setup_request_id(app)
 
 # Регистрация роутеров
 app.include_router(base_router)
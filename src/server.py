@@ -0,0 +1,119 @@
+"""Запуск uvicorn с плавной остановкой по сигналу
+
+uvicorn по SIGTERM сначала закрывает слушающие сокеты, затем ждет открытые
+соединения (--timeout-graceful-shutdown) и только после этого отправляет
+приложению lifespan shutdown. К этому моменту новых запросов уже быть не
+может: /ready не успевает сообщить балансировщику об остановке, а
+DrainMiddleware - ответить 503. Поэтому остановка начинается при получении
+сигнала: экземпляр переходит в режим draining и еще drain_seconds
+продолжает принимать соединения (/ready - 503 draining, запросы к /api/ -
+503 с Connection: close), и лишь затем uvicorn закрывает сокеты и
+останавливается обычным порядком.
+
+Аргументы и переменные окружения UVICORN_* те же, что у uvicorn (разбирает
+их CLI самого uvicorn), приложение по умолчанию - src.main:app:
+    python -m src.server [src.main:app] [--host 0.0.0.0] [--port 8000]
+        [--timeout-graceful-shutdown 25] [--proxy-headers] [...]
+"""
+
+import inspect
+import sys
+import time
+from types import FrameType
+from typing import Any, Dict, Optional, Sequence
+
+import click
+import uvicorn
+from uvicorn.config import LOGGING_CONFIG
+from uvicorn.main import STARTUP_FAILURE
+from uvicorn.main import main as uvicorn_cli
+from uvicorn.supervisors import ChangeReload, Multiprocess
+
+from src.core.config import settings
+from src.core.shutdown import shutdown
+from src.core.warmup import readiness
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_APP = "src.main:app"
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn.Server, который по первому сигналу сначала выдерживает drain
+
+    Повторный сигнал (или drain_seconds <= 0) - обычная остановка uvicorn.
+    """
+
+    def __init__(self, config: uvicorn.Config, drain_seconds: float) -> None:
+        super().__init__(config)
+        self.drain_seconds = drain_seconds
+        self._drain_signal: Optional[int] = None
+        self._drain_deadline: Optional[float] = None
+
+    def handle_exit(self, sig: int, frame: Optional[FrameType]) -> None:
+        if self._drain_signal is not None or self.drain_seconds <= 0:
+            super().handle_exit(sig, frame)
+            return
+        # Обработчик сигнала только запоминает его: логирование и остальная
+        # работа - в on_tick, в event loop
+        self._drain_signal = sig
+
+    async def on_tick(self, counter: int) -> bool:
+        if self._drain_signal is not None and self._drain_deadline is None:
+            readiness.draining = True
+            shutdown.begin()
+            self._drain_deadline = time.monotonic() + self.drain_seconds
+            logger.info("Draining before close: drain_seconds=%s", self.drain_seconds)
+        if (
+            self._drain_deadline is not None
+            and not self.should_exit
+            and time.monotonic() >= self._drain_deadline
+        ):
+            # Обычная остановка uvicorn тем же сигналом (его же uvicorn
+            # повторит процессу после остановки)
+            super().handle_exit(self._drain_signal, None)
+        return await super().on_tick(counter)
+
+
+def load_config(args: Sequence[str]) -> uvicorn.Config:
+    """uvicorn.Config из аргументов командной строки uvicorn"""
+    with uvicorn_cli.make_context(
+        "python -m src.server", list(args), default_map={"app": DEFAULT_APP}
+    ) as ctx:
+        params: Dict[str, Any] = dict(ctx.params)
+    # Те же преобразования, что делает uvicorn.main перед uvicorn.run
+    app_dir = params.pop("app_dir", None)
+    if app_dir is not None:
+        sys.path.insert(0, app_dir)
+    if params.get("log_config") is None:
+        params["log_config"] = LOGGING_CONFIG
+    for name in ("reload_dirs", "reload_includes", "reload_excludes"):
+        params[name] = list(params.get(name) or ()) or None
+    params["headers"] = [header.split(":", 1) for header in params.get("headers", ())]
+    accepted = inspect.signature(uvicorn.Config).parameters
+    return uvicorn.Config(**{k: v for k, v in params.items() if k in accepted})
+
+
+def main(args: Optional[Sequence[str]] = None) -> None:
+    """Точка входа"""
+    try:
+        config = load_config(sys.argv[1:] if args is None else args)
+    except click.ClickException as exc:
+        exc.show()
+        sys.exit(exc.exit_code)
+    except click.exceptions.Exit as exc:  # --help, --version
+        sys.exit(exc.exit_code)
+    server = DrainingServer(config, settings.shutdown_drain_delay_seconds)
+    if config.should_reload:
+        ChangeReload(config, target=server.run, sockets=[config.bind_socket()]).run()
+    elif config.workers > 1:
+        Multiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
+    else:
+        server.run()
+    if not server.started and not config.should_reload and config.workers == 1:
+        sys.exit(STARTUP_FAILURE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Потоковая сериализация выгрузок в NDJSON и CSV"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Sequence
+
+from sqlalchemy import Row
+
+
+class ExportFormat(str, Enum):
+    """Формат выгрузки"""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    @property
+    def media_type(self) -> str:
+        """MIME-тип ответа"""
+        if self is ExportFormat.CSV:
+            return "text/csv; charset=utf-8"
+        return "application/x-ndjson"
+
+
+def _json_default(value: Any) -> Any:
+    """Сериализация значений, не поддерживаемых json"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value: Any) -> Any:
+    """Представление значения в CSV"""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def encode_rows(
+    partitions: AsyncIterator[Sequence[Row]],
+    columns: Sequence[str],
+    export_format: ExportFormat,
+) -> AsyncIterator[bytes]:
+    """Кодировать пачки строк в чанки ответа (один чанк на пачку)"""
+    if export_format is ExportFormat.CSV:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        yield buffer.getvalue().encode()
+
+        async for rows in partitions:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([_csv_value(v) for v in row] for row in rows)
+            yield buffer.getvalue().encode()
+        return
+
+    async for rows in partitions:
+        chunk = "".join(
+            json.dumps(
+                dict(zip(columns, row)), default=_json_default, ensure_ascii=False
+            )
+            + "\n"
+            for row in rows
+        )
+        yield chunk.encode()
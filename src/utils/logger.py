@@ -1,14 +1,192 @@
-"""Настройка логирования"""
+"""Настройка логирования
 
+Записи уходят из event loop в очередь (QueueHandler), а форматирование и
+запись в stdout выполняет отдельный поток (QueueListener). Сообщения
+форматируются лениво - в потоке записи и только для прошедших фильтры
+записей, поэтому в коде используются аргументы, а не f-строки:
+``logger.warning("Lead not found: lead_id=%s", lead_id)``.
+"""
+
+import asyncio
+import atexit
+import json
 import logging
+import queue
 import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
 
 from src.core.config import settings
 
-logging.basicConfig(
-    level=logging.DEBUG if settings.debug else logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)],
-)
+# ID текущего запроса (выставляется RequestIdMiddleware)
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Стандартные атрибуты LogRecord; остальные пришли через extra=
+_RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "request_id", "suppressed"}
+
+
+class RequestIdFilter(logging.Filter):
+    """Добавить в запись ID запроса (в потоке, где запись создана)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Ограничение частых сообщений по логгерам
+
+    rules - префикс имени логгера -> сколько записей одного шаблона сообщения
+    пропускать за окно. Ошибки не ограничиваются. Первая запись после
+    отброшенных получает атрибут suppressed с их количеством.
+    """
+
+    def __init__(self, rules: Dict[str, int], window: float = 1.0):
+        super().__init__()
+        self.rules = sorted(rules.items(), key=lambda rule: -len(rule[0]))
+        self.window = window
+        self._lock = threading.Lock()
+        # (логгер, шаблон) -> [начало окна, записей в окне, отброшено]
+        self._counters: Dict[Tuple[str, str], list] = {}
+
+    def _limit(self, name: str) -> Optional[int]:
+        """Лимит для логгера (самое длинное совпадение префикса)"""
+        for prefix, limit in self.rules:
+            if name == prefix or name.startswith(prefix + "."):
+                return limit
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            return True
+        limit = self._limit(record.name)
+        if limit is None:
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None or now - counter[0] >= self.window:
+                suppressed = counter[2] if counter else 0
+                self._counters[key] = [now, 1, 0]
+            elif counter[1] < limit:
+                counter[1] += 1
+                suppressed = counter[2]
+                counter[2] = 0
+            else:
+                counter[2] += 1
+                return False
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler без форматирования в вызывающем потоке
+
+    Стандартный prepare() форматирует сообщение до постановки в очередь (для
+    межпроцессных очередей); здесь очередь внутри процесса, и запись
+    передается как есть. При переполнении очереди запись отбрасывается, а не
+    блокирует event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись - одна строка JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            data["request_id"] = request_id
+        suppressed = getattr(record, "suppressed", None)
+        if suppressed:
+            data["suppressed"] = suppressed
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Текстовый формат для локальной разработки (с ID запроса)"""
+
+    def __init__(self) -> None:
+        super().__init__("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            text += f" [request_id={request_id}]"
+        suppressed = getattr(record, "suppressed", None)
+        if suppressed:
+            text += f" [suppressed={suppressed}]"
+        return text
+
+
+def configure_logging() -> QueueListener:
+    """Подключить очередь логов к корневому логгеру и запустить поток записи"""
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(
+        JsonFormatter() if settings.log_format == "json" else TextFormatter()
+    )
+
+    queue_handler = NonBlockingQueueHandler(queue.Queue(settings.log_queue_size))
+    queue_handler.addFilter(RequestIdFilter())
+    queue_handler.addFilter(SamplingFilter(settings.log_sampling))
+
+    root = logging.getLogger()
+    root.setLevel(logging.DEBUG if settings.debug else logging.INFO)
+    root.addHandler(queue_handler)
+
+    listener = QueueListener(
+        queue_handler.queue, stream_handler, respect_handler_level=True
+    )
+    listener.start()
+    # Дописать оставшиеся в очереди записи при завершении процесса
+    atexit.register(listener.stop)
+    return listener
+
+
+async def flush_logs(timeout: float) -> None:
+    """Дождаться записи накопленных в очереди логов (при остановке)"""
+    deadline = time.monotonic() + timeout
+    while log_listener.queue.unfinished_tasks and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Логгер модуля (имя используется в правилах LOG_SAMPLING)"""
+    return logging.getLogger(name)
+
 
-logger = logging.getLogger(__name__)
+log_listener = configure_logging()
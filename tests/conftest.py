@@ -9,10 +9,18 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sess
 from sqlalchemy.pool import StaticPool
 
 from src.main import app
+from src.core.cache import response_cache
 from src.core.database import Base, get_db
+from src.core.idempotency import idempotency
+from src.core.metrics import instrument_engine
+from src.core.query_budget import QueryBudgetMiddleware
+from src.core.shutdown import shutdown
+from src.core.warmup import readiness
+from src.domains.operators.load_snapshot import operator_load_snapshot
+from src.domains.operators.schedule import shift_schedule
 
 # Импорт всех моделей для регистрации в Base.metadata
-from src.domains.operators.model import Operator  # noqa: F401
+from src.domains.operators.model import Operator, OperatorShift  # noqa: F401
 from src.domains.sources.model import Source, SourceOperatorWeight  # noqa: F401
 from src.domains.leads.model import Lead  # noqa: F401
 from src.domains.contacts.model import Contact  # noqa: F401
@@ -35,6 +43,7 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
         poolclass=StaticPool,
         echo=False,
     )
+    instrument_engine(test_engine.sync_engine)
 
     TestSessionLocal = async_sessionmaker(
         test_engine,
@@ -74,8 +83,16 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
-
-    transport = ASGITransport(app=app)
+    # Кеш ответов глобальный - каждый тест начинает с пустого
+    response_cache.clear()
+    operator_load_snapshot.reset()
+    shift_schedule.reset()
+    idempotency.store.clear()
+    readiness.reset()
+    shutdown.reset()
+
+    # Строгий учет запросов: превышение бюджета эндпоинта роняет тест
+    transport = ASGITransport(app=QueryBudgetMiddleware(app, strict=True))
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
 
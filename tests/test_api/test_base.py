@@ -1,7 +1,13 @@
 """Тесты для базовых эндпоинтов"""
 
+import asyncio
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.warmup import warm_up
+from src.main import app
 
 
 @pytest.mark.asyncio
@@ -23,3 +29,89 @@ async def test_health_endpoint(client: AsyncClient):
     data = response.json()
     assert data["success"] is True
     assert data["data"]["status"] == "healthy"
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client: AsyncClient):
+    """Тест эндпоинта метрик в формате Prometheus"""
+    await client.get("/api/v1/operators/99999")
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert (
+        'http_requests_total{method="GET",route="/api/v1/operators/{operator_id}",'
+        'status="404"}' in text
+    )
+    assert (
+        'http_request_db_queries_bucket{method="GET",'
+        'route="/api/v1/operators/{operator_id}",le="+Inf"}' in text
+    )
+    assert "db_queries_total" in text
+
+
+@pytest.mark.asyncio
+async def test_ready_endpoint(client: AsyncClient, db_session: AsyncSession):
+    """Тест /ready: 503 до прогрева, 200 после"""
+    response = await client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["data"]["status"] == "warming_up"
+
+    await warm_up(app, db_session.bind, async_sessionmaker(db_session.bind), 2)
+
+    response = await client.get("/ready")
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["status"] == "ready"
+    assert set(data["steps"]) == {"pool", "queries", "routing", "serializers"}
+    assert all(step["ok"] for step in data["steps"].values())
+
+
+@pytest.mark.asyncio
+async def test_ready_stays_unavailable_while_database_fails(
+    client: AsyncClient, db_session: AsyncSession, monkeypatch
+):
+    """Тест /ready: пока пул и SQL прогрева падают, 503 и повтор шагов"""
+    database_up = False
+
+    async def pool(engine, connections):
+        if not database_up:
+            raise ConnectionRefusedError("database is unreachable")
+
+    async def queries(session):
+        if not database_up:
+            raise ConnectionRefusedError("database is unreachable")
+
+    monkeypatch.setattr("src.core.warmup.warm_up_pool", pool)
+    monkeypatch.setattr("src.core.warmup.warm_up_queries", queries)
+
+    task = asyncio.create_task(
+        warm_up(
+            app,
+            db_session.bind,
+            async_sessionmaker(db_session.bind),
+            retry_interval=0.01,
+        )
+    )
+    try:
+        await asyncio.sleep(0.1)
+        response = await client.get("/ready")
+        assert response.status_code == 503
+        data = response.json()["data"]
+        assert data["status"] == "warming_up"
+        assert data["steps"]["pool"]["ok"] is False
+        assert data["steps"]["queries"]["ok"] is False
+        assert data["steps"]["pool"]["attempts"] > 1
+        # Необязательные шаги выполнены, но готовность от них не зависит
+        assert data["steps"]["serializers"]["ok"] is True
+
+        database_up = True
+        await asyncio.wait_for(task, 1)
+    finally:
+        task.cancel()
+
+    response = await client.get("/ready")
+    assert response.status_code == 200
+    assert all(step["ok"] for step in response.json()["data"]["steps"].values())
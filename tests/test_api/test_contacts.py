@@ -1,7 +1,12 @@
 """Тесты для эндпоинтов обращений"""
 
+import csv
+import io
+import json
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.domains.contacts.model import Contact
@@ -106,6 +111,35 @@ async def test_create_contact_source_not_found(client: AsyncClient):
     assert response.status_code == 404
 
 
+@pytest.mark.asyncio
+async def test_create_contact_idempotency_key(
+    client: AsyncClient, test_source: Source, db_session: AsyncSession
+):
+    """Тест: повтор с тем же Idempotency-Key не создает второе обращение"""
+    source_id = test_source.id
+    data = {"phone": "+79990000001", "source_id": source_id, "message": "Повтор"}
+    headers = {"Idempotency-Key": "bot-retry-1"}
+
+    first = await client.post("/api/v1/contacts", json=data, headers=headers)
+    assert first.status_code == 201
+
+    retry = await client.post("/api/v1/contacts", json=data, headers=headers)
+    assert retry.status_code == 201
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+
+    count = await db_session.scalar(
+        select(func.count(Contact.id)).where(Contact.source_id == source_id)
+    )
+    assert count == 1
+
+    # Тот же ключ с другим телом - ошибка клиента
+    changed = await client.post(
+        "/api/v1/contacts", json={**data, "message": "Другое"}, headers=headers
+    )
+    assert changed.status_code == 422
+
+
 @pytest.mark.asyncio
 async def test_get_contacts_empty(client: AsyncClient):
     """Тест получения списка обращений (пустой список)"""
@@ -144,6 +178,51 @@ async def test_get_contacts(
     assert result["data"][0]["message"] == contact.message
 
 
+@pytest.mark.asyncio
+async def test_get_contacts_batch_above_chunk_size(
+    client: AsyncClient,
+    test_lead: Lead,
+    test_source: Source,
+    test_operator: Operator,
+    db_session: AsyncSession,
+):
+    """Тест пакета больше чанка: связи загружаются по запросу на чанк"""
+    other_lead = Lead(name="Второй лид")
+    db_session.add(other_lead)
+    await db_session.flush()
+    contacts = [
+        Contact(
+            lead_id=(test_lead.id, other_lead.id)[i % 2],
+            source_id=test_source.id,
+            operator_id=test_operator.id if i % 3 else None,
+        )
+        for i in range(600)
+    ]
+    db_session.add_all(contacts)
+    await db_session.commit()
+    ids = [contact.id for contact in reversed(contacts)] + list(range(100_000, 100_400))
+
+    # Бюджет проверяется в strict-режиме: превышение уронило бы запрос
+    response = await client.post("/api/v1/contacts/batch", json={"ids": ids})
+    assert response.status_code == 200
+    # Два чанка по SELECT обращений и по запросу на lead, source и operator
+    assert response.headers["x-query-count"] == "8"
+    data = response.json()["data"]
+    assert [item and item["id"] for item in data["items"]] == ids[:600] + [None] * 400
+    assert len(data["not_found"]) == 400
+    for item, contact in zip(data["items"], reversed(contacts)):
+        assert item["lead"]["id"] == contact.lead_id
+        assert item["source"]["id"] == test_source.id
+        assert (item["operator"] and item["operator"]["id"]) == contact.operator_id
+
+    response = await client.get(
+        "/api/v1/contacts", params={"ids": ",".join(map(str, ids[:600]))}
+    )
+    assert response.status_code == 200
+    assert response.headers["x-query-count"] == "8"
+    assert len(response.json()["data"]["items"]) == 600
+
+
 @pytest.mark.asyncio
 async def test_get_contacts_with_pagination(
     client: AsyncClient,
@@ -204,6 +283,42 @@ async def test_get_contact_by_id(
     assert result["data"]["operator"]["id"] == test_operator.id
 
 
+@pytest.mark.asyncio
+async def test_get_contact_sparse_fields(
+    client: AsyncClient,
+    test_lead: Lead,
+    test_source: Source,
+    test_operator: Operator,
+    db_session: AsyncSession,
+):
+    """Тест: fields сужает ответ и не загружает незапрошенные связи"""
+    contact = Contact(
+        lead_id=test_lead.id, source_id=test_source.id, operator_id=test_operator.id
+    )
+    db_session.add(contact)
+    await db_session.commit()
+    contact_id, operator_id = contact.id, test_operator.id
+
+    full = await client.get(f"/api/v1/contacts/{contact_id}")
+    response = await client.get(f"/api/v1/contacts/{contact_id}?fields=is_active")
+    assert response.status_code == 200
+    assert response.json()["data"] == {"id": contact_id, "is_active": True}
+    assert int(response.headers["x-query-count"]) < int(full.headers["x-query-count"])
+
+    response = await client.get(
+        f"/api/v1/contacts/{contact_id}?fields=operator,is_active"
+    )
+    data = response.json()["data"]
+    assert set(data) == {"id", "is_active", "operator"}
+    assert data["operator"]["id"] == operator_id
+
+    response = await client.get("/api/v1/contacts?fields=id,operator_id")
+    assert response.json()["data"] == [{"id": contact_id, "operator_id": operator_id}]
+
+    response = await client.get(f"/api/v1/contacts/{contact_id}?fields=secret")
+    assert response.status_code == 422
+
+
 @pytest.mark.asyncio
 async def test_get_contact_not_found(client: AsyncClient):
     """Тест получения несуществующего обращения"""
@@ -309,3 +424,104 @@ async def test_get_distribution_statistics(
     # Проверяем, что статистика содержит ожидаемые ключи
     stats = result["data"]
     assert isinstance(stats, dict)
+
+
+@pytest.mark.asyncio
+async def test_export_contacts_ndjson(
+    client: AsyncClient,
+    test_lead: Lead,
+    test_source: Source,
+    test_operator: Operator,
+    db_session: AsyncSession,
+):
+    """Тест потоковой выгрузки обращений в NDJSON с фильтром"""
+    for i in range(3):
+        contact = Contact(
+            lead_id=test_lead.id,
+            source_id=test_source.id,
+            operator_id=test_operator.id,
+            is_active=i != 0,
+            message=f"Обращение {i}",
+        )
+        db_session.add(contact)
+    await db_session.commit()
+
+    response = await client.get("/api/v1/contacts/export?is_active=true")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 2
+    assert all(line["is_active"] for line in lines)
+    assert lines[0]["message"] == "Обращение 1"
+
+
+@pytest.mark.asyncio
+async def test_export_contacts_csv(
+    client: AsyncClient,
+    test_lead: Lead,
+    test_source: Source,
+    db_session: AsyncSession,
+):
+    """Тест потоковой выгрузки обращений в CSV"""
+    contact = Contact(
+        lead_id=test_lead.id, source_id=test_source.id, message="Тестовое обращение"
+    )
+    db_session.add(contact)
+    await db_session.commit()
+
+    response = await client.get("/api/v1/contacts/export?format=csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0][:3] == ["id", "lead_id", "source_id"]
+    assert len(rows) == 2
+    assert rows[1][5] == "Тестовое обращение"
+
+
+@pytest.mark.asyncio
+async def test_create_contact_routes_by_skills(
+    client: AsyncClient, db_session: AsyncSession
+):
+    """Тест распределения с учетом навыков источника и обращения"""
+    english = await client.post(
+        "/api/v1/operators", json={"name": "English", "skills": ["EN"]}
+    )
+    bilingual = await client.post(
+        "/api/v1/operators", json={"name": "Bilingual", "skills": [" ru ", "en", "RU"]}
+    )
+    assert bilingual.json()["data"]["skills"] == ["en", "ru"]
+    operator_ids = [english.json()["data"]["id"], bilingual.json()["data"]["id"]]
+
+    russian = await client.post(
+        "/api/v1/sources", json={"name": "Русский бот", "required_skills": ["ru"]}
+    )
+    general = await client.post("/api/v1/sources", json={"name": "Общий бот"})
+    source_ids = [russian.json()["data"]["id"], general.json()["data"]["id"]]
+    for source_id in source_ids:
+        for operator_id in operator_ids:
+            db_session.add(
+                SourceOperatorWeight(
+                    source_id=source_id, operator_id=operator_id, weight=10
+                )
+            )
+    await db_session.commit()
+
+    # Навык источника: подходит только оператор с русским
+    response = await client.post(
+        "/api/v1/contacts", json={"phone": "+79990000001", "source_id": source_ids[0]}
+    )
+    assert response.status_code == 201
+    assert response.json()["data"]["operator_id"] == operator_ids[1]
+
+    # Навыка обращения нет ни у кого - обращение остается без оператора
+    response = await client.post(
+        "/api/v1/contacts",
+        json={
+            "phone": "+79990000002",
+            "source_id": source_ids[1],
+            "required_skills": ["DE"],
+        },
+    )
+    assert response.status_code == 201
+    assert response.json()["data"]["operator_id"] is None
+    assert response.json()["data"]["required_skills"] == ["de"]
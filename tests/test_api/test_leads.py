@@ -1,10 +1,15 @@
 """Тесты для эндпоинтов лидов"""
 
+import json
+from datetime import datetime, timedelta
+
 import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.config import settings
 from src.domains.leads.model import Lead
+from src.domains.leads.repository import LeadRepository
 from src.domains.contacts.model import Contact
 from src.domains.sources.model import Source
 
@@ -58,6 +63,42 @@ async def test_get_leads_with_pagination(client: AsyncClient, db_session: AsyncS
     assert len(result["data"]) == 2
 
 
+@pytest.mark.asyncio
+async def test_get_leads_by_ids(client: AsyncClient, db_session: AsyncSession):
+    """Тест пакетного получения лидов: порядок запроса и отметки ненайденных"""
+    leads = [Lead(name=f"Лид {i}") for i in range(3)]
+    db_session.add_all(leads)
+    await db_session.commit()
+    first, second, third = (lead.id for lead in leads)
+
+    response = await client.get(f"/api/v1/leads?ids={third},999,{first},{third}")
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert [item and item["id"] for item in data["items"]] == [
+        third,
+        None,
+        first,
+        third,
+    ]
+    assert data["not_found"] == [999]
+
+    response = await client.post("/api/v1/leads/batch", json={"ids": [second, first]})
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["data"]["items"]] == [
+        second,
+        first,
+    ]
+
+    response = await client.get("/api/v1/leads?ids=1,abc")
+    assert response.status_code == 422
+
+    # Большой список разбивается на чанки, порядок сохраняется
+    rows = await LeadRepository(db_session).get_many(
+        [third, first, second], chunk_size=1
+    )
+    assert [row.id for row in rows] == [third, first, second]
+
+
 @pytest.mark.asyncio
 async def test_get_lead_by_id(client: AsyncClient, test_lead: Lead):
     """Тест получения лида по ID"""
@@ -116,6 +157,65 @@ async def test_get_lead_with_contacts_empty(client: AsyncClient, test_lead: Lead
     assert result["data"]["contacts"] == []
 
 
+@pytest.mark.asyncio
+async def test_get_lead_contacts_timeline(
+    client: AsyncClient,
+    test_lead: Lead,
+    test_source: Source,
+    db_session: AsyncSession,
+    monkeypatch,
+):
+    """Тест ленты обращений лида: keyset-страницы, фильтр и ограничение with-contacts"""
+    lead_id = test_lead.id
+    base = datetime(2026, 1, 1)
+    contacts = [
+        Contact(
+            lead_id=lead_id,
+            source_id=test_source.id,
+            is_active=i % 2 == 0,
+            created_at=base + timedelta(minutes=i // 2),  # пары с равным created_at
+        )
+        for i in range(5)
+    ]
+    db_session.add_all(contacts)
+    await db_session.commit()
+    newest_first = [c.id for c in sorted(contacts, key=lambda c: (c.created_at, c.id))][
+        ::-1
+    ]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(f"/api/v1/leads/{lead_id}/contacts", params=params)
+        assert response.status_code == 200
+        page = response.json()["data"]
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == newest_first
+
+    response = await client.get(
+        f"/api/v1/leads/{lead_id}/contacts", params={"is_active": "false"}
+    )
+    assert all(not item["is_active"] for item in response.json()["data"]["items"])
+    assert len(response.json()["data"]["items"]) == 2
+
+    monkeypatch.setattr(settings, "lead_contacts_preview_limit", 2)
+    response = await client.get(f"/api/v1/leads/{lead_id}/with-contacts")
+    data = response.json()["data"]
+    assert [c["id"] for c in data["contacts"]] == newest_first[:2]
+    assert data["contacts_total"] == 5
+    assert data["contacts_next_cursor"] is not None
+
+    response = await client.get("/api/v1/leads/99999/contacts")
+    assert response.status_code == 404
+    response = await client.get(
+        f"/api/v1/leads/{lead_id}/contacts", params={"cursor": "bad"}
+    )
+    assert response.status_code == 422
+
+
 @pytest.mark.asyncio
 async def test_update_lead(client: AsyncClient, test_lead: Lead):
     """Тест обновления лида"""
@@ -154,3 +254,41 @@ async def test_update_lead_not_found(client: AsyncClient):
     data = {"name": "Новое имя"}
     response = await client.patch("/api/v1/leads/99999", json=data)
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_export_leads_by_source(
+    client: AsyncClient,
+    test_lead: Lead,
+    test_source: Source,
+    db_session: AsyncSession,
+):
+    """Тест потоковой выгрузки лидов с фильтром по источнику обращений"""
+    other_lead = Lead(phone="+79990000000", name="Другой лид")
+    db_session.add(other_lead)
+    contact = Contact(lead_id=test_lead.id, source_id=test_source.id)
+    db_session.add(contact)
+    await db_session.commit()
+    lead_id, source_id = test_lead.id, test_source.id
+
+    response = await client.get("/api/v1/leads/export")
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 2
+
+    response = await client.get(f"/api/v1/leads/export?source_id={source_id}")
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == [lead_id]
+
+
+@pytest.mark.asyncio
+async def test_get_lead_if_modified_since(client: AsyncClient, test_lead: Lead):
+    """Тест условного GET лида по If-Modified-Since"""
+    lead_id = test_lead.id
+    response = await client.get(f"/api/v1/leads/{lead_id}")
+    last_modified = response.headers["last-modified"]
+
+    response = await client.get(
+        f"/api/v1/leads/{lead_id}", headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == 304
@@ -1,10 +1,18 @@
 """Тесты для эндпоинтов операторов"""
 
+from datetime import datetime, timezone
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.cache import response_cache
+from src.domains.contacts.model import Contact
+from src.domains.leads.model import Lead
+from src.domains.operators.load_snapshot import OperatorLoadSnapshot
 from src.domains.operators.model import Operator
+from src.domains.sources.model import Source, SourceOperatorWeight
 
 
 @pytest.mark.asyncio
@@ -161,3 +169,348 @@ async def test_delete_operator_not_found(client: AsyncClient):
     """Тест удаления несуществующего оператора"""
     response = await client.delete("/api/v1/operators/99999")
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_operators_load(
+    client: AsyncClient, test_operator: Operator, db_session: AsyncSession
+):
+    """Тест снимка нагрузки операторов с инкрементальным обновлением"""
+    source = Source(name="Источник нагрузки")
+    db_session.add(source)
+    await db_session.commit()
+    weight = SourceOperatorWeight(
+        source_id=source.id, operator_id=test_operator.id, weight=10
+    )
+    db_session.add(weight)
+    await db_session.commit()
+    operator_id, source_id = test_operator.id, source.id
+
+    response = await client.get("/api/v1/operators/load")
+    assert response.status_code == 200
+    load = response.json()["data"]
+    assert load == [
+        {
+            "operator_id": operator_id,
+            "name": "Тестовый оператор",
+            "is_active": True,
+            "load_limit": 10,
+            "active_load": 0,
+            "headroom": 10,
+            "source_ids": [source_id],
+        }
+    ]
+
+    response = await client.post(
+        "/api/v1/contacts", json={"phone": "+79991112233", "source_id": source_id}
+    )
+    contact_id = response.json()["data"]["id"]
+    response = await client.get("/api/v1/operators/load")
+    assert response.json()["data"][0]["active_load"] == 1
+    assert response.json()["data"][0]["headroom"] == 9
+
+    await client.patch(f"/api/v1/contacts/{contact_id}", json={"is_active": False})
+    response = await client.get("/api/v1/operators/load")
+    assert response.json()["data"][0]["active_load"] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_operators_conditional(client: AsyncClient, test_operator: Operator):
+    """Тест условного GET списка операторов по ETag"""
+    response = await client.get("/api/v1/operators")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = await client.get("/api/v1/operators", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # Частичный ответ - другое представление, ETag полного ответа к нему не подходит
+    response = await client.get(
+        "/api/v1/operators?fields=name", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert set(response.json()["data"][0]) == {"id", "name"}
+
+    await client.post("/api/v1/operators", json={"name": "Второй оператор"})
+    response = await client.get("/api/v1/operators", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_operators_etag_follows_cached_body(
+    client: AsyncClient, test_operator: Operator, db_session: AsyncSession
+):
+    """Тест: ETag списка берется из той же записи кеша, что и тело"""
+    response = await client.get("/api/v1/operators?fields=name")
+    etag = response.headers["etag"]
+
+    # Изменение мимо сервиса (другой воркер без шины): кеш еще не обновлен
+    test_operator.name = "Переименован"
+    test_operator.updated_at = datetime(2030, 1, 1)
+    await db_session.commit()
+    response = await client.get("/api/v1/operators?fields=name")
+    assert response.json()["data"][0]["name"] == "Тестовый оператор"
+    assert response.headers["etag"] == etag
+
+    # После обновления записи кеша старый ETag больше не подтверждается
+    response_cache.clear()
+    response = await client.get(
+        "/api/v1/operators?fields=name", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["data"][0]["name"] == "Переименован"
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_operator_schedule_routing(
+    client: AsyncClient, test_operator: Operator, db_session: AsyncSession
+):
+    """Тест: оператор вне смены не получает новых обращений"""
+    source = Source(name="Источник смен")
+    db_session.add(source)
+    await db_session.commit()
+    db_session.add(
+        SourceOperatorWeight(source_id=source.id, operator_id=test_operator.id)
+    )
+    await db_session.commit()
+    operator_id, source_id = test_operator.id, source.id
+
+    # Смена через три дня - сейчас оператор не на смене
+    weekday = (datetime.now(timezone.utc).weekday() + 3) % 7
+    response = await client.put(
+        f"/api/v1/operators/{operator_id}/schedule",
+        json={
+            "timezone": "UTC",
+            "shifts": [
+                {"weekday": weekday, "start_time": "00:00", "end_time": "01:00"}
+            ],
+        },
+    )
+    assert response.status_code == 200
+    schedule = response.json()["data"]
+    assert schedule["on_shift"] is False
+    assert schedule["shifts"] == [
+        {"weekday": weekday, "start_time": "00:00:00", "end_time": "01:00:00"}
+    ]
+
+    response = await client.post(
+        "/api/v1/contacts", json={"phone": "+79990001122", "source_id": source_id}
+    )
+    assert response.status_code == 201
+    assert response.json()["data"]["operator_id"] is None
+
+    # Пустое расписание - оператор снова доступен всегда
+    response = await client.put(
+        f"/api/v1/operators/{operator_id}/schedule", json={"shifts": []}
+    )
+    assert response.json()["data"]["on_shift"] is True
+
+    response = await client.get(f"/api/v1/operators/{operator_id}/schedule")
+    assert response.status_code == 200
+    assert response.json()["data"]["shifts"] == []
+
+
+@pytest.mark.asyncio
+async def test_operator_schedule_validation(
+    client: AsyncClient, test_operator: Operator
+):
+    """Тест валидации расписания"""
+    url = f"/api/v1/operators/{test_operator.id}/schedule"
+    response = await client.put(url, json={"timezone": "Mars/Base", "shifts": []})
+    assert response.status_code == 422
+
+    shift = {"weekday": 0, "start_time": "09:00", "end_time": "09:00"}
+    response = await client.put(url, json={"shifts": [shift]})
+    assert response.status_code == 422
+
+    response = await client.get("/api/v1/operators/99999/schedule")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_deactivate_operator_redistributes_contacts(
+    client: AsyncClient, db_session: AsyncSession
+):
+    """Тест: обращения отключенного оператора делятся по весам и емкости"""
+    leaving = Operator(name="Уходит", load_limit=10)
+    main = Operator(name="Основной", load_limit=10)
+    small = Operator(name="Почти занят", load_limit=1)
+    source = Source(name="Источник переназначения")
+    lead = Lead(phone="+79990000099")
+    db_session.add_all([leaving, main, small, source, lead])
+    await db_session.commit()
+    for operator, weight in ((leaving, 10), (main, 30), (small, 30)):
+        db_session.add(
+            SourceOperatorWeight(
+                source_id=source.id, operator_id=operator.id, weight=weight
+            )
+        )
+    db_session.add_all(
+        Contact(lead_id=lead.id, source_id=source.id, operator_id=leaving.id)
+        for _ in range(6)
+    )
+    await db_session.commit()
+    leaving_id, main_id, small_id = leaving.id, main.id, small.id
+
+    response = await client.patch(
+        f"/api/v1/operators/{leaving_id}", json={"is_active": False}
+    )
+    assert response.status_code == 200
+
+    db_session.expire_all()
+    rows = await db_session.execute(
+        select(Contact.operator_id, func.count(Contact.id)).group_by(
+            Contact.operator_id
+        )
+    )
+    # У второго оператора одно свободное место, остальное - основному
+    assert dict(rows.all()) == {main_id: 5, small_id: 1}
+
+    response = await client.post(f"/api/v1/operators/{leaving_id}/redistribute")
+    assert response.status_code == 200
+    assert response.json()["data"]["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_delete_operator_refused_while_contacts_unplaced(
+    client: AsyncClient, db_session: AsyncSession, monkeypatch
+):
+    """Тест: удаление отклоняется, пока обращениям оператора не нашлось места"""
+    leaving = Operator(name="Удаляется", load_limit=10)
+    spare = Operator(name="Одно место", load_limit=1)
+    source = Source(name="Источник удаления")
+    lead = Lead(phone="+79990000066")
+    db_session.add_all([leaving, spare, source, lead])
+    await db_session.commit()
+    for operator in (leaving, spare):
+        db_session.add(
+            SourceOperatorWeight(
+                source_id=source.id, operator_id=operator.id, weight=10
+            )
+        )
+    db_session.add_all(
+        Contact(lead_id=lead.id, source_id=source.id, operator_id=leaving.id)
+        for _ in range(3)
+    )
+    await db_session.commit()
+    leaving_id, spare_id = leaving.id, spare.id
+
+    async def contacts_by_operator() -> dict:
+        db_session.expire_all()
+        rows = await db_session.execute(
+            select(Contact.operator_id, func.count(Contact.id)).group_by(
+                Contact.operator_id
+            )
+        )
+        return dict(rows.all())
+
+    response = await client.delete(f"/api/v1/operators/{leaving_id}")
+    assert response.status_code == 409
+    assert "2 active contacts" in response.json()["message"]
+    # Одно обращение перенесено, остальные остались за оператором
+    assert await contacts_by_operator() == {leaving_id: 2, spare_id: 1}
+    assert await db_session.get(Operator, leaving_id) is not None
+
+    response = await client.patch(
+        f"/api/v1/operators/{spare_id}", json={"load_limit": 3}
+    )
+    assert response.status_code == 200
+    response = await client.delete(f"/api/v1/operators/{leaving_id}")
+    assert response.status_code == 200
+    assert response.json()["data"] == {"deleted": True}
+    assert await contacts_by_operator() == {spare_id: 3}
+
+    # Без переназначения удаляется только оператор без активных обращений
+    monkeypatch.setattr(
+        "src.domains.operators.service.settings.operator_redistribute_on_deactivate",
+        False,
+    )
+    response = await client.delete(f"/api/v1/operators/{spare_id}")
+    assert response.status_code == 409
+    assert await contacts_by_operator() == {spare_id: 3}
+
+
+@pytest.mark.asyncio
+async def test_rebalance_plan_is_dry_run(client: AsyncClient, db_session: AsyncSession):
+    """Тест: план ребалансировки после снижения лимита не меняет назначения"""
+    busy = Operator(name="Снижен лимит", load_limit=10)
+    free = Operator(name="Есть место", load_limit=10)
+    source = Source(name="Источник плана")
+    lead = Lead(phone="+79990000088")
+    db_session.add_all([busy, free, source, lead])
+    await db_session.commit()
+    for operator in (busy, free):
+        db_session.add(
+            SourceOperatorWeight(
+                source_id=source.id, operator_id=operator.id, weight=10
+            )
+        )
+    db_session.add_all(
+        Contact(lead_id=lead.id, source_id=source.id, operator_id=busy.id)
+        for _ in range(3)
+    )
+    await db_session.commit()
+    busy_id, free_id = busy.id, free.id
+
+    response = await client.patch(
+        f"/api/v1/operators/{busy_id}", json={"load_limit": 1}
+    )
+    assert response.status_code == 200
+
+    response = await client.get("/api/v1/operators/rebalance")
+    assert response.status_code == 200
+    plan = response.json()["data"]
+    assert plan["overloaded"] == {str(busy_id): 2}
+    assert plan["unresolved"] == {}
+    assert [(m["to_operator_id"], m["reason"]) for m in plan["moves"]] == [
+        (free_id, "capacity")
+    ] * 2
+
+    db_session.expire_all()
+    rows = await db_session.execute(
+        select(Contact.operator_id, func.count(Contact.id)).group_by(
+            Contact.operator_id
+        )
+    )
+    assert dict(rows.all()) == {busy_id: 3}
+
+
+@pytest.mark.asyncio
+async def test_load_snapshot_keeps_contacts_created_during_reconcile(
+    db_session: AsyncSession,
+    test_lead: Lead,
+    test_source: Source,
+    test_operator: Operator,
+):
+    """Тест: обращение, созданное во время сверки, не теряется в снимке"""
+    snapshot = OperatorLoadSnapshot()
+    load = snapshot._load
+    operator_id = test_operator.id
+    loads = []
+
+    async def load_with_concurrent_contact(session):
+        result = await load(session)
+        loads.append(result)
+        if len(loads) % 2:
+            # Обращение создано после подсчета нагрузки, но до замены снимка
+            db_session.add(
+                Contact(
+                    lead_id=test_lead.id,
+                    source_id=test_source.id,
+                    operator_id=operator_id,
+                )
+            )
+            await db_session.commit()
+            snapshot.contact_created(operator_id, True)
+        return result
+
+    snapshot._load = load_with_concurrent_contact
+    # Первая сборка (снимок еще пуст) и сверка уже собранного снимка
+    for expected in (1, 2):
+        await snapshot.reconcile(db_session)
+        (operator_load,) = await snapshot.get_all(db_session)
+        assert operator_load.active_load == expected
+    assert len(loads) == 4
@@ -239,3 +239,47 @@ async def test_remove_operator_weight_not_found(
         f"/api/v1/sources/{test_source.id}/operator-weights/99999"
     )
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_set_operator_weight_invalidates_cached_weights(
+    client: AsyncClient, test_source: Source, test_operator: Operator
+):
+    """Тест инвалидации кеша источника с весами при изменении веса"""
+    source_id, operator_id = test_source.id, test_operator.id
+    response = await client.get(f"/api/v1/sources/{source_id}/with-weights")
+    assert response.json()["data"]["operator_weights"] == []
+
+    data = {"operator_id": operator_id, "weight": 25}
+    response = await client.post(
+        f"/api/v1/sources/{source_id}/operator-weights", json=data
+    )
+    assert response.status_code == 201
+
+    response = await client.get(f"/api/v1/sources/{source_id}/with-weights")
+    weights = response.json()["data"]["operator_weights"]
+    assert len(weights) == 1
+    assert weights[0]["weight"] == 25
+
+
+@pytest.mark.asyncio
+async def test_get_source_conditional(client: AsyncClient, test_source: Source):
+    """Тест условного GET источника по ETag"""
+    source_id = test_source.id
+    response = await client.get(f"/api/v1/sources/{source_id}")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert "last-modified" in response.headers
+
+    response = await client.get(
+        f"/api/v1/sources/{source_id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    await client.patch(f"/api/v1/sources/{source_id}", json={"description": "Новое"})
+    response = await client.get(
+        f"/api/v1/sources/{source_id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
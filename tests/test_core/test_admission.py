@@ -0,0 +1,92 @@
+"""Тесты для контроля допуска и сброса нагрузки"""
+
+import asyncio
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from src.core.admission import (
+    ADMIN,
+    INGEST,
+    READ,
+    AdmissionLimiter,
+    AdmissionMiddleware,
+    admission_shed_total,
+    classify_request,
+)
+
+
+def test_classify_request():
+    """Тест: классы маршрутов"""
+    ingest_paths = {"/api/v1/contacts"}
+    assert classify_request("POST", "/api/v1/contacts", ingest_paths) == INGEST
+    assert classify_request("GET", "/api/v1/contacts", ingest_paths) == READ
+    assert classify_request("PATCH", "/api/v1/contacts/1", ingest_paths) == ADMIN
+    assert classify_request("POST", "/api/v1/leads/batch", ingest_paths) == READ
+    assert classify_request("GET", "/health", ingest_paths) is None
+
+
+@pytest.mark.asyncio
+async def test_admission_sheds_when_queue_is_full():
+    """Тест: сверх лимита и очереди запрос сразу отклоняется с Retry-After"""
+    release = asyncio.Event()
+
+    async def slow(request):
+        await release.wait()
+        return JSONResponse({"ok": True})
+
+    limiter = AdmissionLimiter(
+        INGEST, max_concurrent=1, max_queue=1, queue_timeout=5, status_code=429
+    )
+    app = AdmissionMiddleware(
+        Starlette(routes=[Route("/api/v1/contacts", slow, methods=["POST"])]),
+        limiters={INGEST: limiter},
+        retry_after=2,
+    )
+    shed_before = admission_shed_total.get(INGEST, "queue_full")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        running = asyncio.create_task(client.post("/api/v1/contacts"))
+        queued = asyncio.create_task(client.post("/api/v1/contacts"))
+        await asyncio.sleep(0.05)
+
+        rejected = await client.post("/api/v1/contacts")
+        assert rejected.status_code == 429
+        assert rejected.headers["retry-after"] == "2"
+        assert rejected.json()["success"] is False
+
+        release.set()
+        assert (await running).status_code == 200
+        assert (await queued).status_code == 200
+
+    assert admission_shed_total.get(INGEST, "queue_full") == shed_before + 1
+
+
+@pytest.mark.asyncio
+async def test_admission_queue_timeout():
+    """Тест: запрос, не дождавшийся слота, получает 503"""
+    release = asyncio.Event()
+
+    async def slow(request):
+        await release.wait()
+        return JSONResponse({"ok": True})
+
+    limiter = AdmissionLimiter(READ, max_concurrent=1, max_queue=10, queue_timeout=0.05)
+    app = AdmissionMiddleware(
+        Starlette(routes=[Route("/api/v1/leads", slow)]), limiters={READ: limiter}
+    )
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        running = asyncio.create_task(client.get("/api/v1/leads"))
+        await asyncio.sleep(0.01)
+
+        response = await client.get("/api/v1/leads")
+        assert response.status_code == 503
+
+        release.set()
+        assert (await running).status_code == 200
@@ -0,0 +1,83 @@
+"""Тесты для кеша ответов"""
+
+import asyncio
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.cache import ResponseCache
+
+
+@pytest.mark.asyncio
+async def test_cache_hit(db_session: AsyncSession):
+    """Тест повторного обращения к свежей записи без загрузки"""
+    cache = ResponseCache(ttl=60)
+    calls = []
+
+    async def loader(session: AsyncSession) -> int:
+        calls.append(1)
+        return len(calls)
+
+    assert await cache.get_or_load("key", loader, db_session) == 1
+    assert await cache.get_or_load("key", loader, db_session) == 1
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_max_size_eviction(db_session: AsyncSession):
+    """Тест вытеснения самых старых записей при превышении размера"""
+    cache = ResponseCache(max_size=2, ttl=60)
+
+    async def loader(session: AsyncSession) -> str:
+        return "value"
+
+    for key in ("a", "b", "c"):
+        await cache.get_or_load(key, loader, db_session)
+    assert len(cache) == 2
+    assert "a" not in cache._entries
+
+
+@pytest.mark.asyncio
+async def test_cache_serves_stale_while_revalidating(db_session: AsyncSession):
+    """Тест отдачи устаревшего значения во время фонового обновления"""
+    cache = ResponseCache(ttl=0, stale_ttl=60)
+    values = iter([1, 2])
+
+    async def loader(session: AsyncSession) -> int:
+        return next(values)
+
+    assert await cache.get_or_load("key", loader, db_session) == 1
+    # Запись устарела - отдается старое значение, обновление идет в фоне
+    assert await cache.get_or_load("key", loader, db_session) == 1
+    await asyncio.gather(*cache._tasks)
+    assert cache._entries["key"].value == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_serves_stale_on_db_error(db_session: AsyncSession):
+    """Тест отдачи просроченного значения при ошибке БД"""
+    cache = ResponseCache(ttl=0, stale_ttl=0, stale_if_error=60)
+
+    async def loader(session: AsyncSession) -> str:
+        return "cached"
+
+    async def failing_loader(session: AsyncSession) -> str:
+        raise OperationalError("SELECT 1", {}, Exception("db is down"))
+
+    await cache.get_or_load("key", loader, db_session)
+    assert await cache.get_or_load("key", failing_loader, db_session) == "cached"
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidate_prefix(db_session: AsyncSession):
+    """Тест инвалидации по префиксу"""
+    cache = ResponseCache(ttl=60)
+
+    async def loader(session: AsyncSession) -> str:
+        return "value"
+
+    await cache.get_or_load("sources:1:with-weights", loader, db_session)
+    await cache.get_or_load("operators:list:0:100", loader, db_session)
+    cache.invalidate_prefix("sources:")
+    assert list(cache._entries) == ["operators:list:0:100"]
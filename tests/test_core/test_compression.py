@@ -0,0 +1,109 @@
+"""Тесты для middleware сжатия ответов"""
+
+import gzip
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from src.core.compression import CompressionMiddleware, select_encoding
+
+LARGE_PAYLOAD = {"items": [{"id": i, "message": "обращение"} for i in range(200)]}
+
+
+async def large_json(request):
+    return JSONResponse(LARGE_PAYLOAD)
+
+
+async def small_json(request):
+    return JSONResponse({"status": "healthy"})
+
+
+async def image(request):
+    return PlainTextResponse("x" * 4096, media_type="image/png")
+
+
+async def stream(request):
+    async def body():
+        yield b"id,message\n"
+        for i in range(100):
+            yield f"{i},{'x' * 50}\n".encode()
+
+    return StreamingResponse(body(), media_type="text/csv")
+
+
+@pytest.fixture
+async def compression_client():
+    """Клиент для приложения с middleware сжатия"""
+    app = Starlette(
+        routes=[
+            Route("/large", large_json),
+            Route("/small", small_json),
+            Route("/image", image),
+            Route("/stream", stream),
+        ]
+    )
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=500,
+        content_types=["application/json", "text/csv"],
+        encodings=["gzip"],
+    )
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_compresses_large_json(compression_client: AsyncClient):
+    """Тест сжатия ответа больше порога"""
+    response = await compression_client.get(
+        "/large", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json() == LARGE_PAYLOAD
+
+
+@pytest.mark.asyncio
+async def test_skips_small_and_disallowed_responses(compression_client: AsyncClient):
+    """Тест пропуска ответов меньше порога и с неразрешенным content-type"""
+    headers = {"Accept-Encoding": "gzip"}
+    response = await compression_client.get("/small", headers=headers)
+    assert "content-encoding" not in response.headers
+
+    response = await compression_client.get("/image", headers=headers)
+    assert "content-encoding" not in response.headers
+
+    response = await compression_client.get(
+        "/large", headers={"Accept-Encoding": "identity"}
+    )
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_compresses_streaming_response(compression_client: AsyncClient):
+    """Тест потокового сжатия StreamingResponse"""
+    async with compression_client.stream(
+        "GET", "/stream", headers={"Accept-Encoding": "gzip"}
+    ) as response:
+        raw = b"".join([chunk async for chunk in response.aiter_raw()])
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    lines = gzip.decompress(raw).decode().splitlines()
+    assert lines[0] == "id,message"
+    assert len(lines) == 101
+
+
+def test_select_encoding():
+    """Тест выбора кодировки по Accept-Encoding"""
+    encodings = ["br", "gzip"]
+    assert select_encoding("gzip, deflate, br", encodings) == "br"
+    assert select_encoding("br;q=0.5, gzip", encodings) == "gzip"
+    assert select_encoding("gzip;q=0", encodings) is None
+    assert select_encoding("*", encodings) == "br"
+    assert select_encoding("", encodings) is None
@@ -0,0 +1,97 @@
+"""Тесты для ключей идемпотентности"""
+
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.responses import JSONResponse
+
+from src.core.exceptions import BaseAppException
+from src.core.idempotency import (
+    DatabaseIdempotencyStore,
+    Idempotency,
+    MemoryIdempotencyStore,
+    request_fingerprint,
+)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_single_flight():
+    """Тест: одновременные запросы с одним ключом выполняются один раз"""
+    calls = 0
+    release = asyncio.Event()
+
+    async def handler():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return JSONResponse({"id": calls}, status_code=201)
+
+    idempotency = Idempotency(MemoryIdempotencyStore())
+    first = asyncio.create_task(idempotency.execute("k", "test", b"{}", handler))
+    second = asyncio.create_task(idempotency.execute("k", "test", b"{}", handler))
+    await asyncio.sleep(0.01)
+    release.set()
+
+    responses = await asyncio.gather(first, second)
+    assert calls == 1
+    assert [r.status_code for r in responses] == [201, 201]
+    assert responses[0].body == responses[1].body
+    assert "idempotent-replayed" in responses[1].headers
+
+
+@pytest.mark.asyncio
+async def test_failed_request_can_be_retried():
+    """Тест: запрос, завершившийся ошибкой, не занимает ключ"""
+    attempts = 0
+
+    async def handler():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise ConnectionError("db is down")
+        return JSONResponse({}, status_code=201)
+
+    idempotency = Idempotency(MemoryIdempotencyStore())
+    with pytest.raises(ConnectionError):
+        await idempotency.execute("k", "test", b"{}", handler)
+    response = await idempotency.execute("k", "test", b"{}", handler)
+    assert response.status_code == 201
+    assert attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_memory_store_ttl_and_size_bound():
+    """Тест: ключи истекают по TTL и вытесняются сверх лимита"""
+    store = MemoryIdempotencyStore(max_size=2)
+    assert await store.claim("a", "fp", ttl=0) is None
+    assert (
+        await store.claim("a", "fp", ttl=60) is None
+    )  # истекший ключ занимается заново
+    await store.claim("b", "fp", ttl=60)
+    await store.claim("c", "fp", ttl=60)
+    assert await store.claim("a", "fp", ttl=60) is None  # вытеснен как самый старый
+
+
+@pytest.mark.asyncio
+async def test_database_store(db_session: AsyncSession):
+    """Тест: хранилище в БД видит ключ, занятый другим воркером"""
+    store = DatabaseIdempotencyStore(async_sessionmaker(db_session.bind))
+    worker_a = Idempotency(store)
+    worker_b = Idempotency(store)
+
+    assert await store.claim("test:k", request_fingerprint(b"{}"), ttl=60) is None
+    # Первый запрос еще выполняется в другом процессе
+    with pytest.raises(BaseAppException) as error:
+        await worker_b.execute("k", "test", b"{}", lambda: None)
+    assert error.value.status_code == 409
+    await store.release("test:k")
+
+    async def handler():
+        return JSONResponse({"id": 1}, status_code=201)
+
+    await worker_a.execute("k", "test", b"{}", handler)
+    replay = await worker_b.execute("k", "test", b"{}", handler)
+    assert replay.status_code == 201
+    assert replay.body == b'{"id":1}'
+    assert await store.purge_expired() == 0
@@ -0,0 +1,145 @@
+"""Тесты для шины инвалидации кешей между воркерами"""
+
+import asyncio
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from src.core.cache import CacheEntry, response_cache
+from src.core.invalidation import (
+    InvalidationBus,
+    InvalidationEvent,
+    LoopbackInvalidationBackend,
+    PostgresInvalidationBackend,
+    invalidation_bus,
+    invalidation_events_total,
+)
+
+
+def _store(key: str) -> None:
+    """Положить значение в кеш ответов"""
+    response_cache._store(key, "cached", ttl=60)
+
+
+def test_event_roundtrip():
+    """Тест: событие переживает сериализацию в payload NOTIFY"""
+    event = InvalidationEvent(
+        origin="w1",
+        keys=("contacts:statistics",),
+        prefixes=("sources:1:",),
+        operator_load=True,
+        sent_at=1.5,
+    )
+    assert InvalidationEvent.decode(event.encode()) == event
+
+
+def test_handle_evicts_keys_of_other_workers():
+    """Тест: событие другого воркера вытесняет ключи, свое - пропускается"""
+    bus = InvalidationBus(LoopbackInvalidationBackend(), origin="w2")
+    _store("sources:1:with-weights")
+    _store("sources:2:with-weights")
+
+    bus.handle(InvalidationEvent(origin="w2", prefixes=("sources:1:",)).encode())
+    assert "sources:1:with-weights" in response_cache._entries
+
+    bus.handle(InvalidationEvent(origin="w1", prefixes=("sources:1:",)).encode())
+    assert "sources:1:with-weights" not in response_cache._entries
+    assert isinstance(response_cache._entries["sources:2:with-weights"], CacheEntry)
+
+    # Поврежденный payload не роняет слушателя
+    bus.handle("not json")
+
+
+@pytest.mark.asyncio
+async def test_listener_receives_events():
+    """Тест: слушатель воркера применяет события, опубликованные через backend"""
+    backend = LoopbackInvalidationBackend()
+    listener = InvalidationBus(backend, origin="w2")
+    task = asyncio.create_task(listener.run())
+    await asyncio.sleep(0)
+    _store("operators:list:0:100")
+    received_before = invalidation_events_total.get("received")
+
+    await backend.publish(
+        InvalidationEvent(origin="w1", prefixes=("operators:",)).encode()
+    )
+    await asyncio.sleep(0)
+
+    assert "operators:list:0:100" not in response_cache._entries
+    assert invalidation_events_total.get("received") == received_before + 1
+    task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_listener_clears_cache_after_reconnect():
+    """Тест: после разрыва соединения кеш очищается целиком"""
+
+    class FlakyBackend(LoopbackInvalidationBackend):
+        def __init__(self) -> None:
+            super().__init__()
+            self.subscriptions = 0
+
+        async def subscribe(self):
+            self.subscriptions += 1
+            if self.subscriptions == 1:
+                raise ConnectionError("connection refused")
+            return await super().subscribe()
+
+    bus = InvalidationBus(FlakyBackend(), origin="w2", reconnect_delay=0)
+    task = asyncio.create_task(bus.run())
+    await asyncio.sleep(0)
+    _store("contacts:statistics")
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+    assert bus.backend.subscriptions == 2
+    assert "contacts:statistics" not in response_cache._entries
+    task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_operator_update_publishes_event(client: AsyncClient, test_operator):
+    """Тест: изменение оператора уходит в шину для остальных воркеров"""
+    stream = await invalidation_bus.backend.subscribe()
+
+    response = await client.patch(
+        f"/api/v1/operators/{test_operator.id}", json={"load_limit": 7}
+    )
+    assert response.status_code == 200
+
+    event = InvalidationEvent.decode(await anext(stream))
+    assert event.origin == invalidation_bus.origin
+    assert event.prefixes == ("operators:",)
+    assert event.operator_load is True
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_slow_postgres_publish_does_not_stall_writers(monkeypatch):
+    """Тест: зависшее подключение публикации ограничено таймаутом, а после
+    сбоя публикации сразу отказывают, не подключаясь заново"""
+    import asyncpg
+
+    connects = []
+
+    async def hanging_connect(dsn, timeout):
+        connects.append(timeout)
+        await asyncio.sleep(timeout)
+        raise asyncio.TimeoutError
+
+    monkeypatch.setattr(asyncpg, "connect", hanging_connect)
+    backend = PostgresInvalidationBackend(
+        "postgresql://db/test", "channel", publish_timeout=0.05, retry_delay=60
+    )
+    bus = InvalidationBus(backend, origin="w1")
+
+    start = time.monotonic()
+    await asyncio.gather(*(bus.publish(keys=["sources:list"]) for _ in range(5)))
+    await bus.publish(keys=["sources:list"])
+    assert time.monotonic() - start < 0.5
+    assert connects == [0.05]
+
+    with pytest.raises(ConnectionError):
+        await backend.publish("{}")
+    assert len(connects) == 1
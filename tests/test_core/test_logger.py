@@ -0,0 +1,83 @@
+"""Тесты для конвейера логирования"""
+
+import json
+import logging
+import queue
+
+import pytest
+from httpx import AsyncClient
+
+from src.utils.logger import (
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    RequestIdFilter,
+    SamplingFilter,
+    request_id_var,
+)
+
+
+def _record(name: str, msg: str, *args, level: int = logging.WARNING):
+    """Создать запись лога"""
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_sampling_filter_limits_message_template():
+    """Тест: сверх лимита записи одного шаблона отбрасываются, счетчик - в следующей"""
+    sampling = SamplingFilter({"src.domains.contacts": 2}, window=60)
+    name = "src.domains.contacts.service"
+    template = "No available operators for source: source_id=%s"
+
+    passed = [sampling.filter(_record(name, template, i)) for i in range(5)]
+    assert passed == [True, True, False, False, False]
+
+    # Другой шаблон, ошибки и логгеры без правил не ограничиваются
+    assert sampling.filter(_record(name, "Contact not found: contact_id=%s", 1))
+    assert sampling.filter(_record(name, template, 6, level=logging.ERROR))
+    assert sampling.filter(_record("src.core.cache", template, 7))
+
+    # Новое окно: первая запись сообщает, сколько было отброшено
+    sampling.window = 0
+    record = _record(name, template, 8)
+    assert sampling.filter(record)
+    assert record.suppressed == 3
+
+
+def test_json_formatter_with_request_id():
+    """Тест: JSON-строка с ID запроса и полями extra"""
+    token = request_id_var.set("req-1")
+    try:
+        record = _record("src.core.exceptions", "Database error: %s", "timeout")
+        record.path = "/api/v1/contacts"
+        RequestIdFilter().filter(record)
+    finally:
+        request_id_var.reset(token)
+
+    data = json.loads(JsonFormatter().format(record))
+    assert data["message"] == "Database error: timeout"
+    assert data["level"] == "WARNING"
+    assert data["request_id"] == "req-1"
+    assert data["path"] == "/api/v1/contacts"
+
+
+def test_queue_handler_drops_when_full():
+    """Тест: переполненная очередь не блокирует, запись отбрасывается"""
+    handler = NonBlockingQueueHandler(queue.Queue(1))
+    record = _record("src", "message %s", 1)
+    handler.handle(record)
+    handler.handle(_record("src", "message %s", 2))
+
+    # Сообщение не форматируется в вызывающем потоке
+    assert handler.queue.get_nowait() is record
+    assert record.args == (1,)
+    assert handler.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_request_id_header(client: AsyncClient):
+    """Тест: ID запроса возвращается в ответе, некорректный заменяется"""
+    response = await client.get("/health", headers={"X-Request-ID": "abc-123"})
+    assert response.headers["x-request-id"] == "abc-123"
+
+    response = await client.get("/health", headers={"X-Request-ID": "bad id"})
+    assert response.headers["x-request-id"] != "bad id"
+    assert len(response.headers["x-request-id"]) == 32
@@ -0,0 +1,75 @@
+"""Тесты для учета SQL-запросов и бюджетов эндпоинтов"""
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from src.core.query_budget import (
+    QueryBudgetExceeded,
+    QueryBudgetMiddleware,
+    query_budget,
+    record_queries,
+    record_statement,
+    statement_shape,
+)
+from src.domains.operators.model import Operator
+
+
+def test_statement_shape_ignores_literals_and_list_length():
+    """Тест: запросы, отличающиеся только параметрами, имеют одну форму"""
+    first = statement_shape(
+        "SELECT * FROM contacts WHERE id IN (?, ?, ?) AND name = 'a'"
+    )
+    second = statement_shape("SELECT *  FROM contacts\nWHERE id IN (?) AND name = 'b'")
+    assert first == second
+    assert statement_shape("SELECT 1 LIMIT 10") == "SELECT ? LIMIT ?"
+
+
+@pytest.mark.asyncio
+async def test_record_queries_detects_repeated_shapes(db_session: AsyncSession):
+    """Тест: запрос в цикле (N+1) виден как повторяющаяся форма"""
+    with record_queries() as recorder:
+        for operator_id in range(1, 4):
+            await db_session.execute(select(Operator).where(Operator.id == operator_id))
+
+    assert recorder.count == 3
+    [(shape, count)] = recorder.repeated_shapes(threshold=3)
+    assert count == 3
+    assert "FROM operators" in shape
+
+
+@pytest.mark.asyncio
+async def test_query_budget_strict_mode():
+    """Тест: превышение бюджета в strict-режиме роняет запрос, в пределах - заголовок"""
+
+    @query_budget(2)
+    async def within(request):
+        record_statement("SELECT 1")
+        return JSONResponse({})
+
+    @query_budget(2)
+    async def exceeded(request):
+        for _ in range(3):
+            record_statement("SELECT 1")
+        return JSONResponse({})
+
+    app = Starlette(routes=[Route("/within", within), Route("/exceeded", exceeded)])
+    transport = ASGITransport(app=QueryBudgetMiddleware(app, strict=True))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/within")
+        assert response.headers["x-query-count"] == "1"
+
+        with pytest.raises(QueryBudgetExceeded, match="budget=2, actual=3"):
+            await client.get("/exceeded")
+
+
+@pytest.mark.asyncio
+async def test_query_count_header(client: AsyncClient):
+    """Тест: ответ API содержит количество выполненных SQL-запросов"""
+    response = await client.get("/api/v1/operators")
+    assert response.status_code == 200
+    assert int(response.headers["x-query-count"]) >= 1
@@ -0,0 +1,130 @@
+"""Тесты для ребалансировки обращений между операторами"""
+
+import random
+from collections import Counter
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.domains.contacts.model import Contact
+from src.domains.contacts.rebalancer import OperatorRebalancer, plan_quotas
+from src.domains.leads.model import Lead
+from src.domains.operators.load_snapshot import OperatorLoadSnapshot
+from src.domains.operators.model import Operator
+from src.domains.sources.model import Source, SourceOperatorWeight
+
+
+def test_plan_moves_only_excess_over_load_limit():
+    """Тест: перегруженный оператор отдает ровно превышение лимита"""
+    moves = plan_quotas(
+        counts={(1, 1): 5, (1, 2): 1},
+        weights={1: {1: 10, 2: 10}},
+        limits={1: 2, 2: 10},
+        receivers={1: {1, 2}},
+        tolerance=None,
+    )
+    assert [(m.from_operator_id, m.to_operator_id, m.reason) for m in moves] == [
+        (1, 2, "capacity")
+    ] * 3
+
+
+def test_plan_evens_out_weight_shares_within_tolerance():
+    """Тест: после резкой смены весов доля выравнивается до границы допуска"""
+    weights = {1: {1: 10, 2: 30}}
+    limits = {1: 100, 2: 100}
+    receivers = {1: {1, 2}}
+    # target: 10 и 30; допуск 50% оставляет первому 15 обращений
+    moves = plan_quotas({(1, 1): 40}, weights, limits, receivers, tolerance=0.5)
+    assert len(moves) == 25
+    assert {(m.from_operator_id, m.to_operator_id, m.reason) for m in moves} == {
+        (1, 2, "share")
+    }
+    assert plan_quotas({(1, 1): 15, (1, 2): 25}, weights, limits, receivers) == []
+
+
+def test_plan_ignores_random_routing_skew():
+    """Тест: обычный разброс взвешенного случайного распределения не переносится"""
+    weights = {1: {1: 10, 2: 20, 3: 30}}
+    limits = {1: 100, 2: 100, 3: 100}
+    receivers = {1: {1, 2, 3}}
+    assert (
+        plan_quotas(
+            {(1, 1): 2, (1, 2): 1}, {1: {1: 10, 2: 10, 3: 10}}, limits, receivers
+        )
+        == []
+    )
+
+    rng = random.Random(42)
+    counts: Counter = Counter()
+    for _ in range(60):
+        counts[(1, rng.choices([1, 2, 3], [10, 20, 30])[0])] += 1
+    assert plan_quotas(dict(counts), weights, limits, receivers) == []
+
+
+def test_plan_without_receivers_or_over_max_moves():
+    """Тест: без получателей с местом план пуст, max_moves ограничивает проход"""
+    weights = {1: {1: 10, 2: 10}}
+    assert plan_quotas({(1, 1): 5}, weights, {1: 2, 2: 10}, {1: {1}}) == []
+    assert plan_quotas({(1, 1): 5}, weights, {1: 2, 2: 0}, {1: {1, 2}}) == []
+    moves = plan_quotas({(1, 1): 5}, weights, {1: 2, 2: 10}, {1: {2}}, max_moves=2)
+    assert len(moves) == 2
+
+
+@pytest.mark.asyncio
+async def test_rebalance_moves_newest_contacts_in_batches(
+    db_session: AsyncSession, monkeypatch
+):
+    """Тест: проход переносит новые обращения пачками и учитывает их в снимке"""
+    busy = Operator(name="Перегружен", load_limit=2)
+    free = Operator(name="Свободен", load_limit=10)
+    source = Source(name="Источник ребалансировки")
+    lead = Lead(phone="+79990000077")
+    db_session.add_all([busy, free, source, lead])
+    await db_session.commit()
+    for operator in (busy, free):
+        db_session.add(
+            SourceOperatorWeight(
+                source_id=source.id, operator_id=operator.id, weight=10
+            )
+        )
+    contacts = [
+        Contact(lead_id=lead.id, source_id=source.id, operator_id=busy.id)
+        for _ in range(4)
+    ]
+    db_session.add_all(contacts)
+    await db_session.commit()
+    busy_id, free_id = busy.id, free.id
+    newest = sorted(contact.id for contact in contacts)[2:]
+
+    snapshot = OperatorLoadSnapshot()
+    await snapshot.reconcile(db_session)
+    monkeypatch.setattr(
+        "src.domains.contacts.rebalancer.operator_load_snapshot", snapshot
+    )
+    rebalancer = OperatorRebalancer(
+        async_sessionmaker(db_session.bind, expire_on_commit=False),
+        tolerance=None,
+        batch_size=1,
+        batch_pause=0,
+    )
+
+    plan = await rebalancer.plan(db_session)
+    assert plan.overloaded == {busy_id: 2}
+    assert plan.unresolved == {}
+    assert sorted(move.contact_id for move in plan.moves) == newest
+
+    report = await rebalancer.rebalance()
+    assert (report.planned, report.moved, report.batches) == (2, 2, 2)
+    loads = {
+        load.operator_id: load.active_load
+        for load in await snapshot.get_all(db_session)
+    }
+    assert loads == {busy_id: 2, free_id: 2}
+
+    db_session.expire_all()
+    moved = await db_session.execute(
+        select(Contact.id).where(Contact.operator_id == free_id)
+    )
+    assert sorted(moved.scalars().all()) == newest
+    assert (await rebalancer.plan(db_session)).moves == []
@@ -0,0 +1,18 @@
+"""Тесты для распределения обращений при переназначении"""
+
+from src.domains.contacts.redistribution import apportion
+
+
+def test_apportion_follows_weights():
+    """Тест: обращения делятся пропорционально весам"""
+    capacity = {1: 100, 2: 100}
+    assert apportion(8, {1: 30, 2: 10}, capacity) == {1: 6, 2: 2}
+    assert capacity == {1: 94, 2: 98}
+
+
+def test_apportion_respects_capacity():
+    """Тест: оператор без мест не получает обращений, лишние не распределяются"""
+    capacity = {1: 2, 2: 0, 3: 1}
+    assert apportion(5, {1: 10, 2: 50, 3: 10}, capacity) == {1: 2, 3: 1}
+    assert capacity == {1: 0, 2: 0, 3: 0}
+    assert apportion(3, {}, {}) == {}
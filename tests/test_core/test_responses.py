@@ -0,0 +1,43 @@
+"""Тесты для быстрой сериализации ответов"""
+
+import json
+from datetime import datetime
+from typing import List
+
+import pytest
+
+from src.core.config import settings
+from src.core.responses import StandardJSONResponse
+from src.domains.operators.schemas import OperatorResponse
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_standard_json_response_modes_match(monkeypatch, fast: bool):
+    """Тест совпадения JSON в быстром и обычном режимах"""
+    monkeypatch.setattr(settings, "fast_json_responses", fast)
+    now = datetime(2025, 1, 1, 12, 0, 0)
+    operators = [
+        OperatorResponse(
+            id=i, name=f"Оператор {i}", created_at=now, updated_at=now, load_limit=5
+        )
+        for i in range(3)
+    ]
+
+    response = StandardJSONResponse(operators, List[OperatorResponse])
+
+    assert json.loads(response.body) == {
+        "success": True,
+        "data": [
+            {
+                "id": i,
+                "name": f"Оператор {i}",
+                "is_active": True,
+                "load_limit": 5,
+                "skills": [],
+                "created_at": "2025-01-01T12:00:00",
+                "updated_at": "2025-01-01T12:00:00",
+            }
+            for i in range(3)
+        ],
+        "message": None,
+    }
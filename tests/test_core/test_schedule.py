@@ -0,0 +1,63 @@
+"""Тесты для расписания смен операторов"""
+
+from datetime import datetime, time, timezone
+from zoneinfo import ZoneInfo
+
+from src.domains.operators.schedule import ShiftSchedule, ShiftWindow
+
+MOSCOW = ZoneInfo("Europe/Moscow")
+
+
+def ts(*args, tz=timezone.utc) -> float:
+    return datetime(*args, tzinfo=tz).timestamp()
+
+
+def test_on_shift_follows_local_time():
+    """Тест: границы смены в часовом поясе оператора, переходы по ленте"""
+    # 2026-10-19 - понедельник
+    now = ts(2026, 10, 19, 5, 0)
+    schedule = ShiftSchedule(horizon_days=7, clock=lambda: now)
+    schedule.compile(
+        [ShiftWindow(1, 0, time(9, 0), time(18, 0), "Europe/Moscow")], now=now
+    )
+
+    # 05:00 UTC = 08:00 по Москве - до смены; оператор 2 без расписания
+    assert not schedule.on_shift(1, now)
+    assert schedule.on_shift(2, now)
+    assert schedule.next_transition == ts(2026, 10, 19, 9, 0, tz=MOSCOW)
+
+    assert schedule.on_shift(1, ts(2026, 10, 19, 9, 0, tz=MOSCOW))
+    assert schedule.next_transition == ts(2026, 10, 19, 18, 0, tz=MOSCOW)
+    assert not schedule.on_shift(1, ts(2026, 10, 19, 18, 0, tz=MOSCOW))
+    # Следующий понедельник
+    assert schedule.on_shift(1, ts(2026, 10, 26, 12, 0, tz=MOSCOW))
+
+
+def test_overnight_and_overlapping_shifts():
+    """Тест: смена через полночь и перекрывающиеся смены одного оператора"""
+    now = ts(2026, 10, 20, 1, 0)  # вторник, 01:00 UTC
+    schedule = ShiftSchedule(horizon_days=7, clock=lambda: now)
+    schedule.compile(
+        [
+            # Ночная смена с понедельника на вторник уже идет
+            ShiftWindow(1, 0, time(22, 0), time(6, 0)),
+            ShiftWindow(1, 1, time(5, 0), time(8, 0)),
+        ],
+        now=now,
+    )
+
+    assert schedule.on_shift(1, now)
+    # 06:00 - ночная смена закончилась, но идет утренняя
+    assert schedule.on_shift(1, ts(2026, 10, 20, 6, 30))
+    assert not schedule.on_shift(1, ts(2026, 10, 20, 8, 0))
+
+
+def test_timeline_recompiled_after_horizon():
+    """Тест: по окончании горизонта лента пересобирается"""
+    now = ts(2026, 10, 19, 12, 0)
+    schedule = ShiftSchedule(horizon_days=1, clock=lambda: now)
+    schedule.compile([ShiftWindow(1, 2, time(10, 0), time(11, 0))], now=now)
+
+    # Среда, 10:30 - за пределами первого горизонта
+    assert schedule.on_shift(1, ts(2026, 10, 21, 10, 30))
+    assert not schedule.on_shift(1, ts(2026, 10, 21, 11, 30))
@@ -0,0 +1,173 @@
+"""Тесты для плавной остановки"""
+
+import asyncio
+import os
+import signal
+
+import pytest
+import uvicorn
+from httpx import AsyncClient, ASGITransport
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from src.core.background import PeriodicTask
+from src.core.config import settings
+from src.core.shutdown import (
+    DrainMiddleware,
+    ShutdownCoordinator,
+    shutdown_phase_seconds,
+    shutdown,
+    shutdown_requests,
+)
+from src.core.warmup import readiness
+from src.server import DrainingServer, load_config
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_in_flight_and_rejects_new_requests():
+    """Тест: принятый запрос завершается, новые к API получают 503"""
+    release = asyncio.Event()
+
+    async def slow(request):
+        await release.wait()
+        return JSONResponse({"ok": True})
+
+    async def health(request):
+        return JSONResponse({"status": "healthy"})
+
+    coordinator = ShutdownCoordinator()
+    app = DrainMiddleware(
+        Starlette(
+            routes=[
+                Route("/api/v1/contacts", slow, methods=["POST"]),
+                Route("/health", health),
+            ]
+        ),
+        coordinator=coordinator,
+        retry_after=3,
+    )
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        running = asyncio.create_task(client.post("/api/v1/contacts"))
+        await asyncio.sleep(0.01)
+        assert coordinator.in_flight == 1
+
+        coordinator.begin()
+        assert shutdown_requests.get("at_start") == 1
+        rejected = await client.post("/api/v1/contacts")
+        assert rejected.status_code == 503
+        assert rejected.headers["retry-after"] == "3"
+        assert rejected.headers["connection"] == "close"
+        assert (await client.get("/health")).status_code == 200
+
+        waiter = asyncio.create_task(coordinator.wait_for_requests(5))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        release.set()
+        assert (await running).status_code == 200
+        assert await waiter == 0
+
+    coordinator.finish()
+    assert "requests" in coordinator.phases
+    assert shutdown_phase_seconds.get("total") == coordinator.phases["total"]
+
+
+@pytest.mark.asyncio
+async def test_drain_deadline():
+    """Тест: по истечении срока возвращается число незавершенных запросов"""
+    coordinator = ShutdownCoordinator()
+    coordinator.request_started()
+    coordinator.begin()
+
+    assert await coordinator.wait_for_requests(0.01) == 1
+    assert shutdown_requests.get("abandoned") == 1
+
+
+@pytest.mark.asyncio
+async def test_periodic_task_stop_finishes_current_run():
+    """Тест: остановка дожидается текущего запуска задачи"""
+    started = asyncio.Event()
+    finished = []
+
+    async def job():
+        started.set()
+        await asyncio.sleep(0.05)
+        finished.append(True)
+
+    task = PeriodicTask("job", 0.01, job)
+    task.start()
+    await started.wait()
+    await task.stop(timeout=1)
+
+    assert finished == [True]
+    assert not task.running
+
+
+@pytest.mark.asyncio
+async def test_sigterm_drains_before_uvicorn_closes_sockets(monkeypatch):
+    """Тест: по SIGTERM экземпляр сначала отвечает draining на еще открытом
+    сокете, затем uvicorn закрывает его и lifespan останавливает приложение"""
+    from src.main import app
+
+    monkeypatch.setattr(settings, "warmup_enabled", False)
+    # uvicorn повторяет пойманные сигналы после остановки - не процессу pytest
+    raised = []
+    monkeypatch.setattr(signal, "raise_signal", raised.append)
+    config = uvicorn.Config(
+        app, host="127.0.0.1", port=0, log_level="warning", timeout_graceful_shutdown=5
+    )
+    server = DrainingServer(config, drain_seconds=0.5)
+    serving = asyncio.create_task(server.serve())
+    try:
+        while not server.started:
+            await asyncio.sleep(0.01)
+        port = server.servers[0].sockets[0].getsockname()[1]
+        async with AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+            assert (await client.get("/ready")).status_code == 200
+
+            os.kill(os.getpid(), signal.SIGTERM)
+            await asyncio.sleep(0.3)
+            response = await client.get("/ready")
+            assert response.status_code == 503
+            assert response.json()["data"]["status"] == "draining"
+            response = await client.get("/api/v1/operators")
+            assert response.status_code == 503
+            assert response.headers["retry-after"]
+            assert not server.should_exit
+
+        await asyncio.wait_for(serving, 10)
+        assert raised == [signal.SIGTERM]
+        assert {"requests", "background", "pool", "total"} <= set(shutdown.phases)
+    finally:
+        server.should_exit = True
+        await asyncio.wait_for(serving, 10)
+        shutdown.reset()
+        readiness.reset()
+
+
+def test_server_passes_uvicorn_options_through(monkeypatch):
+    """Тест: python -m src.server понимает аргументы uvicorn"""
+    config = load_config(
+        [
+            "--host",
+            "0.0.0.0",
+            "--proxy-headers",
+            "--forwarded-allow-ips",
+            "10.0.0.1",
+            "--timeout-graceful-shutdown",
+            "25",
+            "--header",
+            "X-Instance:a",
+        ]
+    )
+    assert config.app == "src.main:app"
+    assert config.host == "0.0.0.0"
+    assert config.proxy_headers is True
+    assert config.forwarded_allow_ips == "10.0.0.1"
+    assert config.timeout_graceful_shutdown == 25
+    assert config.headers == [["X-Instance", "a"]]
+    assert load_config(["other.module:app"]).app == "other.module:app"
+    monkeypatch.setenv("UVICORN_APP", "env.module:app")
+    assert load_config([]).app == "env.module:app"
@@ -0,0 +1,24 @@
+"""Тесты для сопоставления навыков битовыми масками"""
+
+from src.domains.operators.skills import SkillIndex, normalize_skills
+
+
+def test_normalize_skills():
+    """Тест: нижний регистр, без пробелов и повторов, по порядку"""
+    assert normalize_skills([" RU", "en", "ru", ""]) == ["en", "ru"]
+    assert normalize_skills(None) == []
+
+
+def test_skill_masks():
+    """Тест: маски операторов и требований"""
+    index = SkillIndex()
+    english = index.mask(("en",))
+    bilingual = index.mask(("en", "ru"))
+
+    required = index.required_mask(["ru"])
+    assert bilingual & required == required
+    assert english & required != required
+    assert index.required_mask([]) == 0
+    # Навыка нет ни у одного оператора - бит не создается
+    assert index.required_mask(["de"]) is None
+    assert index.mask(("en", "ru")) == bilingual
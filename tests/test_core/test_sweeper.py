@@ -0,0 +1,147 @@
+"""Тесты для автоматического закрытия простаивающих обращений"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.domains.contacts.model import Contact
+from src.domains.contacts.repository import ContactRepository
+from src.domains.contacts.sweeper import StaleContactSweeper
+from src.domains.leads.model import Lead
+from src.domains.operators.load_snapshot import OperatorLoadSnapshot
+from src.domains.operators.model import Operator
+from src.domains.sources.model import Source
+
+
+@pytest.mark.asyncio
+async def test_sweep_closes_idle_contacts_in_batches(
+    db_session: AsyncSession, monkeypatch
+):
+    """Тест: закрываются только простаивающие обращения, места освобождаются"""
+    now = datetime(2026, 10, 19, 12, 0)
+    operator = Operator(name="Оператор", load_limit=10)
+    chat = Source(name="Чат", idle_timeout_minutes=30)
+    form = Source(name="Форма")  # без таймаута - не закрывается
+    lead = Lead(phone="+79990000000")
+    db_session.add_all([operator, chat, form, lead])
+    await db_session.commit()
+
+    def contact(source: Source, idle_minutes: int, operator_id=operator.id):
+        idle_since = now - timedelta(minutes=idle_minutes)
+        return Contact(
+            lead_id=lead.id,
+            source_id=source.id,
+            operator_id=operator_id,
+            is_active=True,
+            created_at=idle_since,
+            last_activity_at=idle_since,
+        )
+
+    db_session.add_all(
+        [contact(chat, 45) for _ in range(4)]
+        + [contact(chat, 45, operator_id=None), contact(chat, 10), contact(form, 600)]
+    )
+    await db_session.commit()
+
+    snapshot = OperatorLoadSnapshot()
+    await snapshot.reconcile(db_session)
+    monkeypatch.setattr("src.domains.contacts.sweeper.operator_load_snapshot", snapshot)
+    sweeper = StaleContactSweeper(
+        async_sessionmaker(db_session.bind, expire_on_commit=False), batch_size=2
+    )
+
+    report = await sweeper.sweep(now)
+
+    assert report.closed == 5
+    assert report.freed == {operator.id: 4}
+    assert report.batches == 3
+    (load,) = await snapshot.get_all(db_session)
+    assert load.active_load == 2
+
+    expected = sorted([chat.id, form.id])
+    db_session.expire_all()
+    active = await db_session.execute(
+        select(Contact.source_id).where(Contact.is_active)
+    )
+    assert sorted(active.scalars().all()) == expected
+    assert (await sweeper.sweep(now)).closed == 0
+
+
+@pytest.mark.asyncio
+async def test_reassigned_contact_keeps_idle_clock(db_session: AsyncSession):
+    """Тест: переназначение обновляет updated_at, но не время простоя"""
+    now = datetime.utcnow()
+    idle_since = now - timedelta(minutes=45)
+    leaving = Operator(name="Уходит", load_limit=10)
+    staying = Operator(name="Остается", load_limit=10)
+    chat = Source(name="Чат", idle_timeout_minutes=30)
+    lead = Lead(phone="+79990000001")
+    db_session.add_all([leaving, staying, chat, lead])
+    await db_session.commit()
+    contact = Contact(
+        lead_id=lead.id,
+        source_id=chat.id,
+        operator_id=leaving.id,
+        created_at=idle_since,
+        updated_at=idle_since,
+        last_activity_at=idle_since,
+    )
+    db_session.add(contact)
+    await db_session.commit()
+    contact_id, leaving_id, staying_id = contact.id, leaving.id, staying.id
+
+    moved = await ContactRepository(db_session).reassign(
+        leaving_id, {contact_id: staying_id}
+    )
+    assert moved == {staying_id: 1}
+    db_session.expire_all()
+    updated_at, last_activity_at = (
+        await db_session.execute(
+            select(Contact.updated_at, Contact.last_activity_at).where(
+                Contact.id == contact_id
+            )
+        )
+    ).one()
+    assert updated_at > idle_since
+    assert last_activity_at == idle_since
+
+    sweeper = StaleContactSweeper(
+        async_sessionmaker(db_session.bind, expire_on_commit=False)
+    )
+    report = await sweeper.sweep(now)
+    assert report.closed == 1
+    assert report.freed == {staying_id: 1}
+
+
+@pytest.mark.asyncio
+async def test_updated_contact_restarts_idle_clock(
+    client: AsyncClient, db_session: AsyncSession
+):
+    """Тест: изменение обращения через API отсчитывает простой заново"""
+    now = datetime.utcnow()
+    idle_since = now - timedelta(minutes=45)
+    chat = Source(name="Чат", idle_timeout_minutes=30)
+    lead = Lead(phone="+79990000002")
+    db_session.add_all([chat, lead])
+    await db_session.commit()
+    contact = Contact(
+        lead_id=lead.id,
+        source_id=chat.id,
+        created_at=idle_since,
+        last_activity_at=idle_since,
+    )
+    db_session.add(contact)
+    await db_session.commit()
+
+    response = await client.patch(
+        f"/api/v1/contacts/{contact.id}", json={"message": "Новое сообщение"}
+    )
+    assert response.status_code == 200
+
+    sweeper = StaleContactSweeper(
+        async_sessionmaker(db_session.bind, expire_on_commit=False)
+    )
+    assert (await sweeper.sweep(now)).closed == 0